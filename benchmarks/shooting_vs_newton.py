@@ -0,0 +1,79 @@
+"""
+Shooting (Lewis–Sorel) vs Newton on a set of CMO columns.
+
+For each case, solves with simulate(method="newton") and simulate(method="shooting")
+and reports wall time, iterations (Newton steps / marches), convergence, whether
+shooting fell back to Newton, and the largest difference between the two profiles.
+Since Newton's Jacobian reuses unchanged stages, shooting at best breaks even: about
+1.0-1.3x Newton's speed on long columns it still converges (50+ trays), 0.6-0.8x up
+to ~30 trays, where Newton's few steps cost less than the march's root find.
+
+    python benchmarks/shooting_vs_newton.py [--repeat N] [--quick]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from distill.column import ColumnSpec, DistillationColumn  # noqa: E402
+
+# (label, ColumnSpec kwargs, shooting must fall back to Newton)
+CASES = [
+    ("base 15 trays", dict(), False),
+    ("15 trays, R=1.5", dict(reflux_ratio=1.5), False),
+    ("15 trays, zF=0.6", dict(zF=0.6, D=60.0), False),
+    ("20 trays, R=1.8", dict(n_stages=20, feed_stage=10, reflux_ratio=1.8), False),
+    ("30 trays, R=2.5", dict(n_stages=30, feed_stage=15), False),
+    ("50 trays, R=1.5", dict(n_stages=50, feed_stage=25, reflux_ratio=1.5), False),
+    ("100 trays, R=1.3", dict(n_stages=100, feed_stage=50, reflux_ratio=1.3), False),
+    ("15 trays, q=0.5", dict(q=0.5), False),
+    # pinched near minimum reflux: the march cannot meet tol, Newton converges
+    ("120 trays, R=1.2", dict(n_stages=120, feed_stage=60, reflux_ratio=1.2), True),
+]
+QUICK = 4
+
+
+def run(kwargs, method, repeat):
+    """
+    Best-of-repeat wall time; returns (ColumnResult, seconds, method that produced it).
+    """
+    best = np.inf
+    n = kwargs.get("n_stages", 15)
+    for _ in range(repeat):
+        col = DistillationColumn(ColumnSpec(eff_profile=[0.70] * n, **kwargs))
+        t0 = time.perf_counter()
+        res = col.simulate(return_type="array", method=method)
+        best = min(best, time.perf_counter() - t0)
+    return res, best, col.solved_by
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=3, help="best of N timings per case")
+    ap.add_argument("--quick", action="store_true", help=f"only the first {QUICK} cases")
+    args = ap.parse_args(argv)
+
+    cases = CASES[:QUICK] if args.quick else CASES
+    print(f"{'case':<20} {'newton s':>9} {'it':>3} {'ok':>3}   {'shoot s':>8} {'it':>3} {'ok':>3} {'fb':>3}"
+          f"   {'speed-up':>8} {'max |dx|':>9}")
+    for label, kw, falls_back in cases:
+        rn, tn, _ = run(kw, "newton", args.repeat)
+        rs, ts, used = run(kw, "shooting", args.repeat)
+        fb = used != "shooting"
+        if falls_back:
+            assert used == "newton", f"{label}: expected the Newton fallback, solved by {used}"
+        dx = float(np.max(np.abs(rn.x - rs.x))) if rn.converged and rs.converged else float("nan")
+        print(f"{label:<20} {tn:9.3f} {int(rn.iters):3d} {'y' if rn.converged else 'n':>3}   "
+              f"{ts:8.3f} {int(rs.iters):3d} {'y' if rs.converged else 'n':>3} {'y' if fb else '-':>3}"
+              f"   {tn / ts:7.1f}x {dx:9.2e}")
+
+
+if __name__ == "__main__":
+    main()
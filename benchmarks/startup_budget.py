@@ -0,0 +1,75 @@
+"""
+Start-up budget check for the solve path.
+
+Imports the core distill modules in a fresh interpreter under `python -X importtime`
+and fails (exit 1) if pandas or matplotlib get pulled in, or if the cumulative
+import time exceeds the budget.
+
+    python benchmarks/startup_budget.py [--budget-ms 200] [--repeat 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CORE_MODULES = ["distill.thermo", "distill.solver", "distill.column", "distill.io_utils"]
+FORBIDDEN = ["pandas", "matplotlib"]
+
+
+def measure_imports(modules=CORE_MODULES):
+    """
+    Returns (total_ms, imported) where `imported` maps top-level package names
+    to cumulative import time in ms, as reported by -X importtime.
+    """
+    env = os.environ.copy()
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    code = "import " + ", ".join(modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=True,
+    )
+
+    imported = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip()) - 1  # one separator space, then 2 per level
+        name = name.strip()
+        if depth == 0:
+            total_us += int(cumulative)
+        top = name.split(".")[0]
+        imported[top] = max(imported.get(top, 0.0), int(cumulative) / 1000.0)
+
+    return total_us / 1000.0, imported
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--budget-ms", type=float, default=200.0)
+    ap.add_argument("--repeat", type=int, default=3, help="best of N runs (first run warms the disk cache)")
+    args = ap.parse_args(argv)
+
+    runs = [measure_imports() for _ in range(max(args.repeat, 1))]
+    total_ms, imported = min(runs, key=lambda r: r[0])
+
+    print(f"core import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, ms in sorted(imported.items(), key=lambda kv: -kv[1])[:5]:
+        print(f"  {name:<12s} {ms:8.1f} ms")
+
+    failures = [f"{m} imported on the solve path" for m in FORBIDDEN if m in imported]
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    for msg in failures:
+        print("FAIL:", msg)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
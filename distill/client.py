@@ -0,0 +1,90 @@
+"""
+Thin client for distill.service.
+
+Mirrors scenarios._common.run_case, but the solve happens in the warm service
+instead of the calling interpreter.
+"""
+
+import itertools
+import json
+import socket
+
+from .column import ColumnSpec
+from .io_utils import save_case_outputs
+from .service import DEFAULT_HOST, DEFAULT_PORT
+
+
+class ServiceError(RuntimeError):
+    pass
+
+
+class SimulationClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, timeout=None):
+        if unix_path:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(unix_path)
+        else:
+            self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._file = self._sock.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, payload: dict) -> dict:
+        rid = next(self._ids)
+        self._file.write((json.dumps(dict(payload, id=rid)) + "\n").encode())
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise ServiceError("connection closed by service")
+        resp = json.loads(line)
+        if "error" in resp:
+            raise ServiceError(resp["error"])
+        return resp
+
+    def ping(self):
+        return self.request({"op": "ping"}).get("ok", False)
+
+    def stats(self):
+        return self.request({"op": "stats"})["stats"]
+
+    def solve_batch(self, cases, profile=True):
+        """
+        cases: iterable of (case_name, ColumnSpec) pairs.
+        Returns a list of (case_name, df, summary); df is None when profile=False.
+        """
+        cases = list(cases)
+        payload = {
+            "op": "solve",
+            "profile": bool(profile),
+            "cases": [{"name": name, "spec": spec.to_dict()} for name, spec in cases],
+        }
+        if profile:
+            import pandas as pd
+
+        out = []
+        for rec in self.request(payload)["results"]:
+            if "error" in rec:
+                raise ServiceError(f"case {rec['name']!r}: {rec['error']}")
+            df = pd.DataFrame(rec["profile"]) if profile else None
+            out.append((rec["name"], df, rec["summary"]))
+        return out
+
+    def simulate(self, spec: ColumnSpec):
+        _, df, summary = self.solve_batch([("case", spec)])[0]
+        return df, summary
+
+    def run_case(self, out_dir, case_name, spec: ColumnSpec):
+        df, summary = self.simulate(spec)
+        paths = save_case_outputs(out_dir, case_name, df, summary)
+        return df, summary, paths
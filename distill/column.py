@@ -1,9 +1,71 @@
 \
 import numpy as np
-import pandas as pd
 
-from .thermo import y_benzene_equilibrium, ATM_MMHG
+from .thermo import y_benzene_equilibrium, x_benzene_from_y_dewpoint, bubble_slope, bubble_temperature, psat_mmHg, ATM_MMHG
 from .solver import NewtonSolver
+from .results import ColumnResult
+from .vle import IdealVLE
+from .enthalpy import enthalpy_table
+
+DESIGN_TARGETS = ("xD", "xB", "recovery")
+DESIGN_FREE = ("R", "D")
+
+# bubble-point tolerances on |sum x_i Psat_i - P| (mmHg): converged value (cold
+# starts), and the range inexact Newton moves in with warm starts, from the loosest
+# far from the solution down to round-off (see _equilibrium)
+BUBBLE_TOL = 1e-8
+BUBBLE_TOL_MAX = 1.0
+BUBBLE_TOL_WARM = 1e-11
+
+
+class DesignSpec:
+    """
+    Design specification solved together with the column: hold `target` at
+    `value` by treating the reflux ratio ("R") or distillate rate ("D") as unknown.
+    target: "xD" (distillate benzene), "xB" (bottoms benzene) or
+            "recovery" (fraction of the feed benzene recovered in the distillate)
+    """
+
+    def __init__(self, target="xD", value=0.99, free="R"):
+        if target not in DESIGN_TARGETS:
+            raise ValueError(f"target must be one of {DESIGN_TARGETS}")
+        if free not in DESIGN_FREE:
+            raise ValueError(f"free must be one of {DESIGN_FREE}")
+        if not 0.0 < value < 1.0:
+            raise ValueError("design value must be between 0 and 1")
+        self.target = target
+        self.value = float(value)
+        self.free = free
+
+    def to_dict(self):
+        return {"target": self.target, "value": self.value, "free": self.free}
+
+    def __repr__(self):
+        return f"DesignSpec({self.target}={self.value:g}, free={self.free})"
+
+
+def linear_pressure_profile(n_stages, P_top, dP_tray, dP_reboiler=None):
+    """
+    Per-stage pressures for ColumnSpec(pressure_profile=...): P_top on tray 1,
+    rising by dP_tray per tray, and the reboiler dP_reboiler (default dP_tray)
+    below the last tray. Length n_stages + 1.
+    """
+    P = P_top + dP_tray * np.arange(n_stages + 1, dtype=float)
+    if dP_reboiler is not None:
+        P[-1] = P[-2] + dP_reboiler
+    return P
+
+
+def remap_profile(u, n_stages):
+    """
+    Map a profile [x1..xN, xB] solved on a column with N trays onto one with
+    n_stages trays, as a warm start: every stage keeps its fractional height
+    between tray 1 and the reboiler, compositions are interpolated linearly.
+    """
+    u = np.asarray(u, dtype=float)
+    if u.ndim != 1 or u.size < 2:
+        raise ValueError("u must be a profile [x1..xN, xB]")
+    return np.interp(np.linspace(0.0, 1.0, int(n_stages) + 1), np.linspace(0.0, 1.0, u.size), u)
 
 
 class ColumnSpec:
@@ -18,6 +80,9 @@ class ColumnSpec:
         D=50.0,
         reflux_ratio=2.5,
         eff_profile=None,      # list of length n_stages (Murphree vapor efficiency)
+        design=None,           # DesignSpec (or its dict): frees R or D to meet a purity target
+        pressure_profile=None, # per-stage pressures (mmHg), trays 1..n then reboiler; overrides pressure_mmHg
+        energy_balance=False,  # stage energy balances set L_i / V_i instead of constant molar overflow
     ):
         self.n = int(n_stages)
         self.f = int(feed_stage)
@@ -35,142 +100,1122 @@ class ColumnSpec:
             if self.eff.size != self.n:
                 raise ValueError("eff_profile must have length n_stages")
 
+        if isinstance(design, dict):
+            design = DesignSpec(**design)
+        self.design = design
+
+        # P stays the top (tray 1) pressure; pressure holds the whole profile, or None if isobaric
+        self.pressure = None
+        if pressure_profile is not None:
+            self.pressure = np.array(pressure_profile, dtype=float)
+            if self.pressure.shape != (self.n + 1,):
+                raise ValueError("pressure_profile must have length n_stages + 1 (trays, then reboiler)")
+            if np.any(self.pressure <= 0.0):
+                raise ValueError("pressures must be positive")
+            self.P = float(self.pressure[0])
+
+        self.energy_balance = bool(energy_balance)
+        check_flows(self.flows())
+
+    def to_dict(self):
+        """
+        Constructor keyword arguments for this spec (JSON-friendly),
+        so that ColumnSpec(**spec.to_dict()) rebuilds it.
+        """
+        d = {
+            "n_stages": self.n,
+            "feed_stage": self.f,
+            "pressure_mmHg": self.P,
+            "F": self.F,
+            "zF": self.zF,
+            "q": self.q,
+            "D": self.D,
+            "reflux_ratio": self.R,
+            "eff_profile": self.eff.tolist(),
+        }
+        if self.design is not None:
+            d["design"] = self.design.to_dict()
+        if self.pressure is not None:
+            d["pressure_profile"] = self.pressure.tolist()
+        if self.energy_balance:
+            d["energy_balance"] = True
+        return d
+
     def flows(self):
         """
         Constant molar overflow flows for total condenser.
         Above feed: L, V
         Below feed: Ls, Vs
+        (With energy_balance the solved flows vary by stage, see
+        DistillationColumn.stage_flows().)
         """
-        L = self.R * self.D
-        V = (self.R + 1.0) * self.D
+        return cmo_flows(self.R, self.D, self.F, self.q)
+
 
-        Ls = L + self.q * self.F
-        Vs = V + (1.0 - self.q) * self.F
+def cmo_flows(R, D, F, q):
+    """
+    ColumnSpec.flows() for the given reflux ratio, distillate, feed and q.
+    """
+    L = R * D
+    V = (R + 1.0) * D
 
-        B = self.F - self.D
+    Ls = L + q * F
+    Vs = V - (1.0 - q) * F
 
-        return {"L": L, "V": V, "Ls": Ls, "Vs": Vs, "B": B}
+    B = F - D
+
+    return {"L": L, "V": V, "Ls": Ls, "Vs": Vs, "B": B}
+
+
+def check_flows(flows):
+    """
+    Raise ValueError unless the stripping section has vapor: Vs > 0, i.e.
+    Ls > B (Ls - Vs = B).
+    """
+    if not flows["Vs"] > 0.0:
+        raise ValueError(
+            f"no stripping vapor: Vs = {flows['Vs']:g} (needs Vs > 0, i.e. Ls > B; "
+            "raise reflux_ratio or D, or q)"
+        )
 
 
 class DistillationColumn:
-    def __init__(self, spec: ColumnSpec):
+    def __init__(self, spec: ColumnSpec, vle=None, inexact=False):
         self.spec = spec
+        # batched VLE model (distill.vle); None keeps the scalar benzene/toluene thermo path
+        # for isobaric specs (see _model())
+        self.vle = vle
         self.solver = NewtonSolver(tol=1e-9, max_iter=60, fd_eps=1e-6)
+        # inexact Newton: on the scalar thermo path, bubble points are solved only
+        # as accurately as the current column residual needs (see _forcing)
+        self.inexact = bool(inexact)
+        self._bubble_tol = BUBBLE_TOL
+        # Jacobian point of the current inexact outer step (None outside one)
+        self._jac_x = None
+        # stage results of the last line-search trial of an inexact step: the accepted
+        # one is the next Jacobian point, polished from there instead of solved cold
+        self._trial = None
+        # per-stage equilibrium, temperatures and Murphree vapor of the base point the
+        # finite-difference Jacobian perturbs (see _murphree)
+        self._stages = None
+        # inner-iteration counters of the last simulate()/resolve()
+        self.stats = {}
+
+        # last solution and its Newton Jacobian, reused by resolve()
+        self._base = None
+        # free R or D of a design solve's current iterate (the spec keeps its own
+        # value until the solve converges)
+        self._free = None
+        # flows() of the current operating point, reused across residual calls
+        self._flows_key = None
+        self._flows_val = None
+        # feed enthalpy for energy_balance, keyed on (zF, q, feed pressure)
+        self._hF_key = None
+        self._hF_val = None
+
+    @property
+    def solution(self):
+        """
+        Unknown vector [x1..xN, xB] of the last simulate()/resolve() (a copy), or None.
+        Pass it back as x_init to warm-start a nearby solve.
+        """
+        return None if self._base is None else self._base["u"].copy()
+
+    @property
+    def solved_by(self):
+        """
+        "newton" or "shooting": which method produced the last simulate() solution.
+        """
+        return None if self._base is None else self._base.get("method", "newton")
+
+    def simulate(self, x_init=None, return_type="frame", out=None, deadline=None, method="newton"):
+        """
+        Solve the column.
+        return_type="frame": (profile DataFrame, summary dict)
+        return_type="array": ColumnResult, written in place into `out` if given
+                             (e.g. a ResultSet row view)
+        deadline: optional time.perf_counter() value after which Newton stops
+                  (the last iterate is returned with converged=False)
+
+        With spec.design set, the design equation and the freed R or D join the
+        Newton system (x_init may include the free variable as a last entry);
+        the solved value is written back to the spec if the solve converges.
 
-    def simulate(self, x_init=None):
+        method="shooting": tray-by-tray (Lewis–Sorel) march from the condenser
+        with a 1-D root find on xD; falls back to Newton if it fails (long or
+        very sharp columns, where the march is ill-conditioned). Design specs
+        and energy-balance specs always use Newton.
+
+        x_init may also come from a column with another tray count (any length
+        but n+1, or n+2 with a design): it is then read as a profile
+        [x1..xN, xB] and mapped onto this column with remap_profile(). A
+        solution from another feed stage can be passed as it is.
+        """
+        if return_type not in ("frame", "array"):
+            raise ValueError("return_type must be 'frame' or 'array'")
+        if method not in ("newton", "shooting"):
+            raise ValueError("method must be 'newton' or 'shooting'")
+
+        # the spec may have been edited (or be a SpecRow) since it was validated
+        check_flows(self.spec.flows())
+
+        self._reset_stats()
         n = self.spec.n
         if x_init is None:
-            # simple initial guess: decreasing benzene from top to bottom
-            x_guess = np.linspace(0.95, 0.05, n).clip(1e-6, 1 - 1e-6)
-            xB_guess = 0.05
-            x0 = np.concatenate([x_guess, [xB_guess]])
-        else:
+            x0 = self._cold_start()
+        elif len(x_init) == n + 1 or (self.spec.design is not None and len(x_init) == n + 2):
             x0 = np.array(x_init, dtype=float)
+        else:
+            # profile of a column with another tray count
+            x0 = remap_profile(x_init, n)
 
-        def residual(u):
-            # unknowns: x1..xN, xB
-            x = u[:n].copy()
-            xB = float(u[n])
+        design = self.spec.design
+        if method == "shooting" and design is None and not self.spec.energy_balance:
+            sol, info = self._solve_shooting(None if x_init is None else x0)
+            J = None
+            if not info["converged"]:
+                sol, info = self._newton(self._residual, x0, deadline=deadline)
+                J = info.get("jacobian")
+                info["method"] = "newton"
+        elif design is None:
+            sol, info = self._newton(self._residual, x0, deadline=deadline)
+            J = info.get("jacobian")
+        else:
+            if x0.size == n + 1:
+                x0 = np.append(x0, getattr(self.spec, design.free))
+            try:
+                sol, info = self._newton(self._design_residual, x0, deadline=deadline)
+            finally:
+                self._free = None
+            if info["converged"]:
+                self._set_free(sol[n + 1])
+            sol, J = sol[:n + 1], None  # the augmented Jacobian does not serve resolve()
+        self._base = {"u": sol, "J": J, "Jinv": None, "method": info.get("method", "newton")}
 
-            # clamp to keep stable
-            x = np.clip(x, 1e-8, 1 - 1e-8)
-            xB = float(np.clip(xB, 1e-8, 1 - 1e-8))
+        return self._finish(sol, info, return_type, out)
 
-            # compute y and T from bottom to top using Murphree
-            y = np.zeros(n + 2)  # y[1..n] trays, y[n+1] reboiler vapor
-            T = np.zeros(n + 2)
+    def _cold_start(self):
+        # simple initial guess: decreasing benzene from top to bottom
+        x_guess = np.linspace(0.95, 0.05, self.spec.n).clip(1e-6, 1 - 1e-6)
+        xB_guess = 0.05
+        return np.concatenate([x_guess, [xB_guess]])
 
-            y[n + 1], T[n + 1] = y_benzene_equilibrium(xB, self.spec.P)
+    def resolve(self, eff_updates, keep=True, return_type="frame", out=None, max_iter=20):
+        """
+        Re-solve after changing a few tray efficiencies, e.g. {5: 0.5, 6: 0.5}
+        (stage numbers from the top, as in eff_profile).
 
-            for i in range(n, 0, -1):
-                y_eq, Ti = y_benzene_equilibrium(x[i - 1], self.spec.P)
-                T[i] = Ti
-                Ei = float(np.clip(self.spec.eff[i - 1], 0.0, 1.0))
-                y[i] = y[i + 1] + Ei * (y_eq - y[i + 1])
+        Starts from the previous solution and reuses the previous Newton Jacobian:
+        each changed tray is a rank-one change of the Murphree sweep, so the
+        inverse is updated by Sherman-Morrison-Woodbury instead of refactorizing.
+        If the low-rank iteration stalls, falls back to a cold Newton solve (as
+        simulate() without x_init): near-pure profiles that stall the chord steps
+        stall a warm-started Newton too. info["iters"] counts both.
 
-            xD = float(np.clip(y[1], 1e-8, 1 - 1e-8))  # total condenser: xD = y1
+        keep=False restores the original efficiencies afterwards, so single-tray
+        damage scans can all start from the same base solution. If the re-solve
+        raises, they are restored either way.
+        """
+        n = self.spec.n
+        updates = [(int(stage), float(e_new)) for stage, e_new in eff_updates.items()]
+        for k, _ in updates:
+            if not 1 <= k <= n:
+                raise ValueError(f"stage {k} outside 1..{n}")
 
-            fl = self.spec.flows()
-            L, V, Ls, Vs, B = fl["L"], fl["V"], fl["Ls"], fl["Vs"], fl["B"]
-            f = self.spec.f
+        if self._base is None:
+            self.simulate(return_type="array")
 
-            r = np.zeros(n + 1)
+        self._reset_stats()
+        eff_old = self.spec.eff.copy()
+        if self.spec.energy_balance:
+            # flows follow the profile, so the low-rank Jacobian update does not apply:
+            # warm-started Newton instead
+            try:
+                for k, e_new in updates:
+                    self.spec.eff[k - 1] = e_new
+                sol, info = self._newton(self._residual, self._base["u"])
+                if not info["converged"]:
+                    its = info["iters"]
+                    sol, info = self._newton(self._residual, self._cold_start())
+                    info["iters"] += its
+                info["rank"] = len(updates)
+                res = self._finish(sol, info, return_type, out)
+                if keep:
+                    self._base = {"u": sol, "J": info.get("jacobian"), "Jinv": None}
+                return res
+            except BaseException:
+                self.spec.eff[:] = eff_old
+                raise
+            finally:
+                if not keep:
+                    self.spec.eff[:] = eff_old
 
-            # stage-by-stage benzene component balances
-            for i in range(1, n + 1):
-                feed = self.spec.F * self.spec.zF if i == f else 0.0
+        base = self._base
+        u0 = base["u"]
+        x = np.clip(u0[:n], 1e-8, 1 - 1e-8)
+        xB = float(np.clip(u0[n], 1e-8, 1 - 1e-8))
 
-                # liquid entering from above
-                if i == 1:
-                    Lin = L
-                    xin = xD
-                else:
-                    Lin = L if (i - 1) < f else Ls
-                    xin = x[i - 2]
+        if base["J"] is None:
+            base["J"] = self.solver.jacobian(self._residual, u0, self._residual(u0))
+        if base["Jinv"] is None:
+            try:
+                base["Jinv"] = np.linalg.inv(base["J"])
+            except np.linalg.LinAlgError:
+                base["Jinv"] = np.linalg.pinv(base["J"])
 
-                # vapor entering from below
-                if i == n:
-                    Vin = Vs
-                    yin = y[n + 1]
-                else:
-                    Vin = V if (i + 1) <= f else Vs
-                    yin = y[i + 1]
+        # low-rank factors of J(eff_new) - J(eff_old) at the base point
+        y, _ = self._murphree(x, xB)
+        r_base = self._balances(x, xB, y)
+        _, dg, _, _ = self._vle_slopes(x, xB)
+        U, V = [], []
+        try:
+            for k, e_new in updates:
+                p, q = self._murphree_rank_one(k, e_new)
+                self.spec.eff[k - 1] = e_new
+                if not q.any():
+                    continue
+                y_p = y.copy()
+                y_p[1:] += p  # balances are linear in y: C p = r(y + p) - r(y)
+                U.append(self._balances(x, xB, y_p) - r_base)
+                V.append(q * dg)
 
-                # outflows from stage i
-                Lout = L if i < f else Ls
-                Vout = V if i <= f else Vs
+            Jinv = base["Jinv"]
+            if U:
+                U = np.array(U).T
+                V = np.array(V).T
+                W = Jinv @ U
+                K = np.linalg.inv(np.eye(U.shape[1]) + V.T @ W)
 
-                r[i - 1] = Lin * xin + Vin * yin + feed - (Lout * x[i - 1] + Vout * y[i])
+                def solve_linear(b):
+                    z = Jinv @ b
+                    return z - W @ (K @ (V.T @ z))
+            else:
+                def solve_linear(b):
+                    return Jinv @ b
 
-            # reboiler benzene balance
-            r[n] = Ls * x[n - 1] - (B * xB + Vs * y[n + 1])
+            sol, info = self.solver.solve_chord(self._residual, u0, solve_linear, max_iter=max_iter)
+            info["rank"] = len(U)
+            if not info["converged"]:
+                its = info["iters"]
+                sol, info = self._newton(self._residual, self._cold_start())
+                info["iters"] += its
+                info["rank"] = len(U)
+                info["fallback"] = True
 
-            return r
+            res = self._finish(sol, info, return_type, out)
 
-        sol, info = self.solver.solve(residual, x0)
+            if keep:
+                if info.get("fallback"):
+                    self._base = {"u": sol, "J": info.get("jacobian"), "Jinv": None}
+                elif len(U):
+                    self._base = {"u": sol, "J": base["J"] + U @ V.T, "Jinv": Jinv - W @ K @ V.T @ Jinv}
+                else:
+                    self._base = dict(base, u=sol)
+            return res
+        except BaseException:
+            self.spec.eff[:] = eff_old
+            raise
+        finally:
+            if not keep:
+                self.spec.eff[:] = eff_old
+
+    def _finish(self, sol, info, return_type, out):
+        n = self.spec.n
 
-        # build profile dataframe from converged solution
+        # profile from converged solution
         x = np.clip(sol[:n], 1e-8, 1 - 1e-8)
         xB = float(np.clip(sol[n], 1e-8, 1 - 1e-8))
+        y, T = self._murphree(x, xB)
+        xD = float(np.clip(y[1], 1e-8, 1 - 1e-8))
+
+        flows = self.spec.flows()
+        if self.spec.energy_balance:
+            # summary flows: reflux, top vapor, liquid to the reboiler, boilup
+            ef = self._energy_flows(x, xB, y, T)
+            flows.update(L=ef["L"][0], V=ef["V"][0], Ls=ef["L"][n], Vs=ef["V"][n], Qc=ef["Qc"], Qr=ef["Qr"])
+
+        res = ColumnResult(n) if out is None else out
+        if res.n != n:
+            raise ValueError(f"out holds {res.n} stages, spec has {n}")
+        res.fill(self.spec, x, y[1:n + 1], T[1:n + 1], xD, xB, flows, info)
+
+        if return_type == "array":
+            return res
+        return res.to_frame(), res.to_dict()
+
+    def _shoot(self, xD, x):
+        """
+        Lewis–Sorel march from the condenser down for a trial xD, filling x in place.
+        Stage i's balance gives y_{i+1} = a x_i + c; with the Murphree relation
+            y_i = (1 - E_i) (a x_i + c) + E_i y_eq(x_i)
+        x_i is found by Newton, started from the dew point of y_i. The reboiler
+        is an equilibrium stage, so xB is the dew point of y_{n+1}.
+
+        Returns (phi, xB, n_bubble) with phi the reboiler benzene balance. If the
+        march leaves (0, 1), phi is +inf (xD too low) or -inf (xD too high).
+        """
+        spec = self.spec
+        n, f = spec.n, spec.f
+        fl = self._flows()
+        L, V, Ls, Vs, B = fl["L"], fl["V"], fl["Ls"], fl["Vs"], fl["B"]
+
+        yi = xD
+        x_above = xD  # total condenser: reflux at xD
+        n_bubble = 0
+        for i in range(1, n + 1):
+            feed = spec.F * spec.zF if i == f else 0.0
+            Lin = L if (i - 1) < f else Ls
+            Vin = Vs if i == n else (V if (i + 1) <= f else Vs)
+            Lout = L if i < f else Ls
+            Vout = V if i <= f else Vs
+            E = float(np.clip(spec.eff[i - 1], 0.0, 1.0))
+
+            a = Lout / Vin
+            c = (Vout * yi - Lin * x_above - feed) / Vin
+
+            P = self._pressures(i - 1)
+            xi = self._dew_point(yi, P)
+            for _ in range(30):
+                y_eq, slope = self._bubble_point(xi, P)
+                n_bubble += 1
+                g = (1.0 - E) * (a * xi + c) + E * y_eq - yi
+                dx = -g / ((1.0 - E) * a + E * slope)
+                xi += dx
+                if not -0.5 < xi < 1.5 or abs(dx) < 1e-14:
+                    break
+
+            if not 0.0 < xi < 1.0:
+                return (np.inf if xi <= 0.0 else -np.inf), None, n_bubble
+            x[i - 1] = xi
+            yi = a * xi + c
+            x_above = xi
+
+        if not 0.0 < yi < 1.0:
+            return (np.inf if yi <= 0.0 else -np.inf), None, n_bubble
+        xB = self._dew_point(yi, self._pressures(n))
+        return Ls * x[n - 1] - (B * xB + Vs * yi), xB, n_bubble
+
+    def _solve_shooting(self, u_init=None, max_iter=80):
+        """
+        1-D root find on xD for the shooting residual: Illinois regula falsi on
+        the bracket, bisection while an end is a failed march (phi = +-inf).
+        """
+        n = self.spec.n
+        tol = 0.5 * self.solver.tol
+        x = np.empty(n)
+        lo, hi = 1e-9, 1.0 - 1e-12
+        phi_lo, phi_hi = np.inf, -np.inf
+        n_bubble = 0
+
+        if u_init is not None:
+            # warm start: xD guess from the old top tray, probed on both sides
+            x1 = float(np.clip(u_init[0], 1e-9, 1 - 1e-9))
+            xD0 = float(np.clip(self._bubble_point(x1, self._pressures(0))[0], lo, hi))
+            guesses = [xD0, min(xD0 + 1e-4, hi), max(xD0 - 1e-4, lo)]
+        else:
+            guesses = []
+
+        best = None
+        finite = []
+        side = 0
+        it = 0
+        for it in range(1, max_iter + 1):
+            if guesses:
+                xD = guesses.pop(0)
+                if not lo < xD < hi:
+                    continue
+            elif np.isfinite(phi_lo) and np.isfinite(phi_hi):
+                xD = (lo * phi_hi - hi * phi_lo) / (phi_hi - phi_lo)
+            elif len(finite) >= 2 and finite[-1][1] != finite[-2][1]:
+                # secant through the last two good marches, bisection if it leaves the bracket
+                (x1, p1), (x2, p2) = finite[-2], finite[-1]
+                xD = x2 - p2 * (x2 - x1) / (p2 - p1)
+                if not lo < xD < hi:
+                    xD = 0.5 * (lo + hi)
+            else:
+                xD = 0.5 * (lo + hi)
+
+            phi, xB, nb = self._shoot(xD, x)
+            n_bubble += nb
+            if np.isfinite(phi):
+                finite.append((xD, phi))
+            if np.isfinite(phi) and (best is None or abs(phi) < abs(best[0])):
+                best = (phi, np.append(x, xB))
+            if np.isfinite(phi) and abs(phi) < tol:
+                break
+
+            # phi decreases with xD: keep the root bracketed
+            if phi > 0:
+                lo, phi_lo = xD, phi
+                if side == 1 and np.isfinite(phi_hi):
+                    phi_hi *= 0.5  # Illinois: halve the stale end
+                side = 1
+            else:
+                hi, phi_hi = xD, phi
+                if side == -1 and np.isfinite(phi_lo):
+                    phi_lo *= 0.5
+                side = -1
+            if hi - lo < 1e-15:
+                break
+
+        if best is None:
+            return np.append(np.linspace(0.95, 0.05, n), 0.05), {
+                "converged": False, "iters": it, "res_norm": np.inf, "jacobian": None,
+                "method": "shooting", "n_bubble": n_bubble}
+
+        u = best[1]
+        res_norm = float(np.linalg.norm(self._residual(u), ord=2))
+        return u, {
+            "converged": res_norm < self.solver.tol,
+            "iters": it,
+            "res_norm": res_norm,
+            "jacobian": None,
+            "method": "shooting",
+            "n_bubble": n_bubble,
+        }
+
+    def _newton(self, fun, x0, deadline=None):
+        """
+        NewtonSolver.solve with the box-keeping update and, on the scalar thermo
+        path, inexact bubble points; the tolerance is back at BUBBLE_TOL afterwards.
+        """
+        forcing = self._forcing if self.inexact and self._model() is None else None
+        try:
+            return self.solver.solve(fun, x0, deadline=deadline, update=self._update, forcing=forcing)
+        finally:
+            self._bubble_tol, self._jac_x, self._trial = BUBBLE_TOL, None, None
+
+    def _forcing(self, err, u):
+        # the outer Newton tolerates a residual error err (flow units). A bubble point
+        # off by d mmHg shifts y_eq by about d / P, i.e. the balances by about V d / P
+        fl = self._flows()
+        tol = err * self.spec.P / max(fl["V"], fl["Vs"], 1e-12)
+        # (below BUBBLE_TOL too: near the solution V * BUBBLE_TOL / P can exceed the
+        # outer tol, and a warm-started solve only stops just under its tolerance)
+        self._bubble_tol = min(max(tol, BUBBLE_TOL_WARM), BUBBLE_TOL_MAX)
+        self._jac_x = np.clip(u[:self.spec.n + 1], 1e-8, 1 - 1e-8)
+        st = self._stages
+        if st is not None and np.array_equal(st["xs"], self._jac_x):
+            # a full evaluation at the new Jacobian point (the starting point): polish
+            # it like an accepted trial
+            self._trial = {"key": st["key"], "xs": st["xs"], "T": st["T"][1:], "n_cold": st["n_cold"]}
+        self._stages = None
+
+    def _reset_stats(self):
+        # bubble_solves: stage bubble points solved (cached stages are not);
+        # inner_iters: their Newton iterations; cache_saved: iterations of the stages
+        # reused from the base point, as cold solves to BUBBLE_TOL would have taken
+        # (cold counts taken at the base point); inexact_saved: iterations inexact
+        # mode saves against exact mode, i.e. warm and loose Jacobian columns and
+        # line-search trials instead of cold ones, minus the extra solves at each
+        # step's Jacobian point (0 in exact mode, negative when inexact costs more)
+        self.stats = {"bubble_solves": 0, "inner_iters": 0, "cache_saved": 0, "inexact_saved": 0}
+
+    def _update(self, u, du, alpha):
+        # Newton step kept inside the residual's clamp box: beyond it the fraction is
+        # frozen, its Jacobian column vanishes and Newton stalls on a singular system
+        n = self.spec.n
+        u = u + alpha * du
+        u[:n + 1] = np.clip(u[:n + 1], 1e-8, 1 - 1e-8)
+        return u
+
+    def _residual(self, u):
+        # unknowns: x1..xN, xB
+        n = self.spec.n
+        x = u[:n].copy()
+        xB = float(u[n])
+
+        # clamp to keep stable
+        x = np.clip(x, 1e-8, 1 - 1e-8)
+        xB = float(np.clip(xB, 1e-8, 1 - 1e-8))
+
+        y, T = self._murphree(x, xB)
+        if self.spec.energy_balance:
+            return self._energy_balances(x, xB, y, T)
+        return self._balances(x, xB, y)
+
+    def _design_residual(self, ua):
+        # unknowns: x1..xN, xB, free R or D; last equation: design spec (in flow units)
+        n = self.spec.n
+        self._free = self._clip_free(ua[n + 1])
+        x = np.clip(ua[:n], 1e-8, 1 - 1e-8)
+        xB = float(np.clip(ua[n], 1e-8, 1 - 1e-8))
+
+        y, T = self._murphree(x, xB)
+        r = self._energy_balances(x, xB, y, T) if self.spec.energy_balance else self._balances(x, xB, y)
+
+        spec = self.spec
+        d = spec.design
+        xD = float(np.clip(y[1], 1e-8, 1 - 1e-8))
+        if d.target == "xD":
+            e = spec.F * (xD - d.value)
+        elif d.target == "xB":
+            e = spec.F * (xB - d.value)
+        else:
+            e = self._operating()[1] * xD - d.value * spec.F * spec.zF
+        return np.append(r, e)
+
+    def _clip_free(self, value):
+        spec = self.spec
+        if spec.design.free == "R":
+            return float(max(value, 1e-6))
+        return float(np.clip(value, 1e-6 * spec.F, (1 - 1e-6) * spec.F))
+
+    def _set_free(self, value):
+        setattr(self.spec, self.spec.design.free, self._clip_free(value))
+
+    def _operating(self):
+        # (R, D) the residuals see: the spec's, with a design solve's free iterate
+        spec = self.spec
+        if self._free is None:
+            return spec.R, spec.D
+        if spec.design.free == "R":
+            return self._free, spec.D
+        return spec.R, self._free
+
+    def _balances(self, x, xB, y):
+        """
+        Stage and reboiler benzene balances for given liquid x, xB and vapor y
+        (y indexed 1..n+1 as returned by _murphree). Linear in y.
+        """
+        n = self.spec.n
+        xD = float(np.clip(y[1], 1e-8, 1 - 1e-8))  # total condenser: xD = y1
+
+        fl = self._flows()
+        L, V, Ls, Vs, B = fl["L"], fl["V"], fl["Ls"], fl["Vs"], fl["B"]
+        f = self.spec.f
+
+        r = np.zeros(n + 1)
+
+        # stage-by-stage benzene component balances
+        for i in range(1, n + 1):
+            feed = self.spec.F * self.spec.zF if i == f else 0.0
 
+            # liquid entering from above
+            if i == 1:
+                Lin = L
+                xin = xD
+            else:
+                Lin = L if (i - 1) < f else Ls
+                xin = x[i - 2]
+
+            # vapor entering from below
+            if i == n:
+                Vin = Vs
+                yin = y[n + 1]
+            else:
+                Vin = V if (i + 1) <= f else Vs
+                yin = y[i + 1]
+
+            # outflows from stage i
+            Lout = L if i < f else Ls
+            Vout = V if i <= f else Vs
+
+            r[i - 1] = Lin * xin + Vin * yin + feed - (Lout * x[i - 1] + Vout * y[i])
+
+        # reboiler benzene balance
+        r[n] = Ls * x[n - 1] - (B * xB + Vs * y[n + 1])
+
+        return r
+
+    def _energy_balances(self, x, xB, y, T):
+        """
+        Benzene balances as in _balances(), with the stage flows of
+        _energy_flows() for the current profile instead of constant molar overflow.
+        """
+        spec = self.spec
+        n = spec.n
+        fl = self._energy_flows(x, xB, y, T)
+        L, V = fl["L"], fl["V"]
+        xs = np.concatenate([[np.clip(y[1], 1e-8, 1 - 1e-8)], x])  # liquid entering tray i: xs[i-1]
+
+        r = np.empty(n + 1)
+        r[:n] = L[:n] * xs[:n] + V[1:] * y[2:] - L[1:] * x - V[:n] * y[1:n + 1]
+        r[spec.f - 1] += spec.F * spec.zF
+        r[n] = L[n] * x[n - 1] - (spec.F - self._operating()[1]) * xB - V[n] * y[n + 1]
+        return r
+
+    def _energy_flows(self, x, xB, y, T):
+        """
+        Stage flows from the energy balances at the given profile. An envelope
+        around the condenser and trays 1..i (with the feed from tray f on) gives
+        V_{i+1} - L_i = D (- F) and
+            L_i = (D h_D + Qc [- F h_F] - (D [- F]) h_V,i+1) / (h_V,i+1 - h_L,i),
+        Qc = V_1 (h_V,1 - h_D) for the total condenser with reflux R D.
+        Returns {"L": L_0 (reflux)..L_n, "V": V_1..V_{n+1} (boilup), "Qc", "Qr"};
+        duties in kJ/mol times the flow unit (MJ/h for kmol/h).
+        """
+        spec = self.spec
+        n, f = spec.n, spec.f
+        tab = self._enthalpy()
+        xD = float(np.clip(y[1], 1e-8, 1 - 1e-8))
+        hD = float(tab.liquid(xD, self._bubble_T(xD, self._pressures(0))))
+        hF = self._feed_enthalpy()
+        hL = tab.liquid(x, T[1:n + 1])   # trays 1..n
+        hV = tab.vapor(y[1:], T[1:])     # vapor leaving trays 1..n and the reboiler
+
+        R, D = self._operating()
+        L0 = R * D
+        Qc = (L0 + D) * (hV[0] - hD)
+        below = np.arange(1, n + 1) >= f
+        net = D - spec.F * below                    # V_{i+1} - L_i
+        H_net = D * hD + Qc - spec.F * hF * below   # enthalpy leaving the envelope at the top, net
+        L = (H_net - net * hV[1:]) / (hV[1:] - hL)
+        V = np.concatenate([[L0 + D], L + net])
+        hB = float(tab.liquid(xB, T[n + 1]))
+        Qr = D * hD + (spec.F - D) * hB + Qc - spec.F * hF
+        return {"L": np.concatenate([[L0], L]), "V": V, "Qc": float(Qc), "Qr": float(Qr)}
+
+    def _enthalpy(self):
+        model = self._model()
+        return enthalpy_table(("benzene", "toluene") if model is None else model.components)
+
+    def _bubble_T(self, x, P):
+        # bubble T of a single liquid (distillate, feed), leaving the model's stage warm start alone
+        model = self._model()
+        if model is None:
+            return y_benzene_equilibrium(x, P)[1]
+        xa = np.array([x])
+        return float(model.bubble(xa, P, T0=model.start_T(xa, P)).T[0])
+
+    def _feed_enthalpy(self):
+        """
+        h_F = h_L(bubble) + (1 - q) (h_V(dew) - h_L(bubble)) of the feed, the enthalpy
+        that matches its thermal condition q.
+        """
+        spec = self.spec
+        P = self._pressures(spec.f - 1)
+        key = (spec.zF, spec.q, P)
+        if key != self._hF_key:
+            tab = self._enthalpy()
+            model = self._model()
+            if model is None:
+                T_dew = x_benzene_from_y_dewpoint(spec.zF, P)[1]
+            else:
+                T_dew = float(model.dew(np.array([spec.zF]), P)[1][0])
+            h_liq = float(tab.liquid(spec.zF, self._bubble_T(spec.zF, P)))
+            h_vap = float(tab.vapor(spec.zF, T_dew))
+            self._hF_key, self._hF_val = key, h_liq + (1.0 - spec.q) * (h_vap - h_liq)
+        return self._hF_val
+
+    def stage_flows(self):
+        """
+        Liquid and vapor flows of the last solution: {"L": L_0 (reflux)..L_n,
+        "V": V_1..V_{n+1} (boilup)}, (n+1,) each; constant above and below the
+        feed under CMO. With energy_balance also the duties "Qc" and "Qr".
+        """
+        if self._base is None:
+            raise RuntimeError("call simulate() before stage_flows()")
+        n, f = self.spec.n, self.spec.f
+        if self.spec.energy_balance:
+            u = self._base["u"]
+            x = np.clip(u[:n], 1e-8, 1 - 1e-8)
+            xB = float(np.clip(u[n], 1e-8, 1 - 1e-8))
+            y, T = self._murphree(x, xB)
+            return self._energy_flows(x, xB, y, T)
+        fl = self._flows()
+        i = np.arange(n + 1)
+        return {"L": np.where(i < f, fl["L"], fl["Ls"]), "V": np.where(i + 1 <= f, fl["V"], fl["Vs"])}
+
+    def _flows(self):
+        # recomputed only when R, D, F or q change (design solves and dynamics move them)
+        s = self.spec
+        key = (*self._operating(), s.F, s.q)
+        if key != self._flows_key:
+            self._flows_key, self._flows_val = key, cmo_flows(*key)
+        return self._flows_val
+
+    def _murphree(self, x, xB):
+        """
+        y and T from bottom to top using Murphree vapor efficiencies.
+        Returns arrays of length n+2: index 1..n trays, n+1 reboiler vapor.
+
+        Stage results of the last full evaluation are kept as the base point:
+        a liquid that differs from it in one stage only (a finite-difference
+        Jacobian column) re-solves that stage's bubble point and reruns the
+        sweep from that stage upward, so a Jacobian costs O(n) bubble points
+        (with a VLE model, one batched call: see _moved_stage).
+        """
+        n = self.spec.n
+        xs = np.append(x, xB)
+        key = self._stage_key()
+        if self._jac_x is not None and self._stages is None:
+            # inexact outer step: its Jacobian point, converged, is the base
+            self._stages = self._polished_stages(self._jac_x, key)
+        base = self._stages
+        if base is not None and (base["key"] != key or base["xs"].size != xs.size):
+            base = None
+        moved = None if base is None else np.flatnonzero(xs != base["xs"])
+
+        if moved is not None and moved.size <= 1:
+            y, T = base["y"].copy(), base["T"].copy()
+            if moved.size:
+                k = int(moved[0])
+                if self._jac_x is not None:
+                    # warm from the base, which leaves an error proportional to the
+                    # move: solved to round-off so it cancels in the difference
+                    (g_k,), (T[k + 1],), its = self._equilibrium(xs[k:k + 1], BUBBLE_TOL_WARM, T[k + 1:k + 2], k)
+                    cold = base["n_cold"][k:k + 1]
+                elif self._model() is not None:
+                    g_k, T[k + 1] = self._moved_stage(base, xs, k)
+                    its, cold = None, None
+                else:
+                    # exact mode: cold, as a full evaluation would have solved it
+                    (g_k,), (T[k + 1],), its = self._equilibrium(xs[k:k + 1], stage=k)
+                    cold = None
+                # stage k + 1 (1-based) and every stage above it see the new vapor
+                E = np.clip(self.spec.eff, 0.0, 1.0).tolist()
+                g = base["g"].tolist()
+                g[k] = float(g_k)
+                yi = y[k + 2] if k < n else g[n]
+                if k == n:
+                    y[n + 1] = yi
+                for i in range(min(k + 1, n), 0, -1):
+                    yi = yi + E[i - 1] * (g[i - 1] - yi)
+                    y[i] = yi
+                self._count(1, its, cold, base["n_cold"].sum() - base["n_cold"][k])
+            else:
+                self._count(0, None, None, base["n_cold"].sum())
+            return y, T
+
+        if self._jac_x is not None:
+            # line-search trial of an inexact step: warm start from the base, only
+            # the accuracy the outer Newton asked for; kept in case it is accepted
+            T0 = None if base is None else base["T"][1:]
+            g, Teq, its = self._equilibrium(xs, self._bubble_tol, T0)
+            self._count(xs.size, its, None if base is None else base["n_cold"])
+            if base is not None:
+                self._trial = {"key": key, "xs": xs.copy(), "T": Teq, "n_cold": base["n_cold"]}
+            return self._sweep(g), np.concatenate([[0.0], Teq])
+
+        self._stages = base = self._full_stages(xs, key)
+        return base["y"].copy(), base["T"].copy()
+
+    def _moved_stage(self, base, xs, k):
+        """
+        (y_eq, T) of stage k moved alone from the base point, with a VLE model.
+        The first such evaluation at a base point solves the solver's +-h moves
+        of every stage (a finite-difference Jacobian) in one batched bubble()
+        from the base temperatures; other moves are solved on their own.
+        """
+        model = self._model()
+        m = base["xs"].size
+        if "fd" not in base:
+            xb = base["xs"]
+            h = self.solver.fd_step(xb)
+            moves = np.clip(np.concatenate([xb + h, xb - h]), 1e-8, 1 - 1e-8)
+            P = np.tile(np.broadcast_to(self._pressures(), (m,)), 2)
+            bp = model.bubble(moves, P, T0=np.tile(base["T"][1:], 2))
+            base["fd"] = (moves, bp.y, bp.T)
+        moves, g, T = base["fd"]
+        for j in (k, k + m):
+            if moves[j] == xs[k]:
+                return float(g[j]), float(T[j])
+        (g_k,), (T_k,), _ = self._equilibrium(xs[k:k + 1], T0=base["T"][k + 1:k + 2], stage=k)
+        return float(g_k), float(T_k)
+
+    def _stage_key(self):
+        # what the stage results depend on besides the liquid
+        s = self.spec
+        return (s.P, None if s.pressure is None else s.pressure.tobytes(), s.eff.tobytes(), id(self._model()))
+
+    def _full_stages(self, xs, key, polish=False):
+        """
+        Base point for _murphree: every stage solved cold (polish: then on to
+        round-off, for the warm starts of an inexact step).
+        """
+        g, Teq, its = self._equilibrium(xs)
+        # an inexact step's Jacobian point is an extra evaluation (exact mode reuses
+        # its line-search trial there), so none of it counts as saved
+        self._count(xs.size, its, np.zeros_like(its) if polish and its is not None else None)
+        n_cold = its if its is not None else np.zeros(xs.size, dtype=int)
+        if polish and its is not None:
+            g, Teq, extra = self._equilibrium(xs, BUBBLE_TOL_WARM, Teq)
+            self._count(0, extra, np.zeros_like(extra))
+        return {"key": key, "xs": xs.copy(), "g": g, "T": np.concatenate([[0.0], Teq]),
+                "y": self._sweep(g), "n_cold": n_cold}
+
+    def _polished_stages(self, xs, key):
+        """
+        Base point of an inexact step at its Jacobian point xs: polished to
+        round-off from the last evaluation there (the accepted line-search
+        trial), else solved cold first.
+        """
+        trial, self._trial = self._trial, None
+        if trial is None or trial["key"] != key or not np.array_equal(trial["xs"], xs):
+            return self._full_stages(xs, key, polish=True)
+        g, Teq, its = self._equilibrium(xs, BUBBLE_TOL_WARM, trial["T"])
+        # extra work against exact mode, like the polish in _full_stages
+        self._count(xs.size, its, np.zeros_like(its))
+        return {"key": key, "xs": xs.copy(), "g": g, "T": np.concatenate([[0.0], Teq]),
+                "y": self._sweep(g), "n_cold": trial["n_cold"]}
+
+    def _sweep(self, g):
+        # Murphree recursion from the reboiler (y_{n+1} = g_{n+1}) up to tray 1
+        n = self.spec.n
         y = np.zeros(n + 2)
-        T = np.zeros(n + 2)
-        y[n + 1], T[n + 1] = y_benzene_equilibrium(xB, self.spec.P)
+        # plain floats: the recurrence is sequential, so numpy scalars only add overhead
+        E = np.clip(self.spec.eff, 0.0, 1.0).tolist()
+        g = g.tolist()
+        yi = g[n]
+        y[n + 1] = yi
         for i in range(n, 0, -1):
-            y_eq, Ti = y_benzene_equilibrium(x[i - 1], self.spec.P)
-            T[i] = Ti
-            Ei = float(np.clip(self.spec.eff[i - 1], 0.0, 1.0))
-            y[i] = y[i + 1] + Ei * (y_eq - y[i + 1])
+            yi = yi + E[i - 1] * (g[i - 1] - yi)
+            y[i] = yi
+        return y
 
-        xD = float(np.clip(y[1], 1e-8, 1 - 1e-8))
-        fl = self.spec.flows()
-
-        df = pd.DataFrame({
-            "stage": list(range(1, n + 1)),
-            "x_bz": x,
-            "y_bz": y[1:n + 1],
-            "T_C": T[1:n + 1],
-            "eff": self.spec.eff,
-        })
-
-        summary = {
-            "converged": bool(info["converged"]),
-            "iters": int(info["iters"]),
-            "res_norm": float(info["res_norm"]),
-            "xD_bz": float(xD),
-            "xB_bz": float(xB),
-            "xB_tol": float(1 - xB),
-            "flows": fl,
-            "spec": {
-                "n_stages": self.spec.n,
-                "feed_stage": self.spec.f,
-                "P_mmHg": self.spec.P,
-                "F": self.spec.F,
-                "zF_bz": self.spec.zF,
-                "q": self.spec.q,
-                "D": self.spec.D,
-                "R": self.spec.R,
-            },
+    def _count(self, solved, its, cold=None, cached=0):
+        # stats of one residual evaluation: `solved` bubble points with iterations its
+        # (None with a VLE model), the iterations exact mode spends on those stages
+        # (None: as many as here) and the cold iterations of the stages reused from
+        # the base point
+        st = self.stats
+        if not st:
+            return
+        st["bubble_solves"] += solved
+        done = 0 if its is None else int(np.sum(its))
+        st["inner_iters"] += done
+        st["cache_saved"] += int(cached)
+        if cold is not None and its is not None:
+            st["inexact_saved"] += int(np.sum(cold)) - done
+
+    def _model(self):
+        """
+        The batched VLE model, or None for the scalar thermo path. A pressure
+        profile needs the (x, P)-vectorized kernel, so ideal benzene/toluene
+        is switched to IdealVLE for it.
+        """
+        if self.vle is None and self.spec.pressure is not None:
+            self.vle = IdealVLE(("benzene", "toluene"))
+        return self.vle
+
+    def _pressures(self, stage=None):
+        """
+        Pressure of every stage (trays 1..n, reboiler), or of one 0-based stage;
+        the scalar spec.P when the column is isobaric.
+        """
+        P = self.spec.pressure
+        if P is None:
+            return self.spec.P
+        return P if stage is None else float(P[stage])
+
+    def _equilibrium(self, xs, tol=BUBBLE_TOL, T0=None, stage=None):
+        """
+        Bubble-point y_eq and T for the liquid of every stage (trays, reboiler),
+        or of the one 0-based stage given in xs: one batched call with a VLE
+        model, else the scalar thermo functions, solved to tol (mmHg) from the
+        temperatures T0 when given. Returns (y_eq, T, Newton iterations per
+        stage, None with a model).
+        """
+        model = self._model()
+        if model is not None:
+            if stage is None:
+                bp = model.bubble(xs, self._pressures())
+            else:
+                # one stage, from T0 or cold: keeps the model's warm start for the full-column calls
+                P = self._pressures(stage)
+                bp = model.bubble(xs, P, T0=model.start_T(xs, P) if T0 is None else T0)
+            return bp.y, bp.T, None
+        y, T = np.empty(len(xs)), np.empty(len(xs))
+        its = np.empty(len(xs), dtype=int)
+        P = float(self._pressures())
+        for j, xj in enumerate(xs):
+            T[j], its[j] = bubble_temperature(xj, P, tol, None if T0 is None else T0[j])
+            y[j] = min(max(min(max(xj, 1e-9), 1 - 1e-9) * psat_mmHg("benzene", T[j]) / P, 1e-9), 1 - 1e-9)
+        return y, T, its
+
+    def _bubble_point(self, x, P):
+        # (y_eq, dy_eq/dx) at one liquid fraction, for the shooting march
+        model = self._model()
+        if model is not None:
+            bp = model.bubble(np.array([x]), P)
+            return float(bp.y[0]), float(bp.dy_dx[0])
+        y_eq, T = y_benzene_equilibrium(x, P)
+        return y_eq, bubble_slope(x, T, P)
+
+    def _dew_point(self, y, P):
+        # liquid fraction in equilibrium with vapor y
+        model = self._model()
+        if model is not None:
+            return float(model.dew(np.array([y]), P)[0][0])
+        return x_benzene_from_y_dewpoint(y, P)[0]
+
+    def _murphree_weights(self):
+        """
+        Clipped efficiencies with the equilibrium reboiler appended (E_{n+1} = 1).
+        """
+        return np.append(np.clip(self.spec.eff, 0.0, 1.0), 1.0)
+
+    def _murphree_rank_one(self, k, e_new):
+        """
+        The Murphree sweep is linear in the equilibrium values: y = M(E) y_eq with
+        M[i, j] = E_j * prod_{m=i}^{j-1} (1 - E_m) for j >= i.
+        Changing E_k only touches rows i <= k, and the change is rank one:
+        M_new - M_old = p q^T. Returns (p, q), both of length n+1.
+        """
+        n = self.spec.n
+        E = self._murphree_weights()
+        d = float(np.clip(e_new, 0.0, 1.0)) - E[k - 1]
+
+        p = np.zeros(n + 1)
+        p[k - 1] = 1.0
+        for i in range(k - 1, 0, -1):
+            p[i - 1] = p[i] * (1.0 - E[i - 1])
+
+        # row k+1 of M (columns k+1..n+1)
+        tail = E[k:]
+        row = tail * np.concatenate([[1.0], np.cumprod(1.0 - tail[:-1])])
+
+        q = np.zeros(n + 1)
+        q[k - 1] = d
+        q[k:] = -d * row
+        return p, q
+
+    def _vle_slopes(self, x, xB, h=1e-7):
+        """
+        Equilibrium y_eq and bubble T for every tray and the reboiler, with their
+        derivatives d/dx (central differences, analytic with a VLE model).
+        Returns (g, dg, T, dT), length n+1.
+        """
+        model = self._model()
+        if model is not None:
+            bp = model.bubble(np.append(x, xB), self._pressures())
+            return bp.y, bp.dy_dx, bp.T, bp.dT_dx
+        P = self.spec.P
+        m = self.spec.n + 1
+        g, dg, T, dT = np.empty(m), np.empty(m), np.empty(m), np.empty(m)
+        for j, xj in enumerate(np.append(x, xB)):
+            lo, hi = max(xj - h, 1e-9), min(xj + h, 1 - 1e-9)
+            y_lo, T_lo = y_benzene_equilibrium(lo, P)
+            y_hi, T_hi = y_benzene_equilibrium(hi, P)
+            g[j], T[j] = y_benzene_equilibrium(xj, P)
+            dg[j] = (y_hi - y_lo) / (hi - lo)
+            dT[j] = (T_hi - T_lo) / (hi - lo)
+        return g, dg, T, dT
+
+    def _murphree_products(self):
+        """
+        Pm[i, j] = prod_{m=i}^{j-1} (1 - E_m) for j >= i (zero below the diagonal),
+        so the Murphree sweep is y = M y_eq with M = Pm * E (column-wise).
+        """
+        E = self._murphree_weights()
+        m = E.size
+        Pm = np.zeros((m, m))
+        for i in range(m):
+            Pm[i, i:] = np.concatenate([[1.0], np.cumprod(1.0 - E[i:-1])])
+        return Pm
+
+    def _balance_matrices(self, x, xB, y, delta=1e-4):
+        """
+        The balances are linear in (x, xB) and in y: returns A = dr/du at fixed y
+        and C = dr/dy[1..n+1], from one-sided differences (exact up to round-off).
+        """
+        n = self.spec.n
+        r0 = self._balances(x, xB, y)
+
+        A = np.empty((n + 1, n + 1))
+        for j in range(n):
+            xp = x.copy()
+            xp[j] += delta
+            A[:, j] = (self._balances(xp, xB, y) - r0) / delta
+        A[:, n] = (self._balances(x, xB + delta, y) - r0) / delta
+
+        C = np.empty((n + 1, n + 1))
+        for j in range(n + 1):
+            yp = y.copy()
+            yp[j + 1] -= delta  # downwards, so xD = y1 never hits its upper clamp
+            C[:, j] = (r0 - self._balances(x, xB, yp)) / delta
+
+        return A, C
+
+    def jacobian(self, u=None):
+        """
+        Analytic Jacobian dr/du of the steady-state residual at u (default: the
+        last solution), J = A + C M diag(dy_eq/dx); (n+1) x (n+1).
+        """
+        if u is None:
+            if self._base is None:
+                raise RuntimeError("call simulate() or pass u")
+            u = self._base["u"]
+        return self._linearize(u)["J"]
+
+    def _linearize(self, u):
+        """
+        Pieces of the analytic linearization at u: equilibrium values and slopes,
+        the Murphree matrices, the balance matrices and J.
+        """
+        if self.spec.energy_balance:
+            raise ValueError("the analytic linearization assumes constant molar overflow (energy_balance=False)")
+        n = self.spec.n
+        x = np.clip(u[:n], 1e-8, 1 - 1e-8)
+        xB = float(np.clip(u[n], 1e-8, 1 - 1e-8))
+
+        g, dg, T, dT = self._vle_slopes(x, xB)
+        Pm = self._murphree_products()
+        M = Pm * self._murphree_weights()
+
+        y = np.zeros(n + 2)
+        y[1:] = M @ g
+        A, C = self._balance_matrices(x, xB, y)
+        dy_du = M * dg
+        return {
+            "g": g, "dg": dg, "T": T, "dT": dT, "y": y,
+            "Pm": Pm, "M": M, "A": A, "C": C, "dy_du": dy_du,
+            "J": A + C @ dy_du,
         }
 
-        return df, summary
+    def sensitivities(self):
+        """
+        Analytic sensitivities of the last solution to the tray efficiencies, the
+        feed composition and the pressure, from the implicit function theorem on
+        r(u, p) = 0:
+            du/dp = -J^-1 dr/dp,    dT/dp = diag(dT/dx) du/dp (+ dT/dP at fixed x)
+        with J = A + C M diag(dy_eq/dx) assembled from the linear balance structure.
+
+        Returns a dict:
+            "dT_deff"  (n, n)    tray temperatures vs tray efficiencies
+            "du_deff"  (n+1, n)  unknowns x1..xN, xB vs tray efficiencies
+            "dxD_deff" (n,)      distillate purity vs tray efficiencies
+            "dT_dzF"   (n,)      tray temperatures vs feed benzene fraction
+            "du_dzF"   (n+1,)
+            "dxD_dzF"  float
+            "dT_dP"    (n,)      tray temperatures vs pressure (whole profile shifted)
+            "du_dP"    (n+1,)
+            "dxD_dP"   float
+            "T"        (n,)      tray temperatures at the solution
+            "jacobian" (n+1, n+1)
+        """
+        if self._base is None:
+            raise RuntimeError("call simulate() before sensitivities()")
+
+        n = self.spec.n
+        lin = self._linearize(self._base["u"])
+        g, T, dT, y = lin["g"], lin["T"], lin["dT"], lin["y"]
+        Pm, C, dy_du, J = lin["Pm"], lin["C"], lin["dy_du"], lin["J"]
+
+        # direct effect of E_k on the sweep: dy/dE_k = Pm[:, k] (y_eq_k - y_{k+1})
+        dY = Pm[:, :n] * (g[:n] - y[2:])
+        # zF enters only the feed-stage balance, as F * zF
+        dr_dzF = np.zeros(n + 1)
+        dr_dzF[self.spec.f - 1] = self.spec.F
+        # pressure moves y_eq (and T) of every stage at fixed x: dy/dP = M dy_eq/dP
+        bp = (self._model() or IdealVLE(("benzene", "toluene"))).bubble(
+            np.clip(self._base["u"], 1e-8, 1 - 1e-8), self._pressures())
+        dy_dP = lin["M"] @ bp.dy_dP
+
+        du = -np.linalg.solve(J, np.column_stack([C @ dY, dr_dzF, C @ dy_dP]))
+        du_deff, du_dzF, du_dP = du[:, :n], du[:, n], du[:, n + 1]
+
+        return {
+            "dT_deff": dT[:n, None] * du_deff[:n],
+            "du_deff": du_deff,
+            "dxD_deff": dY[0] + dy_du[0] @ du_deff,
+            "dT_dzF": dT[:n] * du_dzF[:n],
+            "du_dzF": du_dzF,
+            "dxD_dzF": float(dy_du[0] @ du_dzF),
+            "dT_dP": dT[:n] * du_dP[:n] + bp.dT_dP[:n],
+            "du_dP": du_dP,
+            "dxD_dP": float(dy_dP[0] + dy_du[0] @ du_dP),
+            "T": T[:n],
+            "jacobian": J,
+        }
@@ -0,0 +1,152 @@
+"""
+Component property registry compiled into contiguous coefficient arrays.
+
+The registry maps names to Antoine constants (seeded from thermo.ANTOINE:
+benzene, toluene, ethylbenzene, the xylenes, ...). compile(names) returns a
+ComponentSet whose constants are (c,) arrays in the given order, so vapor
+pressures, K-values and bubble points of all components on all stages are
+single broadcast operations over (stage, component) arrays:
+
+    comps = REGISTRY.compile(["benzene", "toluene", "p-xylene"])
+    Y, T = comps.bubble(X, P)            # X: (m, c) liquid, one row per stage
+"""
+
+import numpy as np
+
+from .thermo import ANTOINE
+
+LN10 = np.log(10.0)
+X_MIN = 0.0  # trace components reach 1e-40 and below; only negatives are clipped
+
+
+class ComponentRegistry:
+    """
+    Named Antoine constants (log10 P[mmHg] = A - B / (C + T[°C])).
+    """
+
+    def __init__(self, antoine=None):
+        self._antoine = dict(ANTOINE if antoine is None else antoine)
+
+    def register(self, name, A, B, C):
+        self._antoine[name] = (float(A), float(B), float(C))
+        return self
+
+    def __contains__(self, name):
+        return name in self._antoine
+
+    @property
+    def names(self):
+        return tuple(self._antoine)
+
+    def compile(self, names):
+        """
+        ComponentSet for the given components, in that order.
+        """
+        names = list(names)
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate component names")
+        missing = [n for n in names if n not in self._antoine]
+        if missing:
+            raise ValueError(f"unknown components {missing}; register() them first")
+        coeffs = np.array([self._antoine[n] for n in names], dtype=float)
+        return ComponentSet(names, coeffs[:, 0], coeffs[:, 1], coeffs[:, 2])
+
+
+REGISTRY = ComponentRegistry()
+
+
+class ComponentSet:
+    """
+    Ordered components with (c,) coefficient arrays. Stage arrays are (m, c):
+    one row per stage, one column per component.
+    """
+
+    def __init__(self, names, A, B, C):
+        self.names = tuple(names)
+        self.A = np.ascontiguousarray(A, dtype=float)
+        self.B = np.ascontiguousarray(B, dtype=float)
+        self.C = np.ascontiguousarray(C, dtype=float)
+        self._lnA = LN10 * self.A
+        self._lnB = LN10 * self.B
+        self._T_last = None  # warm start for the next bubble() of the same shape
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def boiling_points(self, P):
+        """
+        Normal boiling points (°C) at pressure P, (c,).
+        """
+        return self.B / (self.A - np.log10(P)) - self.C
+
+    def ln_psat(self, T):
+        """
+        ln Psat and d ln Psat / dT for every stage temperature T (m,): (m, c) each.
+        """
+        d = self.C + np.asarray(T, dtype=float)[..., None]
+        return self._lnA - self._lnB / d, self._lnB / d ** 2
+
+    def K(self, T, P):
+        """
+        Raoult K-values Psat / P, (m, c).
+        """
+        return np.exp(self.ln_psat(T)[0]) / np.asarray(P, dtype=float)[..., None]
+
+    def bubble(self, X, P, derivatives=False, tol=1e-10, max_iter=50, T0=None):
+        """
+        Bubble points of every stage in one vectorized Newton solve on
+        ln(sum_j x_j Psat_j(T)) = ln P (rows of X are normalized first).
+        Returns (Y, T), plus with derivatives=True the blocks G (m, c, c),
+        G[i, j, k] = dy_ij / dx_ik, and dT_dX (m, c).
+
+        Starts from the temperatures of the previous call of the same shape, or
+        from T0 (m,) when given; such a call leaves that warm start alone.
+        """
+        X = np.clip(np.asarray(X, dtype=float), X_MIN, None)
+        m = X.shape[0]
+        P = np.broadcast_to(np.asarray(P, dtype=float), (m,))
+        s = X.sum(axis=1)
+        Xh = X / s[:, None]
+
+        if T0 is not None:
+            T = np.array(np.broadcast_to(T0, (m,)), dtype=float)
+        else:
+            T = self._T_last
+            if T is None or T.shape != (m,):
+                T = Xh @ self.boiling_points(P.mean())
+        lnP = np.log(P)
+        for _ in range(max_iter):
+            lnps, dlnps = self.ln_psat(T)
+            k = Xh * np.exp(lnps)
+            S = k.sum(axis=1)
+            S_T = (k * dlnps).sum(axis=1)
+            step = -(np.log(S) - lnP) * S / S_T
+            if np.all(np.abs(step) < tol):
+                # take the last (tiny) step to first order, so Y carries no T round-off
+                T = T + step
+                k *= 1.0 + dlnps * step[:, None]
+                S = k.sum(axis=1)
+                break
+            T = T + np.clip(step, -25.0, 25.0)
+        if T0 is None:
+            self._T_last = T
+
+        Y = k / S[:, None]
+        if not derivatives:
+            return Y, T
+
+        # T(x): sum_j xh_j Psat_j = P with xh = x / sum(x)  =>  dT/dx_k = -(Psat_k - P) / (s S_T)
+        ps = np.exp(lnps)
+        dT_dX = -(ps - S[:, None]) / (s * S_T)[:, None]
+        # y_j = xh_j Psat_j / P
+        c = X.shape[1]
+        G = (np.eye(c)[None] - Xh[:, :, None]) * (ps / s[:, None])[:, :, None]
+        G += (k * dlnps)[:, :, None] * dT_dX[:, None, :]
+        G /= S[:, None, None]
+        return Y, T, G, dT_dX
+
+    def __repr__(self):
+        return f"ComponentSet{self.names}"
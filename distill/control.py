@@ -0,0 +1,458 @@
+"""
+Closed-loop control studies: PI loops (and a PI cascade) around the column.
+
+Every dt a controller reads the plant's measurements and sets the manipulated
+variable (by default the reflux flow L at constant boilup, so D = V - L), which
+is then held while the plant advances to the next sample:
+
+    plant="dynamic"        DynamicColumn (tray holdups, BDF2) between samples
+    plant="quasi-steady"   one steady-state solve per sample, warm-started from
+                           the last, seen through a first-order lag tau that
+                           stands in for the column's composition dynamics
+
+Disturbances are the step / ramp schedules of distill.dynamics. Measurements
+are named "xD", "xB" or "T<k>" (temperature of tray k, from the top).
+
+    pi = PIController("T8", kp=-5.0, ti=0.5, u_min=50.0, u_max=170.0)   # L in kmol/h
+    run = run_loop(ColumnSpec(), pi, 10.0, disturbances=[step("zF", 0.5, 0.45)])
+    run["metrics"]          # iae, ise, max_dev, settling_time
+    df = tune(ColumnSpec(), pi, tuning_grid(kp=[-2.0, -5.0, -10.0], ti=[0.25, 0.5, 1.0]),
+              10.0, disturbances=[step("zF", 0.5, 0.45)], max_workers=4)
+
+tune() solves the initial steady state once and starts every tuning from it.
+"""
+
+import copy
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .column import ColumnSpec, DistillationColumn
+from .dynamics import DISTURBANCE_FIELDS, DynamicColumn
+
+PLANTS = ("dynamic", "quasi-steady")
+# manipulated variables: a spec field a disturbance may drive, or "L", the reflux
+# flow with the boilup V held (LV control: the drum level then sets D = V - L)
+MV_FIELDS = DISTURBANCE_FIELDS + ("L",)
+
+
+def _measure(name, meas):
+    if name in ("xD", "xB"):
+        return float(meas[name])
+    return float(meas["T"][int(name[1:]) - 1])
+
+
+def _check_pv(name, n):
+    if name in ("xD", "xB"):
+        return
+    if not (name.startswith("T") and name[1:].isdigit() and 1 <= int(name[1:]) <= n):
+        raise ValueError(f"measurement {name!r}: use 'xD', 'xB' or 'T<k>' with k in 1..{n}")
+
+
+class PIController:
+    """
+    Positional PI on measurement pv with back-calculation anti-windup:
+
+        v = bias + kp e + I,   e = setpoint - pv,   u = clip(v, u_min, u_max)
+        dI/dt = kp e / ti + (u - v) / tt
+
+    so the integral follows the clipped output (time constant tt, default ti)
+    instead of winding up while u sits on a limit. kp carries the sign: kp < 0
+    when a larger output lowers pv (reflux against a tray temperature).
+    setpoint / bias None: the plant's pv / manipulated value at the start of a
+    run, so the loop starts at rest.
+    """
+
+    TUNING = ("kp", "ti", "tt", "setpoint", "bias", "u_min", "u_max")
+
+    def __init__(self, pv, kp, ti, setpoint=None, bias=None, u_min=-math.inf, u_max=math.inf, tt=None):
+        if not ti > 0.0:
+            raise ValueError("ti must be positive")
+        if tt is not None and not tt > 0.0:
+            raise ValueError("tt must be positive")
+        if not u_min < u_max:
+            raise ValueError("u_min must be below u_max")
+        self.pv = pv
+        self.kp = float(kp)
+        self.ti = float(ti)
+        self.tt = None if tt is None else float(tt)
+        self.setpoint = None if setpoint is None else float(setpoint)
+        self.bias = None if bias is None else float(bias)
+        self.u_min = float(u_min)
+        self.u_max = float(u_max)
+        self.reset(0.0, 0.0)
+
+    def check(self, n):
+        _check_pv(self.pv, n)
+
+    def reset(self, pv, u):
+        """
+        Start a run at measurement pv and output u.
+        """
+        self.sp = pv if self.setpoint is None else self.setpoint
+        self.u0 = u if self.bias is None else self.bias
+        self.integral = 0.0
+        self.last = {"pv": pv, "sp": self.sp}
+
+    def start(self, meas, u):
+        self.reset(_measure(self.pv, meas), u)
+
+    def update(self, meas, dt, setpoint=None):
+        """
+        Output for the next dt from the measurements (setpoint overrides the
+        controller's own, e.g. from a cascade's outer loop).
+        """
+        pv = _measure(self.pv, meas)
+        sp = self.sp if setpoint is None else setpoint
+        e = sp - pv
+        v = self.u0 + self.kp * e + self.integral
+        u = min(max(v, self.u_min), self.u_max)
+        self.integral += dt * (self.kp * e / self.ti + (u - v) / (self.ti if self.tt is None else self.tt))
+        self.last = {"pv": pv, "sp": sp}
+        return u
+
+    def with_tuning(self, **params):
+        """
+        Copy with some of TUNING changed, e.g. pi.with_tuning(kp=-1.0, ti=0.5).
+        """
+        bad = set(params) - set(self.TUNING)
+        if bad:
+            raise ValueError(f"unknown tuning parameters {sorted(bad)}; use {self.TUNING}")
+        kw = {k: getattr(self, k) for k in self.TUNING}
+        kw.update(params)
+        return type(self)(self.pv, **kw)
+
+    def __repr__(self):
+        return f"PIController({self.pv!r}, kp={self.kp:g}, ti={self.ti:g})"
+
+
+class CascadeController:
+    """
+    Outer PI (e.g. on xD) setting the setpoint of an inner PI (e.g. on a tray
+    temperature) that moves the plant; the outer loop runs every `every`
+    inner samples, and its u_min / u_max bound the inner setpoint. Tuning
+    parameters are prefixed: with_tuning(outer_kp=..., inner_ti=...).
+    """
+
+    def __init__(self, outer, inner, every=1):
+        if int(every) < 1:
+            raise ValueError("every must be at least 1")
+        self.outer = outer
+        self.inner = inner
+        self.every = int(every)
+        self.last = {}
+
+    @property
+    def pv(self):
+        return self.outer.pv
+
+    def check(self, n):
+        self.outer.check(n)
+        self.inner.check(n)
+
+    def start(self, meas, u):
+        self.inner.start(meas, u)
+        # the outer loop's output is the inner setpoint, at rest at its start value
+        outer_pv = _measure(self.outer.pv, meas)
+        self.outer.reset(outer_pv, self.inner.sp)
+        self._sp_inner = self.inner.sp
+        self._k = 0
+        self.last = {"pv": outer_pv, "sp": self.outer.sp, "pv_inner": self.inner.last["pv"],
+                     "sp_inner": self._sp_inner}
+
+    def update(self, meas, dt):
+        if self._k % self.every == 0:
+            self._sp_inner = self.outer.update(meas, dt * self.every)
+        self._k += 1
+        u = self.inner.update(meas, dt, setpoint=self._sp_inner)
+        self.last = {"pv": self.outer.last["pv"], "sp": self.outer.last["sp"],
+                     "pv_inner": self.inner.last["pv"], "sp_inner": self._sp_inner}
+        return u
+
+    def with_tuning(self, **params):
+        split = {"outer": {}, "inner": {}}
+        for key, value in params.items():
+            loop, _, name = key.partition("_")
+            if loop not in split or not name:
+                raise ValueError(f"cascade tuning parameter {key!r}: use outer_<name> or inner_<name>")
+            split[loop][name] = value
+        return type(self)(self.outer.with_tuning(**split["outer"]),
+                          self.inner.with_tuning(**split["inner"]), every=self.every)
+
+    def __repr__(self):
+        return f"CascadeController(outer={self.outer!r}, inner={self.inner!r})"
+
+
+def tuning_grid(**axes):
+    """
+    Every combination of the given tuning values as a list of dicts, e.g.
+    tuning_grid(kp=[-0.5, -1.0], ti=[0.5, 1.0]) -> 4 tunings for tune().
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[k] for k in names))]
+
+
+# ------------------------------------------------------------------ plants
+
+def _set_fields(spec, base, disturbances, t):
+    for name in DISTURBANCE_FIELDS:
+        setattr(spec, name, getattr(base, name))
+    for d in disturbances:
+        setattr(spec, d.field, d(t, getattr(spec, d.field)))
+
+
+def _mv_value(spec, mv):
+    return spec.R * spec.D if mv == "L" else float(getattr(spec, mv))
+
+
+def _set_mv(spec, mv, value, V):
+    if mv != "L":
+        setattr(spec, mv, value)
+        return
+    # the valve cannot take more than the boilup: D stays positive
+    L = min(max(value, 0.0), (1.0 - 1e-6) * V)
+    spec.D = V - L
+    spec.R = L / spec.D
+
+
+def _measurements(res):
+    return {"xD": float(res.xD), "xB": float(res.xB), "T": np.array(res.T)}
+
+
+class _QuasiSteadyPlant:
+    def __init__(self, spec, disturbances, mv, tau):
+        self.base = ColumnSpec(**spec.to_dict())
+        self.col = DistillationColumn(ColumnSpec(**spec.to_dict()))
+        self.disturbances = disturbances
+        self.mv = mv
+        self.V = (spec.R + 1.0) * spec.D
+        self.tau = float(tau)
+        self.failures = 0
+
+    def initial(self, t0):
+        _set_fields(self.col.spec, self.base, self.disturbances, t0)
+        res = self.col.simulate(return_type="array")
+        if not res.converged:
+            raise RuntimeError("initial steady state did not converge")
+        return self.col.solution, _measurements(res)
+
+    def start(self, state):
+        self.u, meas = state
+        self.meas = {k: copy.copy(v) for k, v in meas.items()}
+        return self.meas
+
+    def advance(self, t, t_new, value):
+        _set_mv(self.base, self.mv, value, self.V)
+        _set_fields(self.col.spec, self.base, self.disturbances, t_new)
+        res = self.col.simulate(x_init=self.u, return_type="array")
+        if not res.converged:
+            res = self.col.simulate(return_type="array")
+        if res.converged:
+            self.u = self.col.solution
+            ss = _measurements(res)
+        else:
+            # keep the last steady state, the loop sees no change this sample
+            self.failures += 1
+            ss = self.meas
+        a = 1.0 if self.tau <= 0.0 else -math.expm1(-(t_new - t) / self.tau)
+        self.meas = {k: self.meas[k] + a * (ss[k] - self.meas[k]) for k in ss}
+        return self.meas
+
+
+class _DynamicPlant:
+    def __init__(self, spec, disturbances, mv, holdup, reboiler_holdup, drum_holdup):
+        self.dyn = DynamicColumn(ColumnSpec(**spec.to_dict()), holdup=holdup, reboiler_holdup=reboiler_holdup,
+                                 drum_holdup=drum_holdup, disturbances=disturbances)
+        self.mv = mv
+        self.V = (spec.R + 1.0) * spec.D
+        self.failures = 0
+        self.integrator = {"n_steps": 0, "n_rejected": 0, "n_rhs": 0}
+
+    def initial(self, t0):
+        z, res = self.dyn.steady_state(t0)
+        if not res.converged:
+            raise RuntimeError("initial steady state did not converge")
+        return z, _measurements(res)
+
+    def start(self, state):
+        self.z, meas = state
+        self.z = self.z.copy()
+        return meas
+
+    def advance(self, t, t_new, value):
+        _set_mv(self.dyn.spec, self.mv, value, self.V)
+        out = self.dyn.run(t_new, t0=t, z0=self.z, h0=min(1e-3, (t_new - t) / 4.0), t_eval=[t_new])
+        n = self.dyn.spec.n
+        self.z = np.append(out["x"][-1], out["xB"][-1])
+        if self.dyn.drum:
+            self.z = np.append(self.z, out["xD"][-1])
+        for k in self.integrator:
+            self.integrator[k] += out["stats"][k]
+        return {"xD": float(out["xD"][-1]), "xB": float(out["xB"][-1]), "T": out["T"][-1, :n].copy()}
+
+
+def _plant(spec, disturbances, mv, plant, tau, holdup, reboiler_holdup, drum_holdup):
+    if plant not in PLANTS:
+        raise ValueError(f"plant must be one of {PLANTS}")
+    mv = "R" if mv == "reflux_ratio" else mv
+    if mv not in MV_FIELDS:
+        raise ValueError(f"mv must be one of {MV_FIELDS}")
+    moved = ("R", "D") if mv == "L" else (mv,)
+    if any(d.field in moved for d in disturbances):
+        raise ValueError(f"the manipulated variable {mv} sets {'/'.join(moved)}, which cannot also be disturbed")
+    if plant == "dynamic":
+        return _DynamicPlant(spec, disturbances, mv, holdup, reboiler_holdup, drum_holdup)
+    return _QuasiSteadyPlant(spec, disturbances, mv, tau)
+
+
+# ----------------------------------------------------------------- metrics
+
+def loop_metrics(t, pv, sp, t_start=None, band=0.02):
+    """
+    Integrated and peak error of pv against sp from t_start (default t[0]):
+    iae = int |e| dt, ise = int e^2 dt (trapezoid), max_dev = max |e|, and
+    settling_time: time from t_start until |e| stays within band * max_dev
+    (None if it is still outside at the end).
+    """
+    t = np.asarray(t, dtype=float)
+    e = np.asarray(pv, dtype=float) - np.asarray(sp, dtype=float)
+    t_start = t[0] if t_start is None else float(t_start)
+    keep = t >= t_start
+    t, e = t[keep], e[keep]
+    dt = np.diff(t)
+    a = np.abs(e)
+    max_dev = float(a.max()) if a.size else 0.0
+    out = np.flatnonzero(a > band * max_dev)
+    if max_dev == 0.0 or out.size == 0:
+        settling = 0.0
+    elif out[-1] == a.size - 1:
+        settling = None
+    else:
+        settling = float(t[out[-1] + 1] - t_start)
+    return {
+        "iae": float(np.sum(0.5 * (a[1:] + a[:-1]) * dt)),
+        "ise": float(np.sum(0.5 * (e[1:] ** 2 + e[:-1] ** 2) * dt)),
+        "max_dev": max_dev,
+        "settling_time": settling,
+    }
+
+
+# ------------------------------------------------------------------ runner
+
+def run_loop(spec, controller, t_end, dt=0.05, disturbances=(), mv="L", plant="dynamic", tau=0.5,
+             holdup=1.0, reboiler_holdup=10.0, drum_holdup=None, band=0.02, initial=None):
+    """
+    Simulate the closed loop from the steady state of spec at t = 0 to t_end,
+    sampling every dt (same time unit as the flows, h with kmol/h).
+
+    mv: what the controller moves: "L" (reflux flow at the spec's boilup V,
+    D = V - L), or a spec field R, D, F, q or zF. It is not disturbed.
+    plant / tau: "dynamic" (holdups as in DynamicColumn) or "quasi-steady"
+    with measurement lag tau. initial: state from a previous run's
+    "initial" (same spec, plant, t = 0) to skip the first steady-state solve.
+
+    Returns a dict with "t", "u" (manipulated value), "pv", "sp" (and
+    "pv_inner", "sp_inner" for a cascade), "xD", "xB" per sample; "metrics"
+    from loop_metrics() after the first disturbance; "initial"; and "stats"
+    (samples, plant failures, wall time, and the integrator's steps).
+    """
+    wall0 = time.perf_counter()
+    if not dt > 0.0 or not t_end > dt:
+        raise ValueError("need 0 < dt < t_end")
+    disturbances = list(disturbances)
+    controller.check(spec.n)
+    p = _plant(spec, disturbances, mv, plant, tau, holdup, reboiler_holdup, drum_holdup)
+    if initial is None:
+        initial = p.initial(0.0)
+    meas = p.start(initial)
+
+    n_samples = int(round(t_end / dt))
+    ts = np.linspace(0.0, n_samples * dt, n_samples + 1)
+    controller.start(meas, _mv_value(spec, p.mv))
+    trace = {k: [] for k in controller.last}
+    us, xD, xB = [], [], []
+
+    for k in range(n_samples + 1):
+        # u is held from sample k to k + 1 (the last one is only recorded)
+        u = controller.update(meas, dt)
+        for name, v in controller.last.items():
+            trace[name].append(v)
+        us.append(u)
+        xD.append(meas["xD"])
+        xB.append(meas["xB"])
+        if k < n_samples:
+            meas = p.advance(ts[k], ts[k + 1], u)
+
+    out = {"t": ts, "u": np.array(us), "xD": np.array(xD), "xB": np.array(xB)}
+    out.update({name: np.array(v) for name, v in trace.items()})
+    t_start = min((d.start for d in disturbances), default=0.0)
+    out["metrics"] = loop_metrics(ts, out["pv"], out["sp"], t_start=t_start, band=band)
+    out["initial"] = initial
+    out["stats"] = {"samples": n_samples, "plant_failures": p.failures, "wall_s": time.perf_counter() - wall0}
+    if plant == "dynamic":
+        out["stats"].update(p.integrator)
+    return out
+
+
+def _run_chunk(spec_dict, controller, tunings, t_end, loop_kw):
+    spec = ColumnSpec(**spec_dict)
+    rows = []
+    for i, params in tunings:
+        try:
+            run = run_loop(spec, controller.with_tuning(**params), t_end, **loop_kw)
+            m = run["metrics"]
+            rows.append((i, dict(m, u_travel=float(np.abs(np.diff(run["u"])).sum()),
+                                 plant_failures=run["stats"]["plant_failures"], error=None)))
+        except Exception as exc:  # report per-tuning failures, keep the batch going
+            rows.append((i, {"error": f"{type(exc).__name__}: {exc}"}))
+    return rows
+
+
+def tune(spec, controller, tunings, t_end, max_workers=1, chunks_per_worker=4,
+         executor_factory=ProcessPoolExecutor, **loop_kw):
+    """
+    Run the loop once per tuning (dicts of controller.with_tuning() keywords,
+    e.g. from tuning_grid()) and return a DataFrame: the tuning parameters,
+    then iae, ise, max_dev, settling_time (NaN if unsettled), u_travel (total
+    movement of the manipulated variable), plant_failures and error.
+
+    The initial steady state is solved once here and shared by every run;
+    loop_kw go to run_loop(). max_workers > 1 (None: one per CPU) splits the
+    tunings over worker processes.
+    """
+    import pandas as pd
+
+    tunings = [dict(p) for p in tunings]
+    for params in tunings:
+        controller.with_tuning(**params)   # fail on bad parameter names up front
+    loop_kw = dict(loop_kw)
+    controller.check(spec.n)
+    disturbances = list(loop_kw.get("disturbances", ()))
+    p = _plant(spec, disturbances, loop_kw.get("mv", "L"), loop_kw.get("plant", "dynamic"),
+               loop_kw.get("tau", 0.5), loop_kw.get("holdup", 1.0), loop_kw.get("reboiler_holdup", 10.0),
+               loop_kw.get("drum_holdup"))
+    loop_kw["initial"] = p.initial(0.0)
+    loop_kw["disturbances"] = disturbances
+
+    jobs = list(enumerate(tunings))
+    spec_dict = spec.to_dict()
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        rows = _run_chunk(spec_dict, controller, jobs, t_end, loop_kw)
+    else:
+        n_chunks = max(1, min(len(jobs), max_workers * chunks_per_worker))
+        bounds = np.linspace(0, len(jobs), n_chunks + 1).astype(int)
+        with executor_factory(max_workers=max_workers) as pool:
+            futs = [pool.submit(_run_chunk, spec_dict, controller, jobs[a:b], t_end, loop_kw)
+                    for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+            rows = [row for fut in futs for row in fut.result()]
+    rows.sort(key=lambda row: row[0])
+
+    df = pd.DataFrame([dict(tunings[i], **m) for i, m in rows])
+    if "settling_time" in df:
+        df["settling_time"] = df["settling_time"].astype(float)
+    return df
@@ -0,0 +1,331 @@
+"""
+Dynamic tray-holdup simulation for upset conditions.
+
+Adds constant liquid holdups to the steady-state benzene balances of
+DistillationColumn (constant molar overflow, flows follow the spec instantly):
+
+    M_i dx_i/dt = r_i(x, xB; spec(t))     trays and reboiler
+    M_D dxD/dt  = V y_1 - (L + D) xD      optional reflux drum
+
+r is the steady-state residual, so a steady state is a zero of the right-hand
+side and the run starts from simulate() at t0. Holdups are in the flow unit
+times the time unit (kmol with kmol/h flows, t in h).
+
+The system is stiff (tray time constants M_i / L against the column's slow
+composition drift), so it is integrated with variable-step BDF2 and a
+simplified Newton corrector: the iteration matrix I - beta J is inverted once
+and reused across steps while the step size holds and Newton converges; the
+analytic Jacobian is only refreshed when Newton slows down.
+"""
+
+import time
+
+import numpy as np
+
+from .column import ColumnSpec, DistillationColumn
+
+# spec fields a disturbance may drive ("reflux_ratio" is accepted for R)
+DISTURBANCE_FIELDS = ("F", "zF", "D", "R", "q")
+
+
+class Disturbance:
+    """
+    Time profile of one spec field: a step at `start`, or a linear ramp from
+    `start` to `end`, from the field's base value to `value`.
+    """
+
+    def __init__(self, field, start, value, end=None):
+        field = "R" if field == "reflux_ratio" else field
+        if field not in DISTURBANCE_FIELDS:
+            raise ValueError(f"field must be one of {DISTURBANCE_FIELDS}")
+        if end is not None and end <= start:
+            raise ValueError("ramp end must be after start")
+        self.field = field
+        self.start = float(start)
+        self.end = None if end is None else float(end)
+        self.value = float(value)
+
+    def __call__(self, t, base):
+        if t <= self.start:
+            return base
+        if self.end is None or t >= self.end:
+            return self.value
+        return base + (self.value - base) * (t - self.start) / (self.end - self.start)
+
+    @property
+    def breakpoints(self):
+        return (self.start,) if self.end is None else (self.start, self.end)
+
+    def __repr__(self):
+        if self.end is None:
+            return f"step({self.field!r}, at={self.start:g}, value={self.value:g})"
+        return f"ramp({self.field!r}, start={self.start:g}, end={self.end:g}, value={self.value:g})"
+
+
+def step(field, at, value):
+    return Disturbance(field, at, value)
+
+
+def ramp(field, start, end, value):
+    return Disturbance(field, start, value, end=end)
+
+
+class DynamicColumn:
+    """
+    Parameters
+    ----------
+    spec : ColumnSpec
+        Column at t = 0 (disturbances move F, zF, D, R, q from these values).
+    holdup : float or array
+        Tray liquid holdup(s) M_i.
+    reboiler_holdup : float
+        Reboiler liquid holdup.
+    drum_holdup : float, optional
+        Reflux drum holdup; None treats the condenser as holdup-free (xD = y1).
+    disturbances : list of Disturbance
+    rtol, atol : float
+        Local error tolerances on the mole fractions.
+    """
+
+    def __init__(self, spec: ColumnSpec, holdup=1.0, reboiler_holdup=10.0, drum_holdup=None,
+                 disturbances=(), rtol=1e-4, atol=1e-6):
+        self.spec = spec
+        self.col = DistillationColumn(ColumnSpec(**spec.to_dict()))
+
+        n = spec.n
+        hold = np.broadcast_to(np.asarray(holdup, dtype=float), (n,))
+        self.drum = drum_holdup is not None
+        self.M = np.concatenate([hold, [reboiler_holdup]] + ([[drum_holdup]] if self.drum else []))
+        if np.any(self.M <= 0):
+            raise ValueError("holdups must be positive")
+
+        self.disturbances = list(disturbances)
+        self.rtol = float(rtol)
+        self.atol = float(atol)
+        self.stats = {}
+
+    # ------------------------------------------------------------------ model
+
+    def _set_time(self, t):
+        spec, base = self.col.spec, self.spec
+        for name in DISTURBANCE_FIELDS:
+            setattr(spec, name, getattr(base, name))
+        for d in self.disturbances:
+            setattr(spec, d.field, d(t, getattr(spec, d.field)))
+
+    def _rhs(self, t, z):
+        self._set_time(t)
+        self.stats["n_rhs"] += 1
+        col = self.col
+        n = self.spec.n
+
+        x = np.clip(z[:n], 1e-8, 1 - 1e-8)
+        xB = float(np.clip(z[n], 1e-8, 1 - 1e-8))
+        y, _ = col._murphree(x, xB)
+        r = col._balances(x, xB, y)
+        if not self.drum:
+            return r / self.M
+
+        # reflux comes from the drum instead of straight from the top vapor
+        fl = col._flows()
+        xD = float(np.clip(z[n + 1], 1e-8, 1 - 1e-8))
+        r[0] += fl["L"] * (xD - float(np.clip(y[1], 1e-8, 1 - 1e-8)))
+        rD = fl["V"] * y[1] - (fl["L"] + col.spec.D) * xD
+        return np.append(r, rD) / self.M
+
+    def _jacobian(self, t, z):
+        self._set_time(t)
+        self.stats["n_jac"] += 1
+        col = self.col
+        n = self.spec.n
+
+        lin = col._linearize(z[:n + 1])
+        J = lin["J"]
+        if self.drum:
+            fl = col._flows()
+            dy1 = lin["dy_du"][0]
+            J = np.pad(J, ((0, 1), (0, 1)))
+            J[0, :n + 1] -= fl["L"] * dy1
+            J[0, n + 1] = fl["L"]
+            J[n + 1, :n + 1] = fl["V"] * dy1
+            J[n + 1, n + 1] = -(fl["L"] + col.spec.D)
+        return J / self.M[:, None]
+
+    def steady_state(self, t=0.0):
+        """
+        Steady state of the spec at time t (the initial condition of run()).
+        """
+        self._set_time(t)
+        res = self.col.simulate(return_type="array")
+        z = self.col.solution
+        if self.drum:
+            z = np.append(z, res.xD)
+        return z, res
+
+    # ------------------------------------------------------------- integrator
+
+    def run(self, t_end, t0=0.0, z0=None, h0=1e-3, h_max=None, t_eval=None):
+        """
+        Integrate from t0 (steady state unless z0 is given) to t_end.
+
+        Returns a dict with "t", "x" (n_t, n), "xB", "xD", "T" (n_t, n) at every
+        accepted step (or interpolated to t_eval), and "stats" (steps, rejected
+        steps, Jacobians, matrix inversions, rhs calls, wall time).
+        """
+        wall0 = time.perf_counter()
+        self.stats = {"n_steps": 0, "n_rejected": 0, "n_jac": 0, "n_inv": 0, "n_rhs": 0}
+        if z0 is None:
+            z0, _ = self.steady_state(t0)
+        z = np.array(z0, dtype=float)
+        h_max = (t_end - t0) / 10.0 if h_max is None else float(h_max)
+        h = min(float(h0), h_max)
+
+        breaks = sorted({b for d in self.disturbances for b in d.breakpoints if t0 < b < t_end})
+        ts, zs = [t0], [z.copy()]
+
+        t = t0
+        z_prev = z_prev2 = None   # accepted history for BDF2 and its predictor
+        h_prev = h_prev2 = None
+        J = self._jacobian(t, z)
+        J_fresh = True
+        beta_inv = None           # (beta, inverse of I - beta J)
+        I = np.eye(z.size)
+
+        while t < t_end - 1e-12 * max(1.0, abs(t_end)):
+            # land exactly on disturbance breakpoints and t_end
+            t_stop = next((b for b in breaks if b > t + 1e-12), t_end)
+            h = min(h, h_max, t_stop - t)
+            if t_stop - t - h < 1e-3 * h:
+                h = t_stop - t
+
+            if z_prev is None:
+                # BDF1 (implicit Euler) start, explicit Euler predictor
+                a1, a2, beta = 1.0, 0.0, h
+                z_pred = z + h * self._rhs(t, z)
+                err_c = 0.5
+            else:
+                w = h / h_prev
+                a1 = (1 + w) ** 2 / (1 + 2 * w)
+                a2 = w ** 2 / (1 + 2 * w)
+                beta = h * (1 + w) / (1 + 2 * w)
+                d1 = (z - z_prev) / h_prev
+                if z_prev2 is None:
+                    z_pred = z + h * d1
+                    err_c = 1.0 / 3.0
+                else:
+                    # quadratic extrapolation through the last three accepted points
+                    dd = (d1 - (z_prev - z_prev2) / h_prev2) / (h_prev + h_prev2)
+                    z_pred = z + h * d1 + h * (h + h_prev) * dd
+                    err_c = 2.0 / 11.0
+
+            t_new = t_stop if h == t_stop - t else t + h
+            if beta_inv is None or abs(beta_inv[0] - beta) > 1e-12 * beta:
+                beta_inv = (beta, np.linalg.inv(I - beta * J))
+                self.stats["n_inv"] += 1
+            Minv = beta_inv[1]
+
+            # simplified Newton on  z - a1 z_n + a2 z_{n-1} - beta f(z) = 0
+            hist = a1 * z - (a2 * z_prev if z_prev is not None else 0.0)
+            zc = z_pred.copy()
+            scale = self.atol + self.rtol * np.abs(z)
+            converged = False
+            rate, dnorm_old = None, None
+            for k in range(4):
+                G = zc - hist - beta * self._rhs(t_new, zc)
+                dz = -Minv @ G
+                zc += dz
+                dnorm = float(np.sqrt(np.mean((dz / scale) ** 2)))
+                if dnorm_old is not None:
+                    rate = dnorm / dnorm_old
+                    if rate > 0.9:
+                        break
+                if dnorm < 0.03 or (rate is not None and rate / (1 - rate) * dnorm < 0.03):
+                    converged = True
+                    break
+                dnorm_old = dnorm
+
+            if not converged:
+                if not J_fresh:
+                    J = self._jacobian(t, z)
+                    J_fresh = True
+                    beta_inv = None
+                else:
+                    h *= 0.25
+                    self.stats["n_rejected"] += 1
+                continue
+
+            err = err_c * (zc - z_pred)
+            enorm = float(np.sqrt(np.mean((err / (self.atol + self.rtol * np.maximum(np.abs(z), np.abs(zc)))) ** 2)))
+            if enorm > 1.0:
+                h *= max(0.2, 0.9 * enorm ** (-1.0 / 3.0))
+                self.stats["n_rejected"] += 1
+                continue
+
+            # accept
+            self.stats["n_steps"] += 1
+            z_prev2, h_prev2 = z_prev, h_prev
+            z_prev, h_prev = z, h
+            z, t = zc, t_new
+            ts.append(t)
+            zs.append(z.copy())
+            J_fresh = False
+            if k >= 2:
+                # slow corrector: refresh the Jacobian before the next step
+                J = self._jacobian(t, z)
+                J_fresh = True
+                beta_inv = None
+
+            if t == t_stop and t_stop != t_end:
+                # restart the multistep history after a disturbance breakpoint
+                z_prev = z_prev2 = None
+                h_prev = h_prev2 = None
+                J = self._jacobian(t, z)
+                J_fresh = True
+                beta_inv = None
+                h = min(h, h0)
+                continue
+
+            # change the step only when it pays to refactor
+            fac = 0.9 * max(enorm, 1e-10) ** (-1.0 / 3.0)
+            if fac < 1.0 or fac > 1.5:
+                h *= min(fac, 4.0)
+
+        self.stats["wall_s"] = time.perf_counter() - wall0
+        return self._output(np.array(ts), np.array(zs), t_eval)
+
+    def _output(self, ts, zs, t_eval):
+        n = self.spec.n
+        if t_eval is not None:
+            t_eval = np.asarray(t_eval, dtype=float)
+            zs = np.column_stack([np.interp(t_eval, ts, zs[:, j]) for j in range(zs.shape[1])])
+            ts = t_eval
+
+        col = self.col
+        x = np.clip(zs[:, :n], 1e-8, 1 - 1e-8)
+        xB = np.clip(zs[:, n], 1e-8, 1 - 1e-8)
+        T = np.empty_like(x)
+        y1 = np.empty(ts.size)
+        for k in range(ts.size):
+            y, Tk = col._murphree(x[k], float(xB[k]))
+            T[k] = Tk[1:n + 1]
+            y1[k] = y[1]
+        xD = np.clip(zs[:, n + 1], 1e-8, 1 - 1e-8) if self.drum else np.clip(y1, 1e-8, 1 - 1e-8)
+        return {"t": ts, "x": x, "xB": xB, "xD": xD, "T": T, "stats": dict(self.stats)}
+
+
+def time_to_threshold(t, values, threshold, below=True):
+    """
+    First time `values` crosses `threshold` (falls below it if below=True,
+    rises above otherwise), linearly interpolated; None if it never does.
+    E.g. time_to_threshold(run["t"], run["xD"], 0.99) for the time to off-spec distillate.
+    """
+    t = np.asarray(t, dtype=float)
+    v = np.asarray(values, dtype=float)
+    off = v < threshold if below else v > threshold
+    if not off.any():
+        return None
+    k = int(np.argmax(off))
+    if k == 0:
+        return float(t[0])
+    frac = (threshold - v[k - 1]) / (v[k] - v[k - 1])
+    return float(t[k - 1] + frac * (t[k] - t[k - 1]))
@@ -0,0 +1,90 @@
+"""
+Liquid and vapor enthalpies for the energy-balance (non-CMO) column mode.
+
+Pure-component enthalpies are tabulated once on a fine temperature grid:
+
+    h_L,i(T) = int_25^T cp_L,i dT            (liquid, reference 25 °C)
+    h_V,i(T) = h_L,i(T) + dHvap_i(T)         (Watson: dHvap ~ (Tc - T)^0.38)
+
+Mixing is ideal, so the (x, T) table of a binary is linear in x and only its
+two pure-component rows are stored; liquid(x, T) / vapor(y, T) evaluate every
+stage at once by linear interpolation in T. Enthalpies in kJ/mol.
+"""
+
+import numpy as np
+
+T_KELVIN = 273.15
+T_REF = 25.0
+
+# cp_L = a + b (T - 25 °C) [kJ/(mol K)], dHvap at the normal boiling point [kJ/mol],
+# normal boiling point and critical temperature [K]
+ENTHALPY = {
+    "benzene": (0.1360, 3.3e-4, 30.72, 353.24, 562.05),
+    "toluene": (0.1571, 3.7e-4, 33.18, 383.78, 591.75),
+    "ethanol": (0.1120, 1.0e-3, 38.56, 351.44, 513.90),
+    "water": (0.0753, 0.0, 40.65, 373.15, 647.10),
+}
+
+
+class EnthalpyTable:
+    """
+    Binary enthalpy table over T in [T_min, T_max] °C with step dT.
+    """
+
+    def __init__(self, components=("benzene", "toluene"), T_min=0.0, T_max=250.0, dT=0.25):
+        missing = [c for c in components if c not in ENTHALPY]
+        if missing:
+            raise ValueError(f"no enthalpy data for {missing}; add them to enthalpy.ENTHALPY")
+        self.components = tuple(components)
+        self.T_min, self.dT = float(T_min), float(dT)
+        T = np.arange(T_min, T_max + dT / 2, dT)
+        self.T_grid = T
+
+        hL, hV = [], []
+        for c in self.components:
+            a, b, dH_nb, Tb, Tc = ENTHALPY[c]
+            h = a * (T - T_REF) + 0.5 * b * (T - T_REF) ** 2
+            ratio = np.clip((Tc - (T + T_KELVIN)) / (Tc - Tb), 0.0, None)
+            hL.append(h)
+            hV.append(h + dH_nb * ratio ** 0.38)
+        # (2, nT): component rows, and their per-step differences for interpolation
+        self._hL = np.array(hL)
+        self._hV = np.array(hV)
+        self._dhL = np.diff(self._hL, axis=1)
+        self._dhV = np.diff(self._hV, axis=1)
+
+    def _lookup(self, table, diffs, z, T):
+        t = (np.asarray(T, dtype=float) - self.T_min) / self.dT
+        i = np.clip(t.astype(int), 0, diffs.shape[1] - 1)
+        w = t - i
+        h1 = table[0, i] + w * diffs[0, i]
+        h2 = table[1, i] + w * diffs[1, i]
+        return h2 + np.asarray(z, dtype=float) * (h1 - h2)
+
+    def liquid(self, x, T):
+        """
+        Liquid enthalpy of light fraction x at T (°C), broadcast over stages.
+        """
+        return self._lookup(self._hL, self._dhL, x, T)
+
+    def vapor(self, y, T):
+        """
+        Vapor enthalpy of light fraction y at T (°C), broadcast over stages.
+        """
+        return self._lookup(self._hV, self._dhV, y, T)
+
+    def __repr__(self):
+        return f"EnthalpyTable{self.components}"
+
+
+_TABLES = {}
+
+
+def enthalpy_table(components=("benzene", "toluene")):
+    """
+    Shared table for a component pair (built on first use).
+    """
+    key = tuple(components)
+    if key not in _TABLES:
+        _TABLES[key] = EnthalpyTable(key)
+    return _TABLES[key]
@@ -0,0 +1,241 @@
+"""
+Tray-efficiency estimation from measured temperature profiles.
+
+Fits Murphree efficiencies (per tray or per zone of trays) so that the simulated
+tray temperatures match thermocouple readings. The fit is a regularized
+Levenberg–Marquardt (Gauss–Newton with adaptive damping) on the analytic
+sensitivities dT/dE from DistillationColumn.sensitivities().
+
+For historian data, iter_fits()/fit_batch() process snapshots in order and
+warm-start every fit (efficiencies and column profile) from the previous one.
+"""
+
+import math
+
+import numpy as np
+
+from .column import ColumnSpec, DistillationColumn
+
+# snapshot keys that override the template spec
+OPERATING_FIELDS = ("F", "zF", "D", "reflux_ratio", "q")
+
+
+def zone_matrix(n_stages, zones=None):
+    """
+    (n_stages, n_zones) 0/1 matrix mapping zone efficiencies to trays.
+    zones: None (one zone per tray) or a list of stage groups, e.g.
+    [range(1, 5), range(5, 9), range(9, 16)] (stage numbers from the top).
+    """
+    if zones is None:
+        return np.eye(n_stages)
+
+    Z = np.zeros((n_stages, len(zones)))
+    for k, group in enumerate(zones):
+        for s in group:
+            if not 1 <= s <= n_stages:
+                raise ValueError(f"zone stage {s} outside 1..{n_stages}")
+            Z[s - 1, k] = 1.0
+    if not np.all(Z.sum(axis=1) == 1.0):
+        raise ValueError("zones must cover every stage exactly once")
+    return Z
+
+
+class EfficiencyEstimator:
+    """
+    Parameters
+    ----------
+    spec : ColumnSpec
+        Template column (stages, feed location, pressure, nominal operation).
+    stages : list of int
+        Stages carrying thermocouples (1 = top tray).
+    zones : list, optional
+        Stage groups sharing one efficiency (see zone_matrix); default per tray.
+    sigma_T : float
+        Thermocouple uncertainty (°C) used to weight temperature residuals.
+    reg_prior : float
+        Weight pulling the estimate towards the prior (the previous fit in a batch).
+    reg_smooth : float
+        Weight on differences between neighbouring zones.
+    bounds : (float, float)
+        Allowed efficiency range.
+    """
+
+    def __init__(self, spec: ColumnSpec, stages, zones=None, sigma_T=0.5,
+                 reg_prior=1.0, reg_smooth=10.0, bounds=(0.05, 1.0), max_iter=20, tol=1e-6):
+        self.spec = spec
+        self.stages = np.asarray(stages, dtype=int)
+        if self.stages.min() < 1 or self.stages.max() > spec.n:
+            raise ValueError(f"thermocouple stages must be in 1..{spec.n}")
+
+        self.Z = zone_matrix(spec.n, zones)
+        self.sigma_T = float(sigma_T)
+        self.reg_prior = float(reg_prior)
+        self.reg_smooth = float(reg_smooth)
+        self.bounds = (float(bounds[0]), float(bounds[1]))
+        self.max_iter = int(max_iter)
+        self.tol = float(tol)
+
+        # regularization rows: sqrt(w_prior) (theta - prior) and sqrt(w_smooth) diff(theta)
+        nz = self.Z.shape[1]
+        self._R_prior = np.sqrt(self.reg_prior) * np.eye(nz)
+        self._R_smooth = np.sqrt(self.reg_smooth) * np.diff(np.eye(nz), axis=0)
+
+        # warm-start state carried between fits
+        self.theta = np.linalg.lstsq(self.Z, spec.eff, rcond=None)[0]
+        self.u = None
+
+    def _column(self, operating=None):
+        kw = self.spec.to_dict()
+        for k, v in (operating or {}).items():
+            if k in OPERATING_FIELDS:
+                kw[k] = v
+        return DistillationColumn(ColumnSpec(**kw))
+
+    def _evaluate(self, col, theta, theta_prior, T_meas, u_init):
+        col.spec.eff = np.clip(self.Z @ theta, *self.bounds)
+        res = col.simulate(x_init=u_init, return_type="array")
+        if not res.converged and u_init is not None:
+            res = col.simulate(return_type="array")
+        if not res.converged:
+            # no usable profile at theta: infinite cost, so LM rejects the step
+            return math.inf, None, None, res
+
+        sens = col.sensitivities()
+        rT = (res.T[self.stages - 1] - T_meas) / self.sigma_T
+        JT = sens["dT_deff"][self.stages - 1] @ self.Z / self.sigma_T
+
+        r = np.concatenate([rT, self._R_prior @ (theta - theta_prior), self._R_smooth @ theta])
+        J = np.vstack([JT, self._R_prior, self._R_smooth])
+        return float(r @ r), r, J, res
+
+    def fit(self, T_meas, operating=None, theta0=None):
+        """
+        Fit one temperature snapshot.
+
+        T_meas : temperatures (°C) at self.stages
+        operating : optional overrides of F, zF, D, reflux_ratio, q for this snapshot
+        theta0 : starting zone efficiencies (default: previous fit)
+
+        Returns a dict with the fitted "eff" profile, zone values "theta",
+        "T_fit" at the thermocouples, "rms_T" (°C), "iters", "converged",
+        "stalled" (no damped step lowered the cost away from a minimum),
+        "column_converged", "xD_bz" and "xB_bz".
+        """
+        T_meas = np.asarray(T_meas, dtype=float)
+        if T_meas.shape != self.stages.shape:
+            raise ValueError("T_meas must have one reading per thermocouple stage")
+
+        col = self._column(operating)
+        theta_prior = self.theta.copy() if theta0 is None else np.asarray(theta0, dtype=float)
+        theta = theta_prior.copy()
+
+        cost, r, J, res = self._evaluate(col, theta, theta_prior, T_meas, self.u)
+        u = col.solution
+        mu = 1e-3
+        converged = stalled = False
+        it = 0
+
+        # a start whose column fails leaves nothing to linearize: report it unconverged
+        for it in range(1, (self.max_iter if r is not None else 0) + 1):
+            g = J.T @ r
+            H = J.T @ J
+            step_ok = False
+            while mu < 1e8:
+                A = H + mu * np.diag(np.diag(H) + 1e-12)
+                step = -np.linalg.solve(A, g)
+                theta_new = np.clip(theta + step, *self.bounds)
+                cost_new, r_new, J_new, res_new = self._evaluate(col, theta_new, theta_prior, T_meas, u)
+                if cost_new <= cost:
+                    step_ok = True
+                    break
+                mu *= 4.0
+
+            if not step_ok:
+                # damping ran out: converged only if Gauss-Newton predicts no decrease
+                # beyond roundoff (bounded step); otherwise the fit is stuck
+                s_gn = np.clip(theta - np.linalg.lstsq(H, g, rcond=None)[0], *self.bounds) - theta
+                converged = -(2.0 * g @ s_gn + s_gn @ H @ s_gn) <= self.tol * max(cost, 1e-12)
+                stalled = not converged
+                col.spec.eff = np.clip(self.Z @ theta, *self.bounds)
+                res = col.simulate(x_init=u, return_type="array")
+                break
+
+            dtheta = np.max(np.abs(theta_new - theta))
+            dcost = cost - cost_new
+            theta, cost, r, J, res = theta_new, cost_new, r_new, J_new, res_new
+            u = col.solution
+            mu = max(mu / 3.0, 1e-9)
+
+            if dtheta < self.tol or dcost <= self.tol * max(cost, 1e-12):
+                converged = True
+                break
+
+        self.theta = theta
+        if res.converged:
+            self.u = col.solution
+
+        T_fit = res.T[self.stages - 1]
+        return {
+            "eff": col.spec.eff.copy(),
+            "theta": theta.copy(),
+            "T_fit": T_fit.copy(),
+            "rms_T": float(np.sqrt(np.mean((T_fit - T_meas) ** 2))),
+            "iters": it,
+            "converged": bool(converged),
+            "stalled": stalled,
+            "column_converged": bool(res.converged),
+            "xD_bz": res.xD,
+            "xB_bz": res.xB,
+        }
+
+    def iter_fits(self, snapshots):
+        """
+        Fit snapshots in order, warm-starting each from the previous fit.
+        snapshots: iterable of dicts with "T" (readings at self.stages) and
+        optional operating fields (F, zF, D, reflux_ratio, q) and "time".
+        Yields one fit dict per snapshot (with "time" copied through).
+        """
+        for snap in snapshots:
+            fit = self.fit(snap["T"], operating=snap)
+            if "time" in snap:
+                fit["time"] = snap["time"]
+            yield fit
+
+    def fit_batch(self, snapshots):
+        """
+        Fit all snapshots (warm-started in order) and stack the results:
+        "eff" (n_snapshots, n_stages), "theta" (n_snapshots, n_zones) and 1-D arrays
+        "rms_T", "iters", "converged", "stalled", "xD_bz", "xB_bz", plus "time"
+        if given.
+        """
+        fits = list(self.iter_fits(snapshots))
+        out = {
+            "eff": np.array([f["eff"] for f in fits]).reshape(len(fits), self.spec.n),
+            "theta": np.array([f["theta"] for f in fits]).reshape(len(fits), self.Z.shape[1]),
+        }
+        for k in ("rms_T", "iters", "converged", "stalled", "xD_bz", "xB_bz"):
+            out[k] = np.array([f[k] for f in fits])
+        if fits and "time" in fits[0]:
+            out["time"] = [f.get("time") for f in fits]
+        return out
+
+
+def snapshots_from_frame(df, temp_columns, time_column=None):
+    """
+    Historian table -> snapshot dicts for EfficiencyEstimator.iter_fits().
+    temp_columns: column names holding the thermocouple readings, in the same
+    order as the estimator's `stages`. Operating columns named F, zF, D,
+    reflux_ratio or q are passed through when present.
+    """
+    op_cols = [c for c in OPERATING_FIELDS if c in df.columns]
+    T = df[list(temp_columns)].to_numpy(dtype=float)
+    ops = df[op_cols].to_numpy(dtype=float) if op_cols else None
+    times = df[time_column].tolist() if time_column else None
+
+    for i in range(len(df)):
+        snap = {"T": T[i]}
+        if ops is not None:
+            snap.update(zip(op_cols, ops[i]))
+        if times is not None:
+            snap["time"] = times[i]
+        yield snap
@@ -0,0 +1,294 @@
+"""
+Multi-column flowsheets: columns connected by streams, with recycles.
+
+    fs = Flowsheet()
+    fs.add_feed("fresh", F=100.0, zF=0.5)
+    fs.add_column("C1", ColumnSpec(...), feeds=["fresh", "C2.D"], D_frac=0.45)
+    fs.add_column("C2", ColumnSpec(...), feeds=["C1.B"], D_frac=0.3)
+    out = fs.solve(accel="wegstein")
+
+A column's feed is the mix of its listed streams ("<feed>" or "<column>.D" /
+"<column>.B"); F, zF and q of the spec are replaced by the mixed stream. D is
+either the spec's D or D_frac * F. Products leave as saturated liquid (q = 1).
+
+Units are evaluated in insertion order. Every stream that feeds a unit from a
+later (or the same) unit is a tear stream; its (total, benzene) flows are
+converged by successive substitution with Wegstein or Anderson acceleration.
+Each column warm-starts from its previous solution between outer iterations,
+and units on the same level (no untorn path between them) can be solved
+concurrently through an Executor.
+"""
+
+import numpy as np
+
+from .column import ColumnSpec, DistillationColumn
+
+
+class Stream:
+    """
+    Molar flow F, benzene fraction z and thermal condition q.
+    """
+
+    __slots__ = ("F", "z", "q")
+
+    def __init__(self, F, z, q=1.0):
+        self.F = float(F)
+        self.z = float(z)
+        self.q = float(q)
+
+    @property
+    def benzene(self):
+        return self.F * self.z
+
+    def to_dict(self):
+        return {"F": self.F, "z": self.z, "q": self.q}
+
+    def __repr__(self):
+        return f"Stream(F={self.F:.6g}, z={self.z:.6g}, q={self.q:g})"
+
+
+def mix(streams):
+    """
+    Adiabatic mix of streams (flow-weighted z and q).
+    """
+    streams = list(streams)
+    F = sum(s.F for s in streams)
+    if F <= 0:
+        raise ValueError("mixed feed has no flow")
+    return Stream(F, sum(s.F * s.z for s in streams) / F, sum(s.F * s.q for s in streams) / F)
+
+
+def _solve_column(spec_dict, x_init, method):
+    """
+    One column solve (module level so process pools can pickle it).
+    """
+    col = DistillationColumn(ColumnSpec(**spec_dict))
+    res = col.simulate(x_init=x_init, return_type="array", method=method)
+    if not res.converged and x_init is not None:
+        res = col.simulate(return_type="array", method=method)
+    return res, col.solution
+
+
+class ColumnUnit:
+    def __init__(self, name, spec: ColumnSpec, feeds, D_frac=None):
+        if not feeds:
+            raise ValueError(f"column {name!r} needs at least one feed")
+        if D_frac is not None and not 0.0 < D_frac < 1.0:
+            raise ValueError("D_frac must be between 0 and 1")
+        self.name = name
+        self.spec = spec
+        self.feeds = list(feeds)
+        self.D_frac = D_frac
+        self.u = None          # warm start
+        self.result = None
+
+    def spec_for(self, feed: Stream):
+        d = self.spec.to_dict()
+        d.update(F=feed.F, zF=feed.z, q=feed.q)
+        if self.D_frac is not None:
+            d["D"] = self.D_frac * feed.F
+        if not 0.0 < d["D"] < feed.F:
+            raise ValueError(f"column {self.name!r}: D={d['D']:.6g} not below feed F={feed.F:.6g}")
+        return d
+
+
+class Flowsheet:
+    def __init__(self):
+        self.feeds = {}
+        self.units = {}
+
+    def add_feed(self, name, F, zF, q=1.0):
+        self._check_name(name)
+        self.feeds[name] = Stream(F, zF, q)
+        return self
+
+    def add_column(self, name, spec: ColumnSpec, feeds, D_frac=None):
+        self._check_name(name)
+        self.units[name] = ColumnUnit(name, spec, feeds, D_frac=D_frac)
+        return self
+
+    def _check_name(self, name):
+        if "." in name or name in self.feeds or name in self.units:
+            raise ValueError(f"invalid or duplicate unit name {name!r}")
+
+    # ------------------------------------------------------------- topology
+
+    def _source(self, ref):
+        """
+        (unit, product) for "<unit>.D"/"<unit>.B", or (feed, None).
+        """
+        if ref in self.feeds:
+            return ref, None
+        unit, _, prod = ref.partition(".")
+        if unit not in self.units or prod not in ("D", "B"):
+            raise ValueError(f"unknown stream {ref!r}")
+        return unit, prod
+
+    def tear_streams(self):
+        """
+        Streams that feed a unit from itself or a later unit (insertion order).
+        """
+        order = {name: i for i, name in enumerate(self.units)}
+        tears = []
+        for name, unit in self.units.items():
+            for ref in unit.feeds:
+                src, prod = self._source(ref)
+                if prod is not None and order[src] >= order[name] and ref not in tears:
+                    tears.append(ref)
+        return tears
+
+    def levels(self):
+        """
+        Units grouped so that each group only depends on earlier groups or tear streams.
+        """
+        tears = set(self.tear_streams())
+        level = {}
+        for name, unit in self.units.items():
+            deps = [self._source(ref)[0] for ref in unit.feeds
+                    if ref not in tears and self._source(ref)[1] is not None]
+            level[name] = 1 + max((level[d] for d in deps), default=-1)
+        groups = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for name, lv in level.items():
+            groups[lv].append(name)
+        return groups
+
+    # --------------------------------------------------------------- solving
+
+    def _products(self, name):
+        res = self.units[name].result
+        return {"D": Stream(res.D, res.xD), "B": Stream(res.B, res.xB)}
+
+    def _sweep(self, tear_values, method, executor):
+        """
+        One pass through all units with the given tear streams. Returns the
+        recomputed tear streams.
+        """
+        streams = dict(self.feeds)
+        streams.update(tear_values)
+
+        for group in self.levels():
+            jobs = []
+            for name in group:
+                unit = self.units[name]
+                feed = mix(streams[ref] for ref in unit.feeds)
+                jobs.append((unit, unit.spec_for(feed)))
+
+            if executor is None or len(jobs) == 1:
+                outs = [_solve_column(d, unit.u, method) for unit, d in jobs]
+            else:
+                futs = [executor.submit(_solve_column, d, unit.u, method) for unit, d in jobs]
+                outs = [f.result() for f in futs]
+
+            for (unit, _), (res, u) in zip(jobs, outs):
+                unit.result, unit.u = res, u
+                prods = self._products(unit.name)
+                streams[f"{unit.name}.D"] = prods["D"]
+                streams[f"{unit.name}.B"] = prods["B"]
+
+        return {ref: streams[ref] for ref in tear_values}, streams
+
+    def solve(self, accel="wegstein", tol=1e-8, max_iter=100, initial=None, method="shooting",
+              executor=None, anderson_m=5, wegstein_bounds=(-5.0, 0.0)):
+        """
+        Converge the recycles.
+
+        accel: "direct" (successive substitution), "wegstein" or "anderson"
+        tol: relative change of the tear-stream flows (total and benzene)
+        initial: {tear stream: Stream} first guesses (default: zero flow at z = 0.5)
+        method: column solve method; shooting (with its Newton fallback) copes
+                better with the dilute feeds of downstream columns
+        executor: optional concurrent.futures Executor for units on the same level
+
+        Returns a dict with "streams" (every stream by name), "units"
+        (ColumnResult by column), "converged" (tears and every column),
+        "iters", "history" (relative tear residual per outer iteration) and "tears".
+        """
+        if accel not in ("direct", "wegstein", "anderson"):
+            raise ValueError("accel must be 'direct', 'wegstein' or 'anderson'")
+
+        tears = self.tear_streams()
+        guess = dict(initial or {})
+        x = np.concatenate([self._pack(guess.get(ref, Stream(0.0, 0.5))) for ref in tears]) \
+            if tears else np.zeros(0)
+
+        history = []
+        converged = not tears
+        x_prev = g_prev = None
+        dX, dG = [], []
+        it = 0
+
+        for it in range(1, (max_iter if tears else 1) + 1):
+            tear_out, streams = self._sweep(self._unpack(x, tears), method, executor)
+            if not tears:
+                break
+            g = np.concatenate([self._pack(tear_out[ref]) for ref in tears])
+            err = float(np.linalg.norm(g - x) / max(1.0, np.linalg.norm(g)))
+            history.append(err)
+            if err < tol:
+                converged = True
+                x = g
+                break
+
+            if accel == "direct" or x_prev is None:
+                x_new = g
+            elif accel == "wegstein":
+                dx = x - x_prev
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    s = np.where(np.abs(dx) > 1e-14, (g - g_prev) / dx, 0.0)
+                    qw = np.where(np.abs(s - 1.0) > 1e-12, s / (s - 1.0), 0.0)
+                qw = np.clip(qw, *wegstein_bounds)
+                x_new = qw * x + (1.0 - qw) * g
+            else:
+                # Anderson (type II) on the fixed-point residual f = g - x
+                dX.append(x - x_prev)
+                dG.append((g - x) - (g_prev - x_prev))
+                del dX[:-anderson_m], dG[:-anderson_m]
+                DF = np.column_stack(dG)
+                gamma = np.linalg.lstsq(DF, g - x, rcond=None)[0]
+                x_new = g - (np.column_stack(dX) + DF) @ gamma
+
+            x_prev, g_prev = x, g
+            x = self._clean(x_new)
+
+        units = {name: unit.result for name, unit in self.units.items()}
+        return {
+            "streams": streams,
+            "units": units,
+            "converged": bool(converged) and all(r.converged for r in units.values()),
+            "iters": it,
+            "history": history,
+            "tears": tears,
+        }
+
+    @staticmethod
+    def _pack(stream):
+        return np.array([stream.F, stream.benzene])
+
+    @staticmethod
+    def _unpack(x, tears):
+        out = {}
+        for k, ref in enumerate(tears):
+            F, nb = x[2 * k], x[2 * k + 1]
+            out[ref] = Stream(F, nb / F if F > 0 else 0.5)
+        return out
+
+    @staticmethod
+    def _clean(x):
+        # keep tear flows physical: F >= 0 and 0 <= benzene <= F
+        x = x.copy()
+        F = np.maximum(x[0::2], 0.0)
+        x[0::2] = F
+        x[1::2] = np.clip(x[1::2], 0.0, F)
+        return x
+
+    def balance(self, streams):
+        """
+        Overall benzene and total balance closure: (total in - out, benzene in - out),
+        where "out" counts products that feed no unit.
+        """
+        used = {ref for unit in self.units.values() for ref in unit.feeds}
+        products = [f"{n}.{p}" for n in self.units for p in ("D", "B")]
+        outs = [streams[r] for r in products if r not in used]
+        F_in = sum(s.F for s in self.feeds.values())
+        b_in = sum(s.benzene for s in self.feeds.values())
+        return F_in - sum(s.F for s in outs), b_in - sum(s.benzene for s in outs)
@@ -1,8 +1,21 @@
 \
 import json
+import sys
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+
+def pyplot():
+    """
+    Import matplotlib.pyplot on first use (non-interactive Agg backend unless
+    a backend was already chosen), so importing distill stays numpy-only.
+    """
+    import matplotlib
+
+    if "matplotlib.pyplot" not in sys.modules:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
 
 
 def ensure_dir(path: str | Path):
@@ -11,7 +24,11 @@ def ensure_dir(path: str | Path):
     return p
 
 
-def save_case_outputs(out_dir, case_name, df, summary):
+def save_case_outputs(out_dir, case_name, df, summary, plot=True, dpi=160):
+    """
+    Write <case>.csv and <case>.json, plus <case>_T_profile.png when plot=True
+    (sweeps can skip per-case plots and draw one small-multiples figure instead).
+    """
     out_dir = ensure_dir(out_dir)
     csv_path = out_dir / f"{case_name}.csv"
     json_path = out_dir / f"{case_name}.json"
@@ -20,7 +37,11 @@ def save_case_outputs(out_dir, case_name, df, summary):
     df.to_csv(csv_path, index=False)
     json_path.write_text(json.dumps(summary, indent=2))
 
+    if not plot:
+        return {"csv": str(csv_path), "json": str(json_path)}
+
     # Temperature profile plot (stage 1 at top)
+    plt = pyplot()
     plt.figure()
     plt.plot(df["stage"], df["T_C"])
     plt.gca().invert_xaxis()  # optional: show top on left, bottom on right
@@ -28,7 +49,7 @@ def save_case_outputs(out_dir, case_name, df, summary):
     plt.ylabel("Temperature (°C)")
     plt.title(f"Temperature Profile: {case_name}")
     plt.tight_layout()
-    plt.savefig(png_path, dpi=160)
+    plt.savefig(png_path, dpi=dpi)
     plt.close()
 
     return {"csv": str(csv_path), "json": str(json_path), "png": str(png_path)}
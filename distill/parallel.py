@@ -0,0 +1,186 @@
+"""
+Process-parallel case runner with shared-memory results.
+
+SharedResultSet is a ResultSet whose arrays live in one
+multiprocessing.shared_memory block. Worker processes attach to it once (pool
+initializer) and solve straight into rs.row(i, n) with
+simulate(return_type="array", out=...), so profiles never cross the pipe: a
+worker only sends back a (case, status) record per case, and the parent reads
+the finished arrays in place.
+
+    rs = solve_parallel(specs, names=names, max_workers=8)   # or table.solve(max_workers=8)
+    rs.field("xD"), rs[i].to_frame(), rs.summary_frame()
+    rs.close(); rs.unlink()                                   # or `with rs:`; rs.copy() keeps a plain ResultSet
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .column import ColumnSpec, DistillationColumn
+from .results import PROFILE_FIELDS, SCALAR_FIELDS, ResultSet
+from .screening import screen
+
+
+class SharedResultSet(ResultSet):
+    """
+    ResultSet backed by one shared-memory block: 4 profile arrays (case, stage)
+    followed by the (case, field) scalars. handle is all another process needs
+    to attach.
+    """
+
+    __slots__ = ("_shm", "_owner", "_shape")
+
+    def __init__(self, n_cases, max_stages, names=None, _attach=None):
+        shape = (int(n_cases), int(max_stages))
+        size = shape[0] * (len(PROFILE_FIELDS) * shape[1] + len(SCALAR_FIELDS))
+        if _attach is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1) * 8)
+        else:
+            self._shm = shared_memory.SharedMemory(name=_attach)
+        self._owner = _attach is None
+        self._shape = shape
+
+        buf = np.ndarray((size,), dtype=np.float64, buffer=self._shm.buf)
+        k = shape[0] * shape[1]
+        for j, field in enumerate(PROFILE_FIELDS):
+            setattr(self, field, buf[j * k:(j + 1) * k].reshape(shape))
+        self.scalars = buf[len(PROFILE_FIELDS) * k:].reshape(shape[0], len(SCALAR_FIELDS))
+        if self._owner:
+            buf[:len(PROFILE_FIELDS) * k] = np.nan
+            self.scalars[:] = 0.0
+            self.scalars[:, SCALAR_FIELDS.index("n_stages")] = max_stages
+        self.names = list(names) if names is not None else [None] * shape[0]
+        self.errors = {}
+
+    @property
+    def handle(self):
+        """
+        (shm name, n_cases, max_stages): pass to SharedResultSet.attach() in a worker.
+        """
+        return (self._shm.name,) + self._shape
+
+    @classmethod
+    def attach(cls, handle):
+        name, n_cases, max_stages = handle
+        return cls(n_cases, max_stages, _attach=name)
+
+    def copy(self):
+        """
+        Plain (process-local) ResultSet with the same contents.
+        """
+        rs = ResultSet(len(self), self.max_stages, names=self.names)
+        for field in PROFILE_FIELDS + ("scalars",):
+            getattr(rs, field)[:] = getattr(self, field)
+        rs.errors = dict(self.errors)
+        return rs
+
+    def close(self):
+        """
+        Drop this process's mapping; array views taken before are invalid afterwards.
+        """
+        if self._shm is not None:
+            for field in PROFILE_FIELDS + ("scalars",):
+                setattr(self, field, None)
+            self._shm.close()
+
+    def unlink(self):
+        """
+        Free the block (creator only, once every process has closed it).
+        """
+        if self._owner and self._shm is not None:
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.unlink()
+
+
+# ------------------------------------------------------------------ workers
+
+_SHARED = None  # this worker's attached SharedResultSet
+
+
+def _attach_worker(handle):
+    global _SHARED
+    _SHARED = SharedResultSet.attach(handle)
+
+
+def _solve_chunk(cases, warm_start, method):
+    """
+    Solve [(case id, spec kwargs), ...] into the shared rows; cases with the
+    same (n_stages, feed_stage) warm-start from each other, a new structure
+    from the last solved case. Returns [(case id, converged, error or None), ...].
+    """
+    warm, last = {}, None
+    status = []
+    for i, spec_dict in cases:
+        try:
+            spec = ColumnSpec(**spec_dict)
+            col = DistillationColumn(spec)
+            key = (spec.n, spec.f)
+            u0 = warm.get(key, last) if warm_start else None
+            out = _SHARED.row(i, spec.n)
+            res = col.simulate(x_init=u0, return_type="array", out=out, method=method)
+            if not res.converged and u0 is not None:
+                res = col.simulate(return_type="array", out=out, method=method)
+            if res.converged:
+                warm[key] = last = col.solution
+            status.append((i, bool(res.converged), None))
+        except Exception as exc:  # report per-case failures, keep the batch going
+            status.append((i, False, f"{type(exc).__name__}: {exc}"))
+    return status
+
+
+def solve_parallel(specs, names=None, max_workers=None, warm_start=True, method="newton",
+                   chunks_per_worker=4, executor_factory=ProcessPoolExecutor, skip_infeasible=True):
+    """
+    Solve ColumnSpecs (or SpecRows / a SpecTable) in worker processes into a
+    new SharedResultSet; the caller closes and unlinks it (or uses `with`).
+
+    Cases are sorted by (n_stages, feed_stage) and cut into contiguous chunks
+    (chunks_per_worker per worker) so warm starts keep working inside a chunk,
+    also across neighbouring structures.
+    Cases that raise keep converged = 0 and NaN profiles; their messages are
+    in rs.errors {case id: "Error: ..."}. With skip_infeasible, cases that
+    distill.screening finds infeasible are not sent to the workers at all
+    (rs.errors: "Infeasible: <rules>").
+    """
+    specs = list(specs)
+    max_workers = max_workers or os.cpu_count() or 1
+    jobs = [(i, s.to_dict()) for i, s in enumerate(specs)]
+    max_stages = max((d["n_stages"] for _, d in jobs), default=1)
+    skipped = {}
+    if skip_infeasible and specs:
+        sc = screen(specs)
+        skipped = {int(i): "Infeasible: " + ", ".join(sc.reasons(i)) for i in np.flatnonzero(sc.infeasible)}
+        jobs = [job for job in jobs if job[0] not in skipped]
+    jobs.sort(key=lambda job: (job[1]["n_stages"], job[1]["feed_stage"]))
+
+    n_chunks = max(1, min(len(jobs), max_workers * chunks_per_worker))
+    bounds = np.linspace(0, len(jobs), n_chunks + 1).astype(int)
+    chunks = [jobs[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    rs = SharedResultSet(len(specs), max_stages, names=names)
+    rs.errors.update(skipped)
+    if not jobs:
+        return rs
+    try:
+        with executor_factory(max_workers=max_workers, initializer=_attach_worker,
+                              initargs=(rs.handle,)) as pool:
+            futs = [pool.submit(_solve_chunk, chunk, warm_start, method) for chunk in chunks]
+            for fut in futs:
+                for i, _, err in fut.result():
+                    if err is not None:
+                        rs.errors[i] = err
+    except BaseException:
+        rs.close()
+        rs.unlink()
+        raise
+    return rs
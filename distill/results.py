@@ -0,0 +1,300 @@
+"""
+Array-backed simulation results.
+
+ColumnResult keeps the stage profile as contiguous NumPy arrays and every scalar
+(status, product purities, flows, spec) in one small float vector, so a result
+costs a handful of array headers instead of a DataFrame plus nested dicts.
+ResultSet preallocates 2-D arrays for a whole sweep; its rows are ColumnResult
+views, so `simulate(return_type="array", out=rs.row(i, n))` writes each case in place.
+"""
+
+import numpy as np
+
+# layout of the per-case scalar vector
+SCALAR_FIELDS = (
+    "converged", "iters", "res_norm", "xD", "xB",
+    "L", "V", "Ls", "Vs", "B",
+    "n_stages", "feed_stage", "P", "F", "zF", "q", "D", "R",
+    "Qc", "Qr",  # condenser / reboiler duty, energy-balance mode only (NaN otherwise)
+)
+_IDX = {name: i for i, name in enumerate(SCALAR_FIELDS)}
+
+PROFILE_FIELDS = ("x", "y", "T", "eff")
+
+
+def _scalar(name):
+    i = _IDX[name]
+
+    def get(self):
+        return float(self.scalars[i])
+
+    def set(self, value):
+        self.scalars[i] = value
+
+    return property(get, set)
+
+
+class ColumnResult:
+    __slots__ = ("x", "y", "T", "eff", "scalars")
+
+    def __init__(self, n_stages, x=None, y=None, T=None, eff=None, scalars=None):
+        n = int(n_stages)
+        self.x = np.empty(n) if x is None else x
+        self.y = np.empty(n) if y is None else y
+        self.T = np.empty(n) if T is None else T
+        self.eff = np.empty(n) if eff is None else eff
+        self.scalars = np.zeros(len(SCALAR_FIELDS)) if scalars is None else scalars
+
+    @property
+    def n(self):
+        return self.x.size
+
+    @property
+    def stage(self):
+        return np.arange(1, self.n + 1)
+
+    @property
+    def xB_tol(self):
+        return 1.0 - self.xB
+
+    def fill(self, spec, x, y, T, xD, xB, flows, info):
+        """
+        Write a converged (or last-iterate) profile into this result in place.
+        """
+        self.x[:] = x
+        self.y[:] = y
+        self.T[:] = T
+        self.eff[:] = spec.eff
+
+        s = self.scalars
+        s[_IDX["converged"]] = bool(info["converged"])
+        s[_IDX["iters"]] = info["iters"]
+        s[_IDX["res_norm"]] = info["res_norm"]
+        s[_IDX["xD"]] = xD
+        s[_IDX["xB"]] = xB
+        for k in ("L", "V", "Ls", "Vs", "B"):
+            s[_IDX[k]] = flows[k]
+        s[_IDX["Qc"]] = flows.get("Qc", np.nan)
+        s[_IDX["Qr"]] = flows.get("Qr", np.nan)
+        s[_IDX["n_stages"]] = spec.n
+        s[_IDX["feed_stage"]] = spec.f
+        s[_IDX["P"]] = spec.P
+        s[_IDX["F"]] = spec.F
+        s[_IDX["zF"]] = spec.zF
+        s[_IDX["q"]] = spec.q
+        s[_IDX["D"]] = spec.D
+        s[_IDX["R"]] = spec.R
+        return self
+
+    def to_frame(self):
+        """
+        Stage profile as a pandas DataFrame (same columns as simulate()).
+        """
+        import pandas as pd
+
+        return pd.DataFrame({
+            "stage": self.stage,
+            "x_bz": self.x,
+            "y_bz": self.y,
+            "T_C": self.T,
+            "eff": self.eff,
+        })
+
+    def to_dict(self):
+        """
+        Summary dict in the format returned by simulate().
+        """
+        d = {
+            "converged": bool(self.scalars[_IDX["converged"]]),
+            "iters": int(self.iters),
+            "res_norm": self.res_norm,
+            "xD_bz": self.xD,
+            "xB_bz": self.xB,
+            "xB_tol": self.xB_tol,
+            "flows": {k: self[k] for k in ("L", "V", "Ls", "Vs", "B")},
+            "spec": {
+                "n_stages": int(self.n_stages),
+                "feed_stage": int(self.feed_stage),
+                "P_mmHg": self.P,
+                "F": self.F,
+                "zF_bz": self.zF,
+                "q": self.q,
+                "D": self.D,
+                "R": self.R,
+            },
+        }
+        if not np.isnan(self.Qc):
+            d["duties"] = {"Qc": self.Qc, "Qr": self.Qr}
+        return d
+
+    def __getitem__(self, name):
+        return float(self.scalars[_IDX[name]])
+
+    def __repr__(self):
+        return (f"ColumnResult(n={self.n}, converged={bool(self.converged)}, "
+                f"xD={self.xD:.6g}, xB={self.xB:.6g})")
+
+
+for _name in SCALAR_FIELDS:
+    setattr(ColumnResult, _name, _scalar(_name))
+del _name
+
+
+class ResultSet:
+    """
+    Many results stacked as 2-D arrays (case, stage); columns with fewer stages
+    than max_stages are NaN-padded. Rows are zero-copy ColumnResult views.
+    errors: {case id: message} for cases that were not solved (screened out
+    or raised); their rows keep converged = 0 and NaN profiles.
+    """
+
+    __slots__ = ("x", "y", "T", "eff", "scalars", "names", "errors")
+
+    def __init__(self, n_cases, max_stages, names=None):
+        shape = (int(n_cases), int(max_stages))
+        self.x = np.full(shape, np.nan)
+        self.y = np.full(shape, np.nan)
+        self.T = np.full(shape, np.nan)
+        self.eff = np.full(shape, np.nan)
+        self.scalars = np.zeros((shape[0], len(SCALAR_FIELDS)))
+        self.scalars[:, _IDX["n_stages"]] = max_stages
+        self.names = list(names) if names is not None else [None] * shape[0]
+        self.errors = {}
+
+    @classmethod
+    def stack(cls, results, names=None):
+        """
+        Copy independent ColumnResults into a new set (one copy per array).
+        To avoid even that, preallocate a ResultSet and solve into rs.row(i, n).
+        """
+        results = list(results)
+        rs = cls(len(results), max((r.n for r in results), default=0), names=names)
+        for i, r in enumerate(results):
+            view = rs.row(i, r.n)
+            for field in PROFILE_FIELDS:
+                getattr(view, field)[:] = getattr(r, field)
+            view.scalars[:] = r.scalars
+        return rs
+
+    def __len__(self):
+        return self.scalars.shape[0]
+
+    @property
+    def max_stages(self):
+        return self.x.shape[1]
+
+    def row(self, i, n_stages=None):
+        """
+        Writable ColumnResult view of case i, sized to n_stages (recorded for later reads).
+        """
+        if n_stages is not None:
+            if not 0 < n_stages <= self.max_stages:
+                raise ValueError(f"n_stages must be in 1..{self.max_stages}")
+            self.scalars[i, _IDX["n_stages"]] = n_stages
+        n = int(self.scalars[i, _IDX["n_stages"]])
+        return ColumnResult(
+            n,
+            x=self.x[i, :n], y=self.y[i, :n], T=self.T[i, :n], eff=self.eff[i, :n],
+            scalars=self.scalars[i],
+        )
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+    def field(self, name):
+        """
+        Column view of one scalar field across all cases, e.g. rs.field("xD").
+        """
+        return self.scalars[:, _IDX[name]]
+
+    def summary_frame(self):
+        """
+        One row per case with all scalar fields (pandas DataFrame).
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(self.scalars, columns=list(SCALAR_FIELDS))
+        df["converged"] = df["converged"].astype(bool)
+        for k in ("iters", "n_stages", "feed_stage"):
+            df[k] = df[k].astype(int)
+        if any(n is not None for n in self.names):
+            df.insert(0, "case", self.names)
+        return df
+
+
+class MultiComponentResult:
+    """
+    Stage profile of a multicomponent column: x, y are (n, c) with one column
+    per component (names), T and eff are (n,); xD, xB are (c,).
+    """
+
+    def __init__(self, names, x, y, T, eff, xD, xB, flows, spec, info):
+        self.names = tuple(names)
+        self.x = x
+        self.y = y
+        self.T = T
+        self.eff = eff
+        self.xD = xD
+        self.xB = xB
+        self.flows = dict(flows)
+        self.spec = spec
+        self.converged = bool(info["converged"])
+        self.iters = int(info["iters"])
+        self.res_norm = float(info["res_norm"])
+
+    @property
+    def n(self):
+        return self.T.size
+
+    @property
+    def stage(self):
+        return np.arange(1, self.n + 1)
+
+    def recovery(self, name):
+        """
+        Fraction of the feed's `name` recovered in the distillate.
+        """
+        j = self.names.index(name)
+        return float(self.spec.D * self.xD[j] / (self.spec.F * self.spec.zF[j]))
+
+    def to_frame(self):
+        """
+        Stage profile as a pandas DataFrame: stage, x_<name>..., y_<name>..., T_C, eff.
+        """
+        import pandas as pd
+
+        cols = {"stage": self.stage}
+        cols.update({f"x_{c}": self.x[:, j] for j, c in enumerate(self.names)})
+        cols.update({f"y_{c}": self.y[:, j] for j, c in enumerate(self.names)})
+        cols["T_C"] = self.T
+        cols["eff"] = self.eff
+        return pd.DataFrame(cols)
+
+    def to_dict(self):
+        s = self.spec
+        return {
+            "converged": self.converged,
+            "iters": self.iters,
+            "res_norm": self.res_norm,
+            "xD": dict(zip(self.names, self.xD.tolist())),
+            "xB": dict(zip(self.names, self.xB.tolist())),
+            "flows": self.flows,
+            "spec": {
+                "components": list(self.names),
+                "n_stages": int(s.n),
+                "feed_stage": int(s.f),
+                "P_mmHg": s.P,
+                "F": s.F,
+                "zF": dict(zip(self.names, s.zF.tolist())),
+                "q": s.q,
+                "D": s.D,
+                "R": s.R,
+            },
+        }
+
+    def __repr__(self):
+        xD = ", ".join(f"{c}={v:.4g}" for c, v in zip(self.names, self.xD))
+        return f"MultiComponentResult(n={self.n}, converged={self.converged}, xD=[{xD}])"
@@ -0,0 +1,314 @@
+"""
+Adaptive parameter-space sampling for operating maps.
+
+AdaptiveSampler refines a rectilinear grid over one or more spec fields (e.g.
+reflux_ratio, or reflux_ratio x feed_stage, or zF x F). After each round, every
+grid interval along every axis gets an interpolation-error estimate: the gap at
+the interval midpoint between linear interpolation and the quadratic through the
+neighbouring samples. Intervals whose error exceeds the target accuracy are
+split, so samples collect around knees (e.g. near minimum reflux) and stay
+sparse where the response is flat. Integer axes (feed stage, number of stages)
+are split only down to neighbouring integers.
+
+Each new point warm-starts Newton from the nearest solved point. The result is
+an OperatingMap: the final samples plus multilinear interpolation between them.
+"""
+
+import itertools
+
+import numpy as np
+
+from .column import ColumnSpec, DistillationColumn
+
+
+class Axis:
+    """
+    One sampled spec field: ColumnSpec keyword `name` over [lo, hi], starting
+    from n_init evenly spaced points (integer=True rounds to whole numbers).
+    """
+
+    def __init__(self, name, lo, hi, n_init=5, integer=False):
+        if not hi > lo:
+            raise ValueError(f"axis {name!r}: hi must be greater than lo")
+        if n_init < 2:
+            raise ValueError("n_init must be at least 2")
+        self.name = name
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.n_init = int(n_init)
+        self.integer = bool(integer)
+
+    def initial(self):
+        pts = np.linspace(self.lo, self.hi, self.n_init)
+        return np.unique(np.round(pts)) if self.integer else pts
+
+    def midpoint(self, a, b):
+        """
+        Split point of [a, b], or None when the interval cannot be split further.
+        """
+        m = 0.5 * (a + b)
+        if self.integer:
+            m = float(np.floor(m))
+            return m if a < m < b else None
+        return m if b - a > 1e-9 * max(1.0, abs(self.hi - self.lo)) else None
+
+    def __repr__(self):
+        kind = "int" if self.integer else "float"
+        return f"Axis({self.name!r}, {self.lo:g}..{self.hi:g}, {kind})"
+
+
+def _midpoint_errors(p, v):
+    """
+    Interpolation-error estimate for each interval of points p (m,) with values
+    v (m, k): |quadratic - linear| at the midpoint, the larger of the two
+    quadratics through the interval and its left/right neighbour. (m-1, k).
+    """
+    m = p.size
+    err = np.zeros((m - 1,) + v.shape[1:])
+    if m < 3:
+        err[:] = np.inf
+        return err
+
+    def quad(i0, xm):
+        x0, x1, x2 = p[i0], p[i0 + 1], p[i0 + 2]
+        l0 = (xm - x1) * (xm - x2) / ((x0 - x1) * (x0 - x2))
+        l1 = (xm - x0) * (xm - x2) / ((x1 - x0) * (x1 - x2))
+        l2 = (xm - x0) * (xm - x1) / ((x2 - x0) * (x2 - x1))
+        return l0 * v[i0] + l1 * v[i0 + 1] + l2 * v[i0 + 2]
+
+    for i in range(m - 1):
+        xm = 0.5 * (p[i] + p[i + 1])
+        lin = 0.5 * (v[i] + v[i + 1])
+        e = np.zeros_like(lin)
+        if i >= 1:
+            e = np.fmax(e, np.abs(quad(i - 1, xm) - lin))
+        if i + 2 < m:
+            e = np.fmax(e, np.abs(quad(i, xm) - lin))
+        err[i] = e
+    return err
+
+
+class OperatingMap:
+    """
+    Responses on a rectilinear grid (one value array per response, shaped like
+    the grid) with multilinear interpolation between the samples.
+    """
+
+    def __init__(self, axes, grid, values, converged, n_solves=0, complete=True):
+        self.axes = list(axes)
+        self.grid = [np.asarray(g, dtype=float) for g in grid]
+        self.values = values
+        self.converged = converged
+        self.n_solves = int(n_solves)
+        self.complete = bool(complete)
+
+    @property
+    def names(self):
+        return [a.name for a in self.axes]
+
+    @property
+    def shape(self):
+        return tuple(g.size for g in self.grid)
+
+    def __call__(self, **params):
+        """
+        Interpolated responses at one point, e.g. omap(reflux_ratio=2.2, feed_stage=9).
+        """
+        pt = np.array([[params[name] for name in self.names]], dtype=float)
+        return {k: float(v[0]) for k, v in self.interpolate(pt).items()}
+
+    def interpolate(self, points):
+        """
+        Multilinear interpolation at points (k, n_axes), clamped to the sampled
+        box. Returns {response: (k,) array}.
+        """
+        pts = np.atleast_2d(np.asarray(points, dtype=float))
+        if pts.shape[1] != len(self.grid):
+            raise ValueError(f"points need {len(self.grid)} coordinates")
+
+        idx, frac = [], []
+        for d, g in enumerate(self.grid):
+            c = np.clip(pts[:, d], g[0], g[-1])
+            if g.size == 1:
+                idx.append(np.zeros(len(c), dtype=int))
+                frac.append(np.zeros(len(c)))
+                continue
+            i = np.clip(np.searchsorted(g, c, side="right") - 1, 0, g.size - 2)
+            idx.append(i)
+            frac.append((c - g[i]) / (g[i + 1] - g[i]))
+
+        out = {}
+        for name, V in self.values.items():
+            acc = np.zeros(len(pts))
+            for corner in itertools.product((0, 1), repeat=len(self.grid)):
+                w = np.ones(len(pts))
+                ii = []
+                for d, c in enumerate(corner):
+                    w = w * (frac[d] if c else 1.0 - frac[d])
+                    ii.append(np.minimum(idx[d] + c, self.grid[d].size - 1))
+                acc += w * V[tuple(ii)]
+            out[name] = acc
+        return out
+
+    def samples(self):
+        """
+        Every sample as a dict: axis values, responses and "converged".
+        """
+        rows = []
+        for ii in itertools.product(*(range(g.size) for g in self.grid)):
+            row = {a.name: g[i] for a, g, i in zip(self.axes, self.grid, ii)}
+            row.update({k: float(v[ii]) for k, v in self.values.items()})
+            row["converged"] = bool(self.converged[ii])
+            rows.append(row)
+        return rows
+
+    def to_frame(self):
+        """
+        Sample table (pandas DataFrame), one row per grid point.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.samples())
+
+    def dense(self, n=101):
+        """
+        Interpolated map on an even n-point-per-axis grid: (axes grids, {response: array}).
+        """
+        axes = [np.linspace(g[0], g[-1], n) for g in self.grid]
+        mesh = np.stack([m.ravel() for m in np.meshgrid(*axes, indexing="ij")], axis=1)
+        vals = self.interpolate(mesh)
+        return axes, {k: v.reshape((n,) * len(axes)) for k, v in vals.items()}
+
+
+class AdaptiveSampler:
+    """
+    Parameters
+    ----------
+    base_spec : ColumnSpec
+        Fields not on an axis are taken from this spec.
+    axes : list of Axis
+        One or more sampled fields (ColumnSpec keyword names).
+    responses : dict or tuple
+        Responses to resolve, as {name: tol} or names sharing `tol`. Names are
+        ColumnResult fields ("xD", "xB", "V", ...); a callable value in
+        `extract` may define further ones.
+    tol : float
+        Target interpolation accuracy (absolute, in response units).
+    max_solves : int
+        Solve budget; refinement stops early (complete=False) when it would be exceeded.
+    extract : dict, optional
+        {name: callable(ColumnResult) -> float} for derived responses.
+    """
+
+    def __init__(self, base_spec: ColumnSpec, axes, responses=("xD",), tol=1e-3, max_solves=400,
+                 max_rounds=30, extract=None):
+        self.base = base_spec.to_dict()
+        self.axes = list(axes)
+        if not self.axes:
+            raise ValueError("need at least one axis")
+        if isinstance(responses, dict):
+            self.tols = {k: float(v) for k, v in responses.items()}
+        else:
+            self.tols = {k: float(tol) for k in responses}
+        self.extract = dict(extract or {})
+        self.max_solves = int(max_solves)
+        self.max_rounds = int(max_rounds)
+
+        self._cache = {}    # point -> (responses, converged, solution)
+        self.n_solves = 0
+
+    def _spec(self, point):
+        kw = dict(self.base)
+        for axis, value in zip(self.axes, point):
+            kw[axis.name] = int(value) if axis.integer else float(value)
+        return ColumnSpec(**kw)
+
+    def _nearest_solution(self, point):
+        # any tray count: simulate() remaps profiles of other structures
+        span = np.array([a.hi - a.lo for a in self.axes])
+        best, best_d = None, np.inf
+        p = np.asarray(point)
+        for q, (_, _, u) in self._cache.items():
+            if u is None:
+                continue
+            d = float(np.sum(((np.asarray(q) - p) / span) ** 2))
+            if d < best_d:
+                best, best_d = u, d
+        return best
+
+    def _solve(self, point):
+        try:
+            spec = self._spec(point)
+        except ValueError:
+            # e.g. no stripping vapor there: a failed sample
+            self.n_solves += 1
+            self._cache[point] = ({k: np.nan for k in self.tols}, False, None)
+            return
+        col = DistillationColumn(spec)
+        u0 = self._nearest_solution(point)
+        res = col.simulate(x_init=u0, return_type="array")
+        if not res.converged and u0 is not None:
+            res = col.simulate(return_type="array")
+        self.n_solves += 1
+
+        vals = {}
+        for name in self.tols:
+            fn = self.extract.get(name)
+            vals[name] = float(fn(res)) if fn is not None else res[name]
+        self._cache[point] = (vals, bool(res.converged), col.solution)
+
+    def _tabulate(self, grid):
+        shape = tuple(g.size for g in grid)
+        values = {k: np.empty(shape) for k in self.tols}
+        conv = np.empty(shape, dtype=bool)
+        for ii in itertools.product(*(range(s) for s in shape)):
+            vals, ok, _ = self._cache[tuple(g[i] for g, i in zip(grid, ii))]
+            conv[ii] = ok
+            for k in values:
+                values[k][ii] = vals[k] if ok else np.nan
+        return values, conv
+
+    def run(self):
+        """
+        Refine until every interval meets the tolerance (or the budget/round
+        limit is hit). Intervals between a converged and an unconverged sample
+        are always split.
+        Returns an OperatingMap, complete only if refinement finished and every
+        sample converged.
+        """
+        grid = [a.initial() for a in self.axes]
+        solved = None
+        complete = False
+
+        for _ in range(self.max_rounds):
+            todo = [p for p in itertools.product(*grid) if p not in self._cache]
+            if solved is not None and self.n_solves + len(todo) > self.max_solves:
+                break
+            for p in todo:
+                self._solve(p)
+            solved = grid
+            values, _ = self._tabulate(grid)
+
+            # normalized error per interval, maximized over the other axes and responses
+            new_grid = []
+            for d, axis in enumerate(self.axes):
+                worst = np.zeros(grid[d].size - 1)
+                for name, V in values.items():
+                    v = np.moveaxis(V, d, 0).reshape(grid[d].size, -1) / self.tols[name]
+                    err = np.nan_to_num(_midpoint_errors(grid[d], v), nan=0.0)
+                    # no estimate between a solved and a failed sample: split, to close in
+                    # on the failed region (not inside it)
+                    err[np.isnan(v[:-1]) != np.isnan(v[1:])] = np.inf
+                    worst = np.maximum(worst, err.max(axis=1))
+                mids = [axis.midpoint(a, b) for a, b, e in zip(grid[d][:-1], grid[d][1:], worst) if e > 1.0]
+                mids = [m for m in mids if m is not None]
+                new_grid.append(np.union1d(grid[d], mids) if mids else grid[d])
+
+            if all(g.size == h.size for g, h in zip(new_grid, grid)):
+                complete = True
+                break
+            grid = new_grid
+
+        values, conv = self._tabulate(solved)
+        return OperatingMap(self.axes, solved, values, conv, n_solves=self.n_solves,
+                            complete=complete and bool(conv.all()))
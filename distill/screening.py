@@ -0,0 +1,274 @@
+"""
+Pre-solve feasibility screening for whole batches of specs.
+
+screen(specs) classifies every case as feasible, marginal or infeasible from
+closed-form shortcut estimates evaluated on (n_cases,) arrays, before any
+Newton solve:
+
+    infeasible   a SpecTable.check() rule fails (D >= F, Ls or Vs <= 0, zF or
+                 efficiencies out of range, ...), or a design target cannot be
+                 met: more product than the feed's benzene allows, fewer
+                 equilibrium stages than Fenske's minimum, or (reflux fixed)
+                 a reflux ratio below Underwood's minimum
+    marginal     within `margin` of those stage / reflux limits, short of the
+                 Gilliland stage count at the given R, or the estimated split
+                 is so sharp (an impurity below `sharp`) that fractions sit
+                 near the solver's 1e-8 clip
+
+The estimates assume a constant relative volatility (ideal benzene/toluene at
+the top and bottom boiling points, geometric mean; pass alpha= for other
+systems) and about sum(eff) + 1 equilibrium stages (trays plus reboiler). The
+split of a plain spec is the Fenske–Underwood–Gilliland (Molokanov) estimate
+at its R and stages. They are shortcuts: marginal cases are worth solving,
+only infeasible ones are skipped by the runners (SpecTable.solve,
+solve_parallel).
+"""
+
+import numpy as np
+
+from .spec_table import SpecTable
+from .thermo import ANTOINE
+
+FEASIBLE, MARGINAL, INFEASIBLE = "feasible", "marginal", "infeasible"
+
+# rule -> class; SpecTable.check() rules are all infeasible
+RULES = {
+    "n_stages": INFEASIBLE, "feed_stage": INFEASIBLE, "pressure": INFEASIBLE, "F": INFEASIBLE,
+    "zF": INFEASIBLE, "D": INFEASIBLE, "reflux_ratio": INFEASIBLE, "flows": INFEASIBLE, "eff": INFEASIBLE,
+    "target_balance": INFEASIBLE,   # design target needs more benzene (or toluene) than the feed has
+    "min_stages": INFEASIBLE,       # fewer equilibrium stages than Fenske's minimum for the target
+    "min_reflux": INFEASIBLE,       # R below Underwood's minimum for the target (R fixed)
+    "near_min_stages": MARGINAL,
+    "near_min_reflux": MARGINAL,
+    "short_stages": MARGINAL,       # Gilliland's stage count at R exceeds N_eq (R fixed)
+    "sharp": MARGINAL,              # estimated impurity below `sharp`
+}
+
+
+def relative_volatility(P, light="benzene", heavy="toluene"):
+    """
+    Geometric mean of Psat_light / Psat_heavy at the two pure boiling points at
+    pressure P (mmHg, broadcast).
+    """
+    A1, B1, C1 = ANTOINE[light]
+    A2, B2, C2 = ANTOINE[heavy]
+    lp = np.log10(np.asarray(P, dtype=float))
+    log_a = [(A1 - A2) - B1 / (C1 + T) + B2 / (C2 + T) for T in (B1 / (A1 - lp) - C1, B2 / (A2 - lp) - C2)]
+    return 10.0 ** (0.5 * (log_a[0] + log_a[1]))
+
+
+def _pinch(alpha, zF, q, iters=60):
+    # intersection (x*, y*) of the q-line with the equilibrium curve, by bisection on
+    # q x + (1 - q) y(x) = zF, which is < 0 at x = 0 and > 0 at x = 1
+    lo, hi = np.zeros_like(zF), np.ones_like(zF)
+    for _ in range(iters):
+        x = 0.5 * (lo + hi)
+        y = alpha * x / (1.0 + (alpha - 1.0) * x)
+        up = q * x + (1.0 - q) * y > zF
+        hi = np.where(up, x, hi)
+        lo = np.where(up, lo, x)
+    x = 0.5 * (lo + hi)
+    return x, alpha * x / (1.0 + (alpha - 1.0) * x)
+
+
+def _split(log_S, F, zF, D, iters=60):
+    """
+    Product split of separation factor S = (xD / (1 - xD)) / (xB / (1 - xB)) for
+    the fixed D: benzene flow lost to the bottoms u c and toluene flow carried
+    to the distillate v c2 (c, c2: feed benzene and toluene), from whichever
+    of the two can go to zero (bisection on its log), so sharp splits keep
+    their relative accuracy. Returns (xB, 1 - xD).
+    """
+    c, c2 = F * zF, F * (1.0 - zF)
+    delta = D - c                      # = v c2 - u c
+    # free impurity w (u if delta >= 0 else v) and the other one as its function
+    scale_w = np.where(delta >= 0, c, c2)
+    scale_o = np.where(delta >= 0, c2, c)
+    w_max = np.minimum(1.0, np.where(delta >= 0, F - D, D) / scale_w)
+    lo = np.full_like(log_S, -700.0)
+    hi = np.log(w_max)
+    for _ in range(iters):
+        lw = 0.5 * (lo + hi)
+        w = np.exp(lw)
+        o = np.minimum((np.abs(delta) + w * scale_w) / scale_o, 1.0)
+        ls = np.log1p(-np.minimum(w, 1.0 - 1e-16)) + np.log1p(-np.minimum(o, 1.0 - 1e-16)) - lw - np.log(o)
+        big = ls > log_S               # S falls as w grows
+        lo = np.where(big, lw, lo)
+        hi = np.where(big, hi, lw)
+    w = np.exp(0.5 * (lo + hi))
+    o = np.minimum((np.abs(delta) + w * scale_w) / scale_o, 1.0)
+    u, v = np.where(delta >= 0, w, o), np.where(delta >= 0, o, w)
+    return u * c / (F - D), v * c2 / D
+
+
+def _min_reflux(xD, pinch):
+    x, y = pinch
+    return np.maximum((xD - y) / (y - x), 0.0)
+
+
+def _gilliland(R, R_min, N_min):
+    # stages needed at R (Molokanov's fit of Gilliland's correlation), inf at or below R_min
+    X = np.clip((R - R_min) / (R + 1.0), 0.0, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Y = np.where(X > 0.0, 1.0 - np.exp((1.0 + 54.4 * X) / (11.0 + 117.2 * X) * (X - 1.0) / np.sqrt(X)), 1.0)
+        return np.where(Y < 1.0, (N_min + Y) / (1.0 - Y), np.inf)
+
+
+def _estimate_split(alpha, N_eq, R, F, zF, D, pinch, iters=50):
+    # largest separation factor whose Gilliland stage count fits in N_eq
+    lo = np.zeros_like(R)
+    hi = N_eq * np.log(alpha)          # total reflux
+    for _ in range(iters):
+        ls = 0.5 * (lo + hi)
+        xB, imp_D = _split(ls, F, zF, D)
+        N_req = _gilliland(R, _min_reflux(1.0 - imp_D, pinch), ls / np.log(alpha))
+        ok = N_req <= N_eq
+        lo = np.where(ok, ls, lo)
+        hi = np.where(ok, hi, ls)
+    return _split(lo, F, zF, D)
+
+
+class Screening:
+    """
+    Result of screen(): status (n_cases,) of "feasible" / "marginal" /
+    "infeasible", rules {rule: (n_cases,) bool, True = triggered} and the
+    shortcut estimates (alpha, N_eq, N_min, R_min, xD_est, xB_est).
+    """
+
+    def __init__(self, rules, estimates):
+        self.rules = rules
+        self.estimates = estimates
+        n = len(estimates["alpha"])
+        bad = np.zeros(n, dtype=bool)
+        near = np.zeros(n, dtype=bool)
+        for name, hit in rules.items():
+            if RULES[name] == INFEASIBLE:
+                bad |= hit
+            else:
+                near |= hit
+        self.status = np.where(bad, INFEASIBLE, np.where(near, MARGINAL, FEASIBLE)).astype(object)
+
+    def __len__(self):
+        return self.status.size
+
+    @property
+    def feasible(self):
+        return self.status == FEASIBLE
+
+    @property
+    def marginal(self):
+        return self.status == MARGINAL
+
+    @property
+    def infeasible(self):
+        return self.status == INFEASIBLE
+
+    def counts(self):
+        return {k: int(np.sum(self.status == k)) for k in (FEASIBLE, MARGINAL, INFEASIBLE)}
+
+    def reasons(self, i):
+        """
+        Triggered rules of case i (infeasible ones first).
+        """
+        hit = [name for name, mask in self.rules.items() if mask[i]]
+        return sorted(hit, key=lambda name: RULES[name] != INFEASIBLE)
+
+    def to_frame(self):
+        """
+        One row per case: status, reasons and the estimates (pandas DataFrame).
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(self.estimates)
+        df.insert(0, "status", self.status)
+        df.insert(1, "reasons", [", ".join(self.reasons(i)) for i in range(len(self))])
+        return df
+
+    def __repr__(self):
+        c = self.counts()
+        return f"Screening({len(self)} cases: " + ", ".join(f"{v} {k}" for k, v in c.items()) + ")"
+
+
+def _designs(design, n):
+    # design targets as arrays: kind (0 none, 1 xD, 2 xB, 3 recovery), value, frees R
+    kind = np.zeros(n, dtype=int)
+    value = np.full(n, np.nan)
+    free_R = np.zeros(n, dtype=bool)
+    for i, d in enumerate(design):
+        if d is not None:
+            kind[i] = 1 + ("xD", "xB", "recovery").index(d.target)
+            value[i] = d.value
+            free_R[i] = d.free == "R"
+    return kind, value, free_R
+
+
+def screen(specs, margin=0.1, sharp=1e-9, alpha=None):
+    """
+    Screen a SpecTable or a list of ColumnSpecs / SpecRows (see module doc).
+    margin: relative band above the minimum stages / reflux that is marginal.
+    sharp: estimated product impurity below which a split is marginal.
+    alpha: relative volatility (scalar or per case) instead of benzene/toluene.
+    Design targets are screened with the spec's other fields fixed: for
+    free="R" the stage and mass-balance limits, for free="D" the reflux and
+    (Gilliland) stage limits of an xD target.
+    """
+    table = specs if isinstance(specs, SpecTable) else SpecTable.from_specs(specs)
+    n_cases = len(table)
+    rules = {name: ~ok for name, ok in table.check().items() if name != "valid"}
+    bad = np.zeros(n_cases, dtype=bool)
+    for hit in rules.values():
+        bad |= hit
+
+    # estimates run on sanitized copies, infeasible cases get NaN afterwards
+    c = table.cols
+    F = np.where(bad, 100.0, c["F"])
+    zF = np.where(bad, 0.5, c["zF"])
+    D = np.where(bad, 50.0, c["D"])
+    R = np.where(bad, 1.0, c["reflux_ratio"])
+    q = np.where(bad, 1.0, c["q"])
+    P = np.where(c["pressure_mmHg"] > 0, c["pressure_mmHg"], 760.0)
+    a = relative_volatility(P) if alpha is None else np.broadcast_to(np.asarray(alpha, dtype=float), (n_cases,))
+    a = np.where(a > 1.0, a, np.nan)
+    in_col = np.arange(table.max_stages) < c["n_stages"][:, None]
+    N_eq = np.where(in_col, np.nan_to_num(table.eff, nan=0.0), 0.0).sum(axis=1) + 1.0
+    pinch = _pinch(a, zF, q)
+
+    # plain specs: shortcut split at the given R and stages
+    xB_est, imp_D = _estimate_split(a, N_eq, R, F, zF, D, pinch)
+    xD_est = 1.0 - imp_D
+    N_min = np.log((xD_est / imp_D) / (xB_est / (1.0 - xB_est))) / np.log(a)
+    R_min = _min_reflux(xD_est, pinch)
+
+    # design targets replace the estimated split by the one they ask for
+    kind, value, free_R = _designs(table.design, n_cases)
+    B = F - D
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xD_t = np.select([kind == 1, kind == 2, kind == 3], [value, (F * zF - B * value) / D, value * F * zF / D], np.nan)
+        xB_t = np.select([kind == 1, kind == 2, kind == 3], [(F * zF - D * value) / B, value, (1.0 - value) * F * zF / B], np.nan)
+        design = kind > 0
+        balance = design & free_R & ~((xD_t > 0) & (xD_t < 1) & (xB_t > 0) & (xB_t < 1))
+        ok_split = design & ~balance
+        N_t = np.log((xD_t / (1.0 - xD_t)) / (xB_t / (1.0 - xB_t))) / np.log(a)
+        R_t = _min_reflux(xD_t, pinch)
+        # free D: the fewest stages are needed as D -> 0, where xB -> zF
+        N_lo = np.log((xD_t / (1.0 - xD_t)) / (zF / (1.0 - zF))) / np.log(a)
+    stages_t = ok_split & free_R
+    reflux_t = design & ~free_R & (kind == 1)
+    N_min = np.select([stages_t, reflux_t], [N_t, N_lo], N_min)
+    R_min = np.where(ok_split & (kind == 1), R_t, R_min)
+    xD_est = np.where(stages_t | reflux_t, xD_t, xD_est)
+    xB_est = np.select([stages_t, reflux_t], [xB_t, np.nan], xB_est)
+
+    rules["target_balance"] = balance & ~bad
+    rules["min_stages"] = stages_t & (N_eq < N_min) & ~bad
+    rules["min_reflux"] = reflux_t & (R < R_min) & ~bad
+    rules["near_min_stages"] = stages_t & (N_eq >= N_min) & (N_eq < (1.0 + margin) * N_min) & ~bad
+    rules["near_min_reflux"] = reflux_t & (R >= R_min) & (R < (1.0 + margin) * R_min) & ~bad
+    rules["short_stages"] = reflux_t & (R >= R_min) & (_gilliland(R, R_min, N_min) > N_eq) & ~bad
+    imp = np.minimum(xB_est, 1.0 - xD_est)
+    rules["sharp"] = ~design & (imp < sharp) & ~bad
+
+    estimates = {"alpha": a, "N_eq": N_eq, "N_min": N_min, "R_min": R_min, "xD_est": xD_est, "xB_est": xB_est}
+    for k, v in estimates.items():
+        estimates[k] = np.where(bad, np.nan, v)
+    return Screening(rules, estimates)
@@ -0,0 +1,286 @@
+"""
+Long-running local simulation service.
+
+Worker processes import numpy once and stay alive between batches, so
+short jobs no longer pay interpreter start-up and import cost per run.
+
+Protocol: newline-delimited JSON over TCP or a Unix socket. One request per line:
+
+    {"id": 1, "cases": [{"name": "base", "spec": {...ColumnSpec kwargs...}}], "profile": true}
+
+and one response line per request (requests on a connection may be pipelined,
+responses carry the request id):
+
+    {"id": 1, "results": [{"name": "base", "summary": {...}, "profile": {...}}]}
+
+Run with:
+    python -m distill.service --port 8765
+    python -m distill.service --unix /tmp/distill.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .column import ColumnSpec, DistillationColumn
+from .screening import screen
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# per-worker warm start store: (n_stages, feed_stage) -> last converged [x1..xN, xB]
+_WARM = {}
+
+
+def _warm_worker():
+    # one throwaway solve so the first real case does not pay first-call costs
+    DistillationColumn(ColumnSpec()).simulate(return_type="array")
+
+
+def screen_cases(cases) -> dict:
+    """
+    {index: "Infeasible: <rules>"} for the cases of a batch that
+    distill.screening rules out; specs that do not parse are left to solve_case.
+    """
+    specs, index = [], []
+    for i, case in enumerate(cases):
+        try:
+            specs.append(ColumnSpec(**case.get("spec", {})))
+            index.append(i)
+        except Exception:
+            pass
+    if not specs:
+        return {}
+    sc = screen(specs)
+    return {index[j]: "Infeasible: " + ", ".join(sc.reasons(j)) for j in range(len(specs)) if sc.infeasible[j]}
+
+
+def solve_case(case: dict, profile: bool = True, warm_start: bool = True) -> dict:
+    """
+    Solve one JSON case {"name": ..., "spec": {...}, "x_init": optional}.
+    Runs inside a worker process; returns a JSON-friendly result record.
+    """
+    name = case.get("name")
+    try:
+        spec = ColumnSpec(**case.get("spec", {}))
+        col = DistillationColumn(spec)
+
+        x_init = case.get("x_init")
+        key = (spec.n, spec.f)
+        warm = x_init is None and warm_start and bool(_WARM)
+        if warm:
+            # same structure if seen, else the nearest one (remapped by simulate())
+            near = min(_WARM, key=lambda k: abs(k[0] - key[0]) + abs(k[1] - key[1]))
+            x_init = _WARM[near]
+
+        res = col.simulate(x_init=x_init, return_type="array")
+        if warm and not res.converged:
+            # warm start from a distant operating point can fail: retry cold
+            res = col.simulate(return_type="array")
+
+        if res.converged:
+            _WARM[key] = res.x.tolist() + [res.xB]
+    except Exception as exc:  # report per-case failures, keep the batch going
+        return {"name": name, "error": f"{type(exc).__name__}: {exc}"}
+
+    out = {"name": name, "summary": res.to_dict()}
+    if profile:
+        out["profile"] = {
+            "stage": res.stage.tolist(),
+            "x_bz": res.x.tolist(),
+            "y_bz": res.y.tolist(),
+            "T_C": res.T.tolist(),
+            "eff": res.eff.tolist(),
+        }
+    return out
+
+
+class SimulationServer:
+    """
+    asyncio front end over a warm process pool.
+
+    Backpressure: at most `max_pending` cases are in flight across all clients
+    and at most `max_requests_per_conn` requests per connection; while either
+    limit is reached the server stops reading, so clients block in send().
+    """
+
+    def __init__(self, max_workers=None, max_pending=64, max_requests_per_conn=4,
+                 max_batch=10000, cache_size=4096, warm_start=True, screen=True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = int(max_pending)
+        self.max_requests_per_conn = int(max_requests_per_conn)
+        self.max_batch = int(max_batch)
+        self.cache_size = int(cache_size)
+        self.warm_start = bool(warm_start)
+        # answer infeasible specs from the screening, without a worker round trip
+        self.screen = bool(screen)
+
+        self._pool = None
+        self._slots = None
+        self._cache = OrderedDict()
+        self.stats = {"requests": 0, "cases": 0, "cache_hits": 0, "errors": 0, "screened_out": 0, "clients": 0}
+
+    def start_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_worker)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    # --- request handling ---
+
+    async def handle_connection(self, reader, writer):
+        self.stats["clients"] += 1
+        conn_slots = asyncio.Semaphore(self.max_requests_per_conn)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        try:
+            while True:
+                await conn_slots.acquire()
+                line = await reader.readline()
+                if not line:
+                    conn_slots.release()
+                    break
+                task = asyncio.create_task(self._serve_line(line, writer, write_lock, conn_slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for t in tasks:
+                t.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _serve_line(self, line, writer, write_lock, conn_slots):
+        try:
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError as exc:
+                resp = {"id": None, "error": f"invalid JSON: {exc}"}
+            else:
+                resp = await self.handle_request(req)
+
+            async with write_lock:
+                writer.write((json.dumps(resp) + "\n").encode())
+                await writer.drain()
+        finally:
+            conn_slots.release()
+
+    async def handle_request(self, req: dict) -> dict:
+        rid = req.get("id")
+        self.stats["requests"] += 1
+
+        op = req.get("op", "solve")
+        if op == "ping":
+            return {"id": rid, "ok": True}
+        if op == "stats":
+            return {"id": rid, "stats": dict(self.stats, cache_size=len(self._cache))}
+        if op != "solve":
+            return {"id": rid, "error": f"unknown op {op!r}"}
+
+        cases = req.get("cases", [])
+        if len(cases) > self.max_batch:
+            return {"id": rid, "error": f"batch of {len(cases)} cases exceeds max_batch={self.max_batch}"}
+
+        profile = bool(req.get("profile", True))
+        skip = screen_cases(cases) if self.screen else {}
+        results = await asyncio.gather(*(self._run_case(c, profile, skip.get(i)) for i, c in enumerate(cases)))
+        return {"id": rid, "results": list(results)}
+
+    async def _run_case(self, case, profile, infeasible=None):
+        self.stats["cases"] += 1
+        if infeasible is not None:
+            self.stats["screened_out"] += 1
+            self.stats["errors"] += 1
+            return {"name": case.get("name"), "error": infeasible}
+
+        key = None
+        if case.get("x_init") is None:
+            key = json.dumps([case.get("spec", {}), profile], sort_keys=True)
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return dict(hit, name=case.get("name"))
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.start_pool(), solve_case, case, profile, self.warm_start)
+
+        if "error" in result:
+            self.stats["errors"] += 1
+        elif key is not None and self.cache_size > 0:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    # --- entry points ---
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        self.start_pool()
+        limit = 64 * 1024 * 1024  # allow large batches on one line
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path, limit=limit)
+            where = unix_path
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=limit)
+            where = f"{host}:{port}"
+
+        # stop cleanly on SIGINT/SIGTERM (SIGINT is ignored for background jobs)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        print(f"distill service listening on {where} ({self.max_workers} workers)", flush=True)
+        async with server:
+            await stop.wait()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the persistent distillation simulation service.")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--unix", default=None, help="serve on a Unix socket path instead of TCP")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max-pending", type=int, default=64)
+    ap.add_argument("--no-warm-start", action="store_true")
+    ap.add_argument("--no-screen", action="store_true", help="send infeasible specs to the workers too")
+    args = ap.parse_args(argv)
+
+    srv = SimulationServer(max_workers=args.workers, max_pending=args.max_pending,
+                           warm_start=not args.no_warm_start, screen=not args.no_screen)
+    try:
+        asyncio.run(srv.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Real-time soft sensor: streaming composition inference from plant measurements.
+
+Each sample carries the operating point (F, D, reflux ratio and the feed
+composition estimate zF) plus tray temperatures. SoftSensor.update():
+  - warm-starts the column from the previous solution
+  - caps the Newton solve at a fixed iteration and wall-clock budget (a solve
+    cut short is reported as not converged and picked up by the next sample)
+  - corrects a feed-composition bias with one Gauss–Newton step on the
+    thermocouple residuals, using dT/dzF from DistillationColumn.sensitivities()
+  - records per-update latency for latency_percentiles()
+
+replay_csv() feeds recorded CSV data as a stand-in for the plant historian.
+"""
+
+import collections
+import csv
+import re
+import time
+
+import numpy as np
+
+from .column import ColumnSpec, DistillationColumn
+from .solver import NewtonSolver
+
+# sample keys that override the template spec ("R" is accepted for reflux_ratio)
+SAMPLE_FIELDS = ("F", "zF", "D", "reflux_ratio", "q")
+
+_TEMP_COLUMN = re.compile(r"^T_?(\d+)$")
+
+
+class SoftSensor:
+    """
+    Parameters
+    ----------
+    spec : ColumnSpec
+        Template column (stages, feed location, pressure, efficiencies, nominal operation).
+    stages : list of int, optional
+        Stages carrying thermocouples (1 = top tray); without them no zF bias is estimated.
+    max_iter : int
+        Newton iterations allowed per update.
+    time_budget : float
+        Wall-clock budget per update (s); the Newton loop stops once it is exceeded.
+    sigma_T : float
+        Thermocouple uncertainty (°C).
+    sigma_bias : float
+        Prior spread of the zF bias; damps the per-sample bias step.
+    gain : float
+        Fraction of the Gauss–Newton bias step applied per sample (0..1).
+    history : int
+        Number of latencies kept for the percentile statistics.
+    """
+
+    def __init__(self, spec: ColumnSpec, stages=None, max_iter=4, time_budget=0.05, sigma_T=0.5,
+                 sigma_bias=0.05, gain=0.5, history=10000):
+        self.spec = spec
+        self.stages = None if stages is None else np.asarray(stages, dtype=int)
+        if self.stages is not None and (self.stages.min() < 1 or self.stages.max() > spec.n):
+            raise ValueError(f"thermocouple stages must be in 1..{spec.n}")
+        if not 0.0 < gain <= 1.0:
+            raise ValueError("gain must be in (0, 1]")
+
+        self.max_iter = int(max_iter)
+        self.time_budget = float(time_budget)
+        self.sigma_T = float(sigma_T)
+        self.sigma_bias = float(sigma_bias)
+        self.gain = float(gain)
+
+        self.col = DistillationColumn(ColumnSpec(**spec.to_dict()))
+        self.col.solver = NewtonSolver(tol=1e-9, max_iter=self.max_iter)
+        self.bias = 0.0
+        self.u = None  # warm start for the next update
+        self.n_updates = 0
+        self.latencies = collections.deque(maxlen=int(history))
+
+    def reset(self):
+        self.u = None
+        self.bias = 0.0
+        self.n_updates = 0
+        self.latencies.clear()
+
+    def _apply(self, sample):
+        spec = self.col.spec
+        tmpl = self.spec
+        F = float(sample.get("F", tmpl.F))
+        D = float(sample.get("D", tmpl.D))
+        R = float(sample.get("reflux_ratio", sample.get("R", tmpl.R)))
+        q = float(sample.get("q", tmpl.q))
+        zF_in = float(sample.get("zF", tmpl.zF))
+        if F <= 0 or not 0 < D < F or R <= 0:
+            raise ValueError("sample needs F > 0, 0 < D < F and reflux_ratio > 0")
+
+        spec.F, spec.D, spec.R, spec.q = F, D, R, q
+        spec.zF = float(np.clip(zF_in + self.bias, 1e-4, 1 - 1e-4))
+        return zF_in
+
+    def update(self, sample):
+        """
+        Process one sample dict (F, zF, D, reflux_ratio or R, q, "T" readings at
+        self.stages, optional "time"). Returns a dict with "xD_bz", "xB_bz",
+        "zF_used", "bias", "rms_T", "converged", "iters", "latency_ms" and "time".
+        """
+        t0 = time.perf_counter()
+        zF_in = self._apply(sample)
+        col = self.col
+
+        res = col.simulate(x_init=self.u, return_type="array", deadline=t0 + self.time_budget)
+        self.u = col.solution
+        xD, xB, T = res.xD, res.xB, res.T
+        rms_T = float("nan")
+
+        T_meas = sample.get("T")
+        if self.stages is not None and T_meas is not None:
+            T_meas = np.asarray(T_meas, dtype=float)
+            if T_meas.shape != self.stages.shape:
+                raise ValueError("sample 'T' must have one reading per thermocouple stage")
+
+            sens = col.sensitivities()
+            idx = self.stages - 1
+            r = (T_meas - T[idx]) / self.sigma_T
+            s = sens["dT_dzF"][idx] / self.sigma_T
+            rms_T = float(np.sqrt(np.mean((T_meas - T[idx]) ** 2)))
+
+            # one damped Gauss–Newton step on the bias, prior centred on the current bias
+            step = self.gain * float(s @ r) / float(s @ s + 1.0 / self.sigma_bias ** 2)
+            zF_new = float(np.clip(col.spec.zF + step, 1e-4, 1 - 1e-4))
+            step = zF_new - col.spec.zF
+            self.bias = zF_new - zF_in
+
+            # first-order correction of the reported compositions; the next solve starts there
+            xD = float(np.clip(xD + sens["dxD_dzF"] * step, 0.0, 1.0))
+            xB = float(np.clip(xB + sens["du_dzF"][-1] * step, 0.0, 1.0))
+            self.u = self.u + sens["du_dzF"] * step
+            col.spec.zF = zF_new
+
+        latency = time.perf_counter() - t0
+        self.latencies.append(latency)
+        self.n_updates += 1
+        return {
+            "time": sample.get("time"),
+            "xD_bz": xD,
+            "xB_bz": xB,
+            "zF_used": col.spec.zF,
+            "bias": self.bias,
+            "rms_T": rms_T,
+            "converged": bool(res.converged),
+            "iters": int(res.iters),
+            "latency_ms": 1e3 * latency,
+        }
+
+    def stream(self, samples):
+        """
+        Generator: yield one estimate per sample, in order.
+        """
+        for sample in samples:
+            yield self.update(sample)
+
+    async def astream(self, samples, executor=None):
+        """
+        Async generator over an async iterable of samples; each update runs in
+        `executor` (default thread pool) so the event loop stays responsive.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        async for sample in samples:
+            yield await loop.run_in_executor(executor, self.update, sample)
+
+    def latency_percentiles(self, q=(50, 90, 99)):
+        """
+        Latency statistics over the kept history, in ms:
+        {"n", "mean", "max", "p50", "p90", "p99"} (one key per requested percentile).
+        """
+        lat = 1e3 * np.fromiter(self.latencies, dtype=float)
+        out = {"n": int(lat.size)}
+        if lat.size == 0:
+            return out
+        out["mean"] = float(lat.mean())
+        out["max"] = float(lat.max())
+        for p, v in zip(q, np.percentile(lat, q)):
+            out[f"p{p:g}"] = float(v)
+        return out
+
+
+def _temp_columns(fieldnames, temp_columns):
+    if temp_columns is not None:
+        return list(temp_columns)
+    return sorted((c for c in fieldnames if _TEMP_COLUMN.match(c)),
+                  key=lambda c: int(_TEMP_COLUMN.match(c).group(1)))
+
+
+def temp_column_stages(fieldnames):
+    """
+    Stage numbers of the thermocouple columns named T<stage> or T_<stage>, sorted.
+    """
+    return [int(_TEMP_COLUMN.match(c).group(1)) for c in _temp_columns(fieldnames, None)]
+
+
+def replay_csv(path, temp_columns=None, time_column="time", rate_hz=None):
+    """
+    Yield sample dicts from a recorded CSV, as SoftSensor.update() expects them.
+
+    Operating columns F, zF, D, reflux_ratio (or R) and q are passed through when
+    present. temp_columns: thermocouple columns in the sensor's stage order
+    (default: every column named T<stage>/T_<stage>, by stage). rate_hz paces the
+    replay in real time; None replays as fast as the consumer takes samples.
+    """
+    period = None if rate_hz is None else 1.0 / float(rate_hz)
+    with open(path, newline="") as fh:
+        reader = csv.DictReader(fh)
+        fields = reader.fieldnames or []
+        tcols = _temp_columns(fields, temp_columns)
+        ops = [c for c in SAMPLE_FIELDS + ("R",) if c in fields]
+
+        next_t = time.perf_counter()
+        for row in reader:
+            sample = {k: float(row[k]) for k in ops}
+            if tcols:
+                sample["T"] = np.array([float(row[c]) for c in tcols])
+            if time_column in fields:
+                sample["time"] = row[time_column]
+
+            if period is not None:
+                delay = next_t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_t += period
+            yield sample
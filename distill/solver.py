@@ -1,37 +1,205 @@
 \
+import time
+
 import numpy as np
 
 
+def equilibrate(J):
+    """
+    Row and column scales dr, dc (powers of two, so scaling adds no round-off)
+    that bring the largest entry of every row and column of diag(dr) J diag(dc)
+    to about 1. All-zero rows/columns keep scale 1.
+    """
+    a = np.abs(J)
+    rmax = a.max(axis=1)
+    dr = np.where(rmax > 0.0, np.exp2(-np.round(np.log2(np.where(rmax > 0.0, rmax, 1.0)))), 1.0)
+    cmax = (a * dr[:, None]).max(axis=0)
+    dc = np.where(cmax > 0.0, np.exp2(-np.round(np.log2(np.where(cmax > 0.0, cmax, 1.0)))), 1.0)
+    return dr, dc
+
+
+def cond_1(J):
+    """
+    1-norm condition number of J (inf if singular).
+    """
+    try:
+        return float(np.linalg.norm(J, 1) * np.linalg.norm(np.linalg.inv(J), 1))
+    except np.linalg.LinAlgError:
+        return float("inf")
+
+
 class NewtonSolver:
     """
     Small Newton–Raphson solver:
-    - finite-difference Jacobian
+    - finite-difference (or caller-supplied analytic) Jacobian
+    - row/column equilibration of every Newton system (scaling=True): the
+      line search uses the row-scaled residual, i.e. each equation divided by
+      its largest Jacobian entry, so balances in flow units and equations in
+      fractions are weighed alike; the iteration also ends when that scaled
+      residual is below tol_scaled (the round-off floor of large-flow systems
+      can sit above an absolute tol)
     - damping / backtracking
+    - inexact Newton for residuals that run inner iterations (forcing=...):
+      Eisenstat–Walker forcing terms eta_k = gamma (|r_k| / |r_k-1|)^2, capped
+      at eta_max, set how accurate the next residuals need to be
+    - chord iterations with a caller-supplied (e.g. low-rank updated) linear solve
+    - diagnostics=True: condition numbers of the last Jacobian in info (two
+      dense inversions per solve, so off by default)
     """
 
-    def __init__(self, tol=1e-9, max_iter=40, fd_eps=1e-6):
+    def __init__(self, tol=1e-9, max_iter=40, fd_eps=1e-6, scaling=True, tol_scaled=1e-12,
+                 eta_max=0.1, gamma=0.9, diagnostics=False):
         self.tol = tol
         self.max_iter = max_iter
         self.fd_eps = fd_eps
+        self.scaling = scaling
+        self.tol_scaled = tol_scaled
+        self.eta_max = eta_max
+        self.gamma = gamma
+        self.diagnostics = diagnostics
+
+    def _forcing_term(self, rnorm, rnorm_prev, eta_prev):
+        # Eisenstat–Walker choice 2 with their safeguard against dropping too fast
+        if rnorm_prev is None:
+            return self.eta_max
+        eta = self.gamma * (rnorm / rnorm_prev) ** 2
+        if self.gamma * eta_prev ** 2 > 0.1:
+            eta = max(eta, self.gamma * eta_prev ** 2)
+        return min(eta, self.eta_max)
+
+    def solve(self, fun, x0, deadline=None, jac=None, update=None, forcing=None):
+        """
+        deadline: optional time.perf_counter() value; iteration stops once it has
+        passed and the current iterate is returned with converged=False.
+        jac: optional callable x -> J replacing the finite-difference Jacobian.
+        update: optional callable (x, dx, alpha) -> new iterate replacing
+                x + alpha * dx (e.g. to keep mole fractions positive).
+        forcing: optional callable (err, x) -> None for a fun that solves inner
+                 problems (e.g. bubble points) to a tolerance: before each
+                 Jacobian at x it is told the residual error the next
+                 evaluations may carry, eta_k |r_k|; err = 0 asks for full
+                 accuracy, and the last residual is always recomputed that
+                 way, so the result still meets tol.
+
+        info: converged, iters, res_norm (2-norm, tested against tol),
+        res_scaled (row-scaled 2-norm, tested against tol_scaled), jacobian
+        and, with diagnostics=True, cond / cond_scaled (1-norm condition
+        numbers of the last Jacobian before / after equilibration).
+        """
+        if update is None:
+            def update(x, dx, alpha):
+                return x + alpha * dx
 
-    def solve(self, fun, x0):
         x = np.array(x0, dtype=float)
         r = fun(x)
-        rnorm = float(np.linalg.norm(r, ord=2))
+        J = None
+        # row/column scales of the last Jacobian (none yet: the first merit is unscaled)
+        dr = np.ones_like(r)
+        dc = np.ones_like(x)
+        merit = float(np.linalg.norm(r, ord=2))
+        # inexact Newton state: still on loose inner tolerances, last |r| and eta
+        loose = forcing is not None
+        rnorm_prev, eta = None, self.eta_max
+
+        def tighten():
+            # full-accuracy residual at x
+            nonlocal loose, r, merit
+            loose = False
+            forcing(0.0, x)
+            r = fun(x)
+            merit = float(np.linalg.norm(dr * r, ord=2))
 
         for it in range(self.max_iter):
+            if loose:
+                rnorm = float(np.linalg.norm(r, ord=2))
+                eta = self._forcing_term(rnorm, rnorm_prev, eta)
+                rnorm_prev = rnorm
+                forcing(eta * rnorm, x)
+                if it > 0:
+                    # r came from the last step's (looser) evaluations
+                    r = fun(x)
+                    merit = float(np.linalg.norm(dr * r, ord=2))
+
+            if self._done(r, merit, J):
+                if loose:
+                    tighten()
+                if self._done(r, merit, J):
+                    return x, self._info(True, it, r, merit, J, dr, dc)
+
+            J = self.jacobian(fun, x, r) if jac is None else jac(x)
+            if self.scaling:
+                dr, dc = equilibrate(J)
+                Js = J * dr[:, None] * dc
+            else:
+                Js = J
+            rs = dr * r
+            merit = float(np.linalg.norm(rs, ord=2))
+
+            # Solve J dx = -r in scaled form (least squares if singular)
+            try:
+                dx = dc * np.linalg.solve(Js, -rs)
+            except np.linalg.LinAlgError:
+                dx = dc * np.linalg.lstsq(Js, -rs, rcond=None)[0]
+
+            # Backtracking line search on the scaled residual
+            alpha = 1.0
+            x_new = update(x, dx, alpha)
+            r_new = fun(x_new)
+            merit_new = float(np.linalg.norm(dr * r_new, ord=2))
+
+            while merit_new > merit and alpha > 1e-3:
+                alpha *= 0.5
+                x_new = update(x, dx, alpha)
+                r_new = fun(x_new)
+                merit_new = float(np.linalg.norm(dr * r_new, ord=2))
+
+            x, r, merit = x_new, r_new, merit_new
+
+            if deadline is not None and time.perf_counter() > deadline:
+                if loose:
+                    tighten()
+                return x, self._info(self._done(r, merit, J), it + 1, r, merit, J, dr, dc)
+
+        if loose:
+            tighten()
+        return x, self._info(self._done(r, merit, J), self.max_iter, r, merit, J, dr, dc)
+
+    def _done(self, r, merit, J):
+        if np.linalg.norm(r, ord=2) < self.tol:
+            return True
+        # the scaled test needs the scales of a Jacobian
+        return J is not None and self.scaling and merit < self.tol_scaled
+
+    def _info(self, converged, iters, r, merit, J, dr, dc):
+        info = {
+            "converged": bool(converged),
+            "iters": iters,
+            "res_norm": float(np.linalg.norm(r, ord=2)),
+            "res_scaled": merit,
+            "jacobian": J,
+        }
+        if J is not None and self.diagnostics:
+            info["cond"] = cond_1(J)
+            info["cond_scaled"] = cond_1(J * dr[:, None] * dc)
+        return info
+
+    def solve_chord(self, fun, x0, solve_linear, max_iter=None):
+        """
+        Newton-chord iterations: the Jacobian is never rebuilt, each step is
+        dx = solve_linear(-r). Stops early (converged=False) when a step cannot
+        reduce the residual, so callers can fall back to solve().
+        """
+        max_iter = self.max_iter if max_iter is None else max_iter
+        x = np.array(x0, dtype=float)
+        r = fun(x)
+        rnorm = float(np.linalg.norm(r, ord=2))
+
+        for it in range(max_iter):
             if rnorm < self.tol:
                 return x, {"converged": True, "iters": it, "res_norm": rnorm}
 
-            J = self._jacobian(fun, x, r)
-
-            # Solve J dx = -r (least squares if singular)
-            try:
-                dx = np.linalg.solve(J, -r)
-            except np.linalg.LinAlgError:
-                dx = np.linalg.lstsq(J, -r, rcond=None)[0]
+            dx = solve_linear(-r)
 
-            # Backtracking line search
             alpha = 1.0
             x_new = x + alpha * dx
             r_new = fun(x_new)
@@ -43,18 +211,28 @@ class NewtonSolver:
                 r_new = fun(x_new)
                 rnorm_new = float(np.linalg.norm(r_new, ord=2))
 
+            if rnorm_new >= rnorm:
+                return x, {"converged": False, "iters": it + 1, "res_norm": rnorm}
+
             x, r, rnorm = x_new, r_new, rnorm_new
 
-        return x, {"converged": False, "iters": self.max_iter, "res_norm": rnorm}
+        converged = rnorm < self.tol
+        return x, {"converged": converged, "iters": max_iter, "res_norm": rnorm}
+
+    def fd_step(self, x):
+        """
+        Central-difference step jacobian() takes in every coordinate of x.
+        """
+        return self.fd_eps * (np.abs(x) + 1.0)
 
-    def _jacobian(self, fun, x, r_at_x):
+    def jacobian(self, fun, x, r_at_x):
         n = x.size
         J = np.zeros((n, n), dtype=float)
-        eps = self.fd_eps
+        steps = self.fd_step(x)
 
         for j in range(n):
             xj = x[j]
-            h = eps * (abs(xj) + 1.0)
+            h = steps[j]
 
             x_f = x.copy()
             x_b = x.copy()
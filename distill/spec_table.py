@@ -0,0 +1,439 @@
+"""
+Array-backed spec table and design-of-experiments generators.
+
+SpecTable stores a whole study as one NumPy column per ColumnSpec field plus a
+(case, stage) efficiency matrix (NaN-padded past each case's n_stages, like
+ResultSet). Validation and flows() run on whole columns at once, and
+table.row(i) is a zero-copy SpecRow view that DistillationColumn accepts in
+place of a ColumnSpec.
+
+Generators build tables over {field: (lo, hi)} bounds:
+    latin_hypercube(bounds, n, seed=...)
+    sobol(bounds, n, seed=...)           (Joe–Kuo direction numbers, up to 12 fields)
+    factorial({field: levels})
+Field names are ColumnSpec keywords; "eff" sets a uniform tray efficiency.
+"""
+
+import numpy as np
+
+from .column import ColumnSpec, DesignSpec, DistillationColumn, cmo_flows
+from .results import ResultSet
+
+# ColumnSpec keyword -> SpecRow / ColumnSpec attribute
+FIELDS = {
+    "n_stages": "n",
+    "feed_stage": "f",
+    "pressure_mmHg": "P",
+    "F": "F",
+    "zF": "zF",
+    "q": "q",
+    "D": "D",
+    "reflux_ratio": "R",
+}
+INT_FIELDS = ("n_stages", "feed_stage")
+SAMPLED_FIELDS = tuple(FIELDS) + ("eff",)
+
+
+def _object_column(value, n_cases):
+    # one object per case from a sequence, or the same object (e.g. one profile) for all
+    col = np.empty(n_cases, dtype=object)
+    if isinstance(value, (list, tuple)) or (isinstance(value, np.ndarray) and value.dtype == object):
+        if len(value) != n_cases:
+            raise ValueError(f"expected {n_cases} values, got {len(value)}")
+        for i, v in enumerate(value):
+            col[i] = v
+    else:
+        for i in range(n_cases):
+            col[i] = value
+    return col
+
+
+class SpecRow:
+    """
+    Zero-copy view of one SpecTable case with the ColumnSpec interface
+    (n, f, P, F, zF, q, D, R, eff, design, pressure, energy_balance, flows(),
+    to_dict()). Writes go to the table.
+    """
+
+    __slots__ = ("_t", "_i")
+
+    def __init__(self, table, i):
+        self._t = table
+        self._i = int(i)
+
+    @property
+    def eff(self):
+        return self._t.eff[self._i, :self.n]
+
+    @eff.setter
+    def eff(self, value):
+        self._t.eff[self._i, :self.n] = value
+
+    @property
+    def design(self):
+        return self._t.design[self._i]
+
+    @property
+    def pressure(self):
+        return self._t.pressure[self._i]
+
+    @property
+    def energy_balance(self):
+        return bool(self._t.energy_balance[self._i])
+
+    def flows(self):
+        return cmo_flows(self.R, self.D, self.F, self.q)
+
+    def to_dict(self):
+        d = {k: getattr(self, a) for k, a in FIELDS.items()}
+        d["eff_profile"] = self.eff.tolist()
+        if self.design is not None:
+            d["design"] = self.design.to_dict()
+        if self.pressure is not None:
+            d["pressure_profile"] = self.pressure.tolist()
+        if self.energy_balance:
+            d["energy_balance"] = True
+        return d
+
+    def to_spec(self):
+        return ColumnSpec(**self.to_dict())
+
+    def __repr__(self):
+        return f"SpecRow({self._i}, n={self.n}, f={self.f}, R={self.R:g}, zF={self.zF:g})"
+
+
+def _row_field(key):
+    cast = int if key in INT_FIELDS else float
+
+    def get(self):
+        return cast(self._t.cols[key][self._i])
+
+    def set(self, value):
+        self._t.cols[key][self._i] = value
+
+    return property(get, set)
+
+
+for _key, _attr in FIELDS.items():
+    setattr(SpecRow, _attr, _row_field(_key))
+del _key, _attr
+
+
+class SpecTable:
+    """
+    Struct-of-arrays study: cols[field] is a (n_cases,) array for every ColumnSpec
+    keyword and eff is (n_cases, max_stages), NaN past each case's n_stages.
+    The rarely set extras are per-case columns too: design (DesignSpec or None),
+    pressure (profile array or None) and energy_balance (bool); they default to
+    the base spec's and are passed as design=, pressure_profile=, energy_balance=.
+    """
+
+    def __init__(self, n_cases, max_stages=None, base=None, **columns):
+        base = ColumnSpec() if base is None else base
+        n_cases = int(n_cases)
+        b = base.to_dict()
+
+        self.cols = {}
+        for key in FIELDS:
+            dtype = np.int64 if key in INT_FIELDS else float
+            col = np.empty(n_cases, dtype=dtype)
+            col[:] = columns.pop(key, b[key])
+            self.cols[key] = col
+
+        eff = columns.pop("eff", None)
+        self.design = _object_column(columns.pop("design", base.design), n_cases)
+        self.pressure = _object_column(columns.pop("pressure_profile", base.pressure), n_cases)
+        self.energy_balance = np.empty(n_cases, dtype=bool)
+        self.energy_balance[:] = columns.pop("energy_balance", base.energy_balance)
+        if columns:
+            raise ValueError(f"unknown spec fields: {sorted(columns)}")
+
+        n = self.cols["n_stages"]
+        for i, d in enumerate(self.design):
+            if isinstance(d, dict):
+                self.design[i] = DesignSpec(**d)
+        for i, p in enumerate(self.pressure):
+            if p is not None:
+                p = self.pressure[i] = np.asarray(p, dtype=float)
+                if p.shape != (n[i] + 1,):
+                    raise ValueError(f"case {i}: pressure_profile must have length n_stages + 1")
+                if np.any(p <= 0.0):
+                    raise ValueError(f"case {i}: pressures must be positive")
+                # pressure_mmHg stays the top (tray 1) pressure, as in ColumnSpec
+                self.cols["pressure_mmHg"][i] = p[0]
+        if max_stages is None:
+            max_stages = int(n.max()) if n_cases else base.n
+        if n_cases and n.max() > max_stages:
+            raise ValueError("max_stages is smaller than the largest n_stages")
+
+        # eff: None (base profile), scalar or (n_cases,) uniform per case, or (n_cases | 1, k) profiles
+        self.eff = np.full((n_cases, int(max_stages)), np.nan)
+        mask = np.arange(max_stages) < n[:, None]
+        if eff is None:
+            if n_cases and np.all(n == base.n):
+                self.eff[:, :base.n] = base.eff
+            else:
+                self.eff[:] = base.eff.mean()
+        else:
+            eff = np.asarray(eff, dtype=float)
+            if eff.ndim < 2:
+                self.eff[:] = eff.reshape(-1, 1)
+            else:
+                self.eff[:, :eff.shape[1]] = eff
+        self.eff[~mask] = np.nan
+
+    # ------------------------------------------------------------ construction
+
+    @classmethod
+    def from_specs(cls, specs):
+        """
+        Table from ColumnSpec objects (one copy per field).
+        """
+        specs = list(specs)
+        cols = {key: [getattr(s, attr) for s in specs] for key, attr in FIELDS.items()}
+        cols["design"] = [s.design for s in specs]
+        cols["pressure_profile"] = [s.pressure for s in specs]
+        cols["energy_balance"] = [s.energy_balance for s in specs]
+        max_stages = max((s.n for s in specs), default=0)
+        eff = np.full((len(specs), max_stages), np.nan)
+        for i, s in enumerate(specs):
+            eff[i, :s.n] = s.eff
+        return cls(len(specs), max_stages=max_stages, eff=eff, **cols)
+
+    def __len__(self):
+        return self.eff.shape[0]
+
+    @property
+    def max_stages(self):
+        return self.eff.shape[1]
+
+    def row(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return SpecRow(self, i % len(self))
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        return (SpecRow(self, i) for i in range(len(self)))
+
+    def subset(self, index):
+        """
+        New table with the selected cases (boolean mask or integer index; copies).
+        """
+        t = SpecTable.__new__(SpecTable)
+        t.cols = {k: v[index] for k, v in self.cols.items()}
+        t.eff = self.eff[index]
+        t.design = self.design[index]
+        t.pressure = self.pressure[index]
+        t.energy_balance = self.energy_balance[index]
+        return t
+
+    # ------------------------------------------------------------- vectorized
+
+    def flows(self):
+        """
+        Constant molar overflow flows of every case, as (n_cases,) arrays.
+        """
+        c = self.cols
+        return cmo_flows(c["reflux_ratio"], c["D"], c["F"], c["q"])
+
+    def check(self):
+        """
+        Per-rule validity masks (True = ok) for every case, plus "valid" (all rules).
+        """
+        c = self.cols
+        n, f = c["n_stages"], c["feed_stage"]
+        in_col = np.arange(self.max_stages) < n[:, None]
+        e = np.where(in_col, self.eff, 0.5)
+        fl = self.flows()
+        rules = {
+            "n_stages": (n >= 2) & (n <= self.max_stages),
+            "feed_stage": (f >= 1) & (f <= n),
+            "pressure": c["pressure_mmHg"] > 0,
+            "F": c["F"] > 0,
+            "zF": (c["zF"] > 0) & (c["zF"] < 1),
+            "D": (c["D"] > 0) & (c["D"] < c["F"]),
+            "reflux_ratio": c["reflux_ratio"] > 0,
+            "flows": (fl["Ls"] > 0) & (fl["Vs"] > 0) & (fl["Ls"] > fl["B"]),
+            "eff": np.all((e >= 0) & (e <= 1), axis=1) & ~np.any(np.isnan(e), axis=1),
+        }
+        valid = np.ones(len(self), dtype=bool)
+        for ok in rules.values():
+            valid &= ok
+        rules["valid"] = valid
+        return rules
+
+    def validate(self):
+        """
+        Raise ValueError naming the failed rules and the first offending cases.
+        """
+        rules = self.check()
+        if rules["valid"].all():
+            return self
+        msgs = []
+        for name, ok in rules.items():
+            if name != "valid" and not ok.all():
+                bad = np.flatnonzero(~ok)
+                msgs.append(f"{name}: {bad.size} case(s), e.g. {bad[:5].tolist()}")
+        raise ValueError("invalid specs -- " + "; ".join(msgs))
+
+    # ---------------------------------------------------------------- solving
+
+    def solve(self, names=None, warm_start=True, max_workers=None, skip_infeasible=True):
+        """
+        Solve every case into a preallocated ResultSet (rows written in place).
+        Cases with the same (n_stages, feed_stage) warm-start from the previous one;
+        a new structure warm-starts from the last solved case (remapped onto its trays).
+        max_workers: solve in that many processes into a SharedResultSet instead
+        (see distill.parallel; close and unlink it when done).
+        skip_infeasible: cases distill.screening finds infeasible are not solved
+        (NaN rows, rs.errors[i] = "Infeasible: <rules>").
+        """
+        if max_workers is not None:
+            from .parallel import solve_parallel
+
+            return solve_parallel([SpecRow(self, i) for i in range(len(self))], names=names,
+                                  max_workers=max_workers, warm_start=warm_start,
+                                  skip_infeasible=skip_infeasible)
+        rs = ResultSet(len(self), self.max_stages, names=names)
+        if skip_infeasible and len(self):
+            from .screening import screen
+
+            sc = screen(self)
+            for i in np.flatnonzero(sc.infeasible):
+                rs.errors[int(i)] = "Infeasible: " + ", ".join(sc.reasons(i))
+        warm, last = {}, None
+        for i in range(len(self)):
+            if i in rs.errors:
+                continue
+            spec = SpecRow(self, i)
+            col = DistillationColumn(spec)
+            key = (spec.n, spec.f)
+            u0 = warm.get(key, last) if warm_start else None
+            res = col.simulate(x_init=u0, return_type="array", out=rs.row(i, spec.n))
+            if not res.converged and u0 is not None:
+                res = col.simulate(return_type="array", out=rs.row(i, spec.n))
+            if res.converged:
+                warm[key] = last = col.solution
+        return rs
+
+    def to_frame(self):
+        """
+        One row per case with the scalar fields (pandas DataFrame).
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.cols)
+
+
+# --------------------------------------------------------------------- DOE
+
+def _scale(bounds, unit, base):
+    names = list(bounds)
+    for name in names:
+        if name not in SAMPLED_FIELDS:
+            raise ValueError(f"unknown field {name!r}; choose from {SAMPLED_FIELDS}")
+    cols = {}
+    for j, name in enumerate(names):
+        lo, hi = bounds[name]
+        if name in INT_FIELDS:
+            # equal-width bins over the integers lo..hi
+            cols[name] = np.floor(lo + unit[:, j] * (hi - lo + 1)).clip(lo, hi).astype(np.int64)
+        else:
+            cols[name] = lo + unit[:, j] * (hi - lo)
+    max_stages = int(max(bounds["n_stages"][1], base.n)) if "n_stages" in cols else None
+    return SpecTable(unit.shape[0], max_stages=max_stages, base=base, **cols)
+
+
+def latin_hypercube(bounds, n, seed=None, base=None):
+    """
+    n-case Latin hypercube over {field: (lo, hi)}: every field's range is cut
+    into n strata with exactly one case in each.
+    """
+    rng = np.random.default_rng(seed)
+    d = len(bounds)
+    unit = (rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T + rng.random((n, d))) / n
+    return _scale(bounds, unit, ColumnSpec() if base is None else base)
+
+
+# Joe & Kuo (2008) direction numbers for dimensions 2..12: (degree s, polynomial a, m_1..m_s)
+_SOBOL_DIRECTIONS = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+]
+_SOBOL_BITS = 32
+
+
+def _sobol_v(dim):
+    """
+    Direction integers V[k] (k = bit index) for one dimension (0-based).
+    """
+    B = _SOBOL_BITS
+    if dim == 0:
+        return np.array([1 << (B - 1 - k) for k in range(B)], dtype=np.uint64)
+
+    s, a, m = _SOBOL_DIRECTIONS[dim - 1]
+    m = list(m)
+    for k in range(s, B):
+        new = m[k - s] ^ (m[k - s] << s)
+        for j in range(1, s):
+            if (a >> (s - 1 - j)) & 1:
+                new ^= m[k - j] << j
+        m.append(new)
+    return np.array([m[k] << (B - 1 - k) for k in range(B)], dtype=np.uint64)
+
+
+def sobol_points(n, d, seed=None):
+    """
+    First n points of the d-dimensional Sobol sequence in [0, 1)^d (Gray-code
+    order). seed applies a random digital shift, which keeps the net structure.
+    """
+    if d > len(_SOBOL_DIRECTIONS) + 1:
+        raise ValueError(f"sobol supports up to {len(_SOBOL_DIRECTIONS) + 1} dimensions")
+    i = np.arange(n, dtype=np.uint64)
+    gray = i ^ (i >> np.uint64(1))
+    out = np.empty((n, d))
+    shift = (np.random.default_rng(seed).integers(0, 1 << _SOBOL_BITS, size=d, dtype=np.uint64)
+             if seed is not None else np.zeros(d, dtype=np.uint64))
+    for j in range(d):
+        V = _sobol_v(j)
+        x = np.full(n, shift[j], dtype=np.uint64)
+        for k in range(max(int(n - 1).bit_length(), 1)):
+            x ^= ((gray >> np.uint64(k)) & np.uint64(1)) * V[k]
+        out[:, j] = x.astype(float) / float(1 << _SOBOL_BITS)
+    return out
+
+
+def sobol(bounds, n, seed=None, base=None):
+    """
+    n-case Sobol design over {field: (lo, hi)}; use n = 2^k for balanced strata.
+    """
+    unit = sobol_points(n, len(bounds), seed=seed)
+    return _scale(bounds, unit, ColumnSpec() if base is None else base)
+
+
+def factorial(levels, base=None):
+    """
+    Full factorial design over {field: [levels]} (last field varies fastest).
+    """
+    base = ColumnSpec() if base is None else base
+    names = list(levels)
+    for name in names:
+        if name not in SAMPLED_FIELDS:
+            raise ValueError(f"unknown field {name!r}; choose from {SAMPLED_FIELDS}")
+    grids = np.meshgrid(*[np.asarray(levels[k]) for k in names], indexing="ij")
+    cols = {k: g.ravel() for k, g in zip(names, grids)}
+    n_cases = grids[0].size if grids else 1
+    max_stages = int(max(max(levels["n_stages"]), base.n)) if "n_stages" in cols else None
+    return SpecTable(n_cases, max_stages=max_stages, base=base, **cols)
@@ -5,6 +5,12 @@ import math
 ANTOINE = {
     "benzene": (6.90565, 1211.033, 220.79),
     "toluene": (6.95334, 1343.943, 219.377),
+    "ethylbenzene": (6.95719, 1424.255, 213.206),
+    "p-xylene": (6.99052, 1453.430, 215.310),
+    "m-xylene": (7.00908, 1462.266, 215.105),
+    "o-xylene": (6.99891, 1474.679, 213.686),
+    "ethanol": (8.20417, 1642.89, 230.300),
+    "water": (8.07131, 1730.63, 233.426),
 }
 
 ATM_MMHG = 760.0
@@ -15,24 +21,27 @@ def psat_mmHg(component: str, T_C: float) -> float:
     return 10 ** (A - B / (C + T_C))
 
 
-def y_benzene_equilibrium(x_bz: float, P_mmHg: float) -> tuple[float, float]:
+def bubble_temperature(x_bz: float, P_mmHg: float, tol: float = 1e-8,
+                       T0: float = None) -> tuple[float, int]:
     """
-    Return (y_bz_eq, T_bubble) for a given liquid benzene mole fraction x_bz at pressure P.
-    Bubble point is solved by Newton with a safe clamp.
+    Bubble temperature of benzene/toluene liquid x_bz at P, by Newton with a safe
+    clamp on f(T) = sum x_i Psat_i(T) - P, stopped once |f| < tol (mmHg).
+    T0: starting temperature (e.g. a nearby solution) instead of the rough guess.
+    Returns (T, Newton iterations).
     """
     x = min(max(x_bz, 1e-9), 1 - 1e-9)
 
     # simple guess using normal boiling points (rough)
-    T = x * 80.1 + (1 - x) * 110.6
+    T = x * 80.1 + (1 - x) * 110.6 if T0 is None else T0
 
     def f(Tc: float) -> float:
         return x * psat_mmHg("benzene", Tc) + (1 - x) * psat_mmHg("toluene", Tc) - P_mmHg
 
     # Newton with finite-difference derivative + damping
-    for _ in range(60):
-        val = f(T)
-        if abs(val) < 1e-8:
-            break
+    it = 0
+    val = f(T)
+    while abs(val) >= tol and it < 60:
+        it += 1
         h = 1e-3 * (abs(T) + 1.0)
         dfdT = (f(T + h) - f(T - h)) / (2 * h)
         if abs(dfdT) < 1e-10:
@@ -47,12 +56,84 @@ def y_benzene_equilibrium(x_bz: float, P_mmHg: float) -> tuple[float, float]:
         T_new = min(max(T_new, 40.0), 160.0)
 
         # if not improving, reduce step
-        if abs(f(T_new)) > abs(val):
+        val_new = f(T_new)
+        if abs(val_new) > abs(val):
             T_new = T + 0.5 * step
             T_new = min(max(T_new, 40.0), 160.0)
+            val_new = f(T_new)
 
-        T = T_new
+        T, val = T_new, val_new
+
+    return T, it
 
+
+def y_benzene_equilibrium(x_bz: float, P_mmHg: float, tol: float = 1e-8) -> tuple[float, float]:
+    """
+    Return (y_bz_eq, T_bubble) for a given liquid benzene mole fraction x_bz at pressure P.
+    Bubble point is solved by Newton with a safe clamp (see bubble_temperature).
+    """
+    x = min(max(x_bz, 1e-9), 1 - 1e-9)
+    T = bubble_temperature(x, P_mmHg, tol)[0]
     y_eq = x * psat_mmHg("benzene", T) / P_mmHg
     y_eq = min(max(y_eq, 1e-9), 1 - 1e-9)
     return y_eq, T
+
+
+def x_benzene_from_y_dewpoint(y_bz: float, P_mmHg: float) -> tuple[float, float]:
+    """
+    Return (x_bz_eq, T_dew) for a given vapor benzene mole fraction y_bz at pressure P.
+    Dew point: y*P/Psat_bz(T) + (1-y)*P/Psat_tol(T) = 1, solved by Newton with a safe clamp.
+    """
+    y = min(max(y_bz, 1e-9), 1 - 1e-9)
+
+    # simple guess using normal boiling points (rough)
+    T = y * 80.1 + (1 - y) * 110.6
+
+    def g(Tc: float) -> float:
+        return y * P_mmHg / psat_mmHg("benzene", Tc) + (1 - y) * P_mmHg / psat_mmHg("toluene", Tc) - 1.0
+
+    # Newton with finite-difference derivative + damping
+    for _ in range(60):
+        val = g(T)
+        if abs(val) < 1e-8:
+            break
+        h = 1e-3 * (abs(T) + 1.0)
+        dgdT = (g(T + h) - g(T - h)) / (2 * h)
+        if abs(dgdT) < 1e-10:
+            # fallback: small step
+            step = -0.5 if val > 0 else 0.5
+        else:
+            step = -val / dgdT
+
+        # damping / clamp
+        step = max(min(step, 10.0), -10.0)
+        T_new = T + step
+        T_new = min(max(T_new, 40.0), 160.0)
+
+        # if not improving, reduce step
+        if abs(g(T_new)) > abs(val):
+            T_new = T + 0.5 * step
+            T_new = min(max(T_new, 40.0), 160.0)
+
+        T = T_new
+
+    # liquid from x_i = y_i * P / Psat_i(T), normalized
+    x_b = y * P_mmHg / psat_mmHg("benzene", T)
+    x_t = (1 - y) * P_mmHg / psat_mmHg("toluene", T)
+    s = x_b + x_t
+    x_eq = x_b / s if s > 0 else 0.5
+    x_eq = min(max(x_eq, 1e-9), 1 - 1e-9)
+    return x_eq, T
+
+
+def bubble_slope(x_bz: float, T_C: float, P_mmHg: float) -> float:
+    """
+    dy_eq/dx along the bubble curve at (x_bz, T_bubble), from the Antoine derivatives:
+    y = x*Psat_bz(T)/P with dT/dx = -(Psat_bz - Psat_tol) / (x*Psat_bz' + (1-x)*Psat_tol').
+    """
+    Pb = psat_mmHg("benzene", T_C)
+    Pt = psat_mmHg("toluene", T_C)
+    dPb = Pb * math.log(10) * ANTOINE["benzene"][1] / (ANTOINE["benzene"][2] + T_C) ** 2
+    dPt = Pt * math.log(10) * ANTOINE["toluene"][1] / (ANTOINE["toluene"][2] + T_C) ** 2
+    dT = -(Pb - Pt) / (x_bz * dPb + (1 - x_bz) * dPt)
+    return (Pb + x_bz * dPb * dT) / P_mmHg
@@ -0,0 +1,250 @@
+"""
+Pluggable binary VLE models with a batched evaluation contract.
+
+A model turns an array of liquid light-component fractions into bubble-point
+vapor fractions and temperatures, with analytic derivatives, in one call:
+
+    bp = model.bubble(x, P)     # x: (m,) array, P in mmHg: scalar or per stage (m,)
+    bp.y, bp.T, bp.dy_dx, bp.dT_dx, bp.dy_dP, bp.dT_dP
+    x, T = model.dew(y, P)
+
+Each model keeps its parameters as small precomputed arrays (Antoine constants,
+volume ratios, NRTL alpha ...), and the bubble point of every stage is solved
+by one vectorized Newton iteration on ln(sum x_i gamma_i Psat_i) = ln P over
+the paired (x_i, P_i), so a
+whole column costs a handful of array operations however expensive the
+activity model is. DistillationColumn(spec, vle=model) uses it for the stage
+equilibrium; component 1 plays the role of benzene (x_bz, y_bz, ...).
+
+Models:
+    IdealVLE(("benzene", "toluene"))                  Raoult's law
+    WilsonVLE(components, a12, a21, volumes=None)     Lambda_ij = V_j/V_i exp(-a_ij / RT)
+    NRTLVLE(components, b12, b21, alpha=0.3, a12=0, a21=0)   tau_ij = a_ij + b_ij / T
+
+Components are names in thermo.ANTOINE or (A, B, C) Antoine tuples
+(log10 P[mmHg] = A - B / (C + T[°C])). Energies are in J/mol, T in the
+activity models in K.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .thermo import ANTOINE
+
+R_GAS = 8.314462618  # J/(mol K)
+T_KELVIN = 273.15
+LN10 = np.log(10.0)
+
+X_MIN = 1e-9
+
+# bubble-point values and their partial derivatives (d/dx at fixed P, d/dP at fixed x)
+BubblePoint = namedtuple("BubblePoint", ["y", "T", "dy_dx", "dT_dx", "dy_dP", "dT_dP"])
+
+
+class VLEModel:
+    """
+    Binary VLE with an activity-coefficient model; subclasses define
+    _ln_gamma(x, T). The base class is ideal (gamma = 1).
+    """
+
+    def __init__(self, components=("benzene", "toluene")):
+        if len(components) != 2:
+            raise ValueError("VLE models are binary: give two components")
+        coeffs = []
+        for c in components:
+            if isinstance(c, str):
+                if c not in ANTOINE:
+                    raise ValueError(f"no Antoine constants for {c!r}; pass (A, B, C) instead")
+                coeffs.append(ANTOINE[c])
+            else:
+                coeffs.append(tuple(float(v) for v in c))
+        self.components = tuple(c if isinstance(c, str) else f"comp{k + 1}" for k, c in enumerate(components))
+        A, B, C = np.array(coeffs, dtype=float).T
+        # (2, 1) so they broadcast against (m,) stage arrays
+        self._A, self._B, self._C = A[:, None], B[:, None], C[:, None]
+        self._lnB = LN10 * self._B
+        self._T_last = None  # warm start for the next bubble() of the same shape
+
+    def boiling_point(self, P):
+        """
+        Pure-component boiling points (°C) at P, shape (2, ...).
+        """
+        return self._B / (self._A - np.log10(P)) - self._C
+
+    def start_T(self, x, P):
+        """
+        Cold-start bubble temperatures: the mole-fraction average of the pure
+        boiling points at P, shaped like x.
+        """
+        Tb = self.boiling_point(P)
+        return x * Tb[0] + (1.0 - x) * Tb[1]
+
+    def _ln_psat(self, T):
+        # ln Psat and d ln Psat / dT for both components, (2, m)
+        return LN10 * self._A - self._lnB / (self._C + T), self._lnB / (self._C + T) ** 2
+
+    def _ln_gamma(self, x, T):
+        """
+        ln gamma_1, ln gamma_2 and their partial derivatives in x (= x_1) and
+        T (°C): (lng, dlng_dx, dlng_dT), each (2, m). Ideal: zero.
+        """
+        z = np.zeros((2,) + np.shape(x))
+        return z, z, z
+
+    def bubble(self, x, P, tol=1e-10, max_iter=50, T0=None):
+        """
+        Bubble point of every (x_i, P_i) in one vectorized Newton solve (P
+        scalar or shaped like x), started from the temperatures of the previous
+        call when the shapes match (Newton iterates and Jacobian columns move x
+        only a little). Returns a BubblePoint of arrays shaped like x.
+
+        T0: starting temperatures (broadcast to x) instead; such a call neither
+        uses nor updates the warm start of the others.
+        """
+        x = np.clip(np.asarray(x, dtype=float), X_MIN, 1.0 - X_MIN)
+        P = np.broadcast_to(np.asarray(P, dtype=float), x.shape)
+        lnP = np.log(P)
+        xs = np.stack([x, 1.0 - x])
+
+        if T0 is not None:
+            T = np.array(np.broadcast_to(T0, x.shape), dtype=float)
+        else:
+            T = self._T_last
+            if T is None or T.shape != x.shape:
+                T = self.start_T(x, P)
+        for _ in range(max_iter):
+            lnps, dlnps = self._ln_psat(T)
+            lng, dlng_dx, dlng_dT = self._ln_gamma(x, T)
+            p = np.exp(lng + lnps)                   # gamma_i Psat_i
+            k = xs * p                               # partial pressures
+            S = k.sum(axis=0)
+            S_T = (k * (dlnps + dlng_dT)).sum(axis=0)
+            step = -(np.log(S) - lnP) * S / S_T
+            if np.all(np.abs(step) < tol):
+                break
+            T = T + np.clip(step, -25.0, 25.0)
+        if T0 is None:
+            self._T_last = T
+
+        # S(x, T) = P on the bubble curve: dT/dx = -S_x / S_T, dT/dP = 1 / S_T
+        S_x = p[0] - p[1] + (k * dlng_dx).sum(axis=0)
+        dT_dx = -S_x / S_T
+        dT_dP = 1.0 / S_T
+
+        # y = x gamma_1 Psat_1 / P
+        y = np.clip(k[0] / S, X_MIN, 1.0 - X_MIN)
+        dlnk_dT = dlnps[0] + dlng_dT[0]
+        dy_dx = (p[0] + k[0] * (dlng_dx[0] + dlnk_dT * dT_dx)) / S
+        dy_dP = k[0] / S * (dlnk_dT * dT_dP - 1.0 / P)
+        return BubblePoint(y, T, dy_dx, dT_dx, dy_dP, dT_dP)
+
+    def dew(self, y, P, x0=None, tol=1e-13, max_iter=50):
+        """
+        Dew point (liquid x and T) for vapor y, by Newton on bubble(x) = y.
+        Returns (x, T) shaped like y. Leaves the warm start of bubble() alone.
+        """
+        y = np.clip(np.asarray(y, dtype=float), X_MIN, 1.0 - X_MIN)
+        x = y.copy() if x0 is None else np.clip(np.asarray(x0, dtype=float), X_MIN, 1.0 - X_MIN)
+        T = self.start_T(x, P)
+        for _ in range(max_iter):
+            bp = self.bubble(x, P, T0=T)
+            T = bp.T
+            dx = -(bp.y - y) / bp.dy_dx
+            x_new = np.clip(x + dx, X_MIN, 1.0 - X_MIN)
+            done = np.all(np.abs(x_new - x) < tol)
+            x = x_new
+            if done:
+                break
+        return x, self.bubble(x, P, T0=T).T
+
+    def __repr__(self):
+        return f"{type(self).__name__}{self.components}"
+
+
+class IdealVLE(VLEModel):
+    """
+    Raoult's law.
+    """
+
+
+class WilsonVLE(VLEModel):
+    """
+    Wilson: Lambda_12 = V_2/V_1 exp(-a12 / RT), Lambda_21 = V_1/V_2 exp(-a21 / RT).
+    a12, a21 in J/mol; volumes: liquid molar volumes (default equal).
+    """
+
+    def __init__(self, components, a12, a21, volumes=None):
+        super().__init__(components)
+        V1, V2 = (1.0, 1.0) if volumes is None else (float(v) for v in volumes)
+        self.a12, self.a21 = float(a12), float(a21)
+        self._r12, self._r21 = V2 / V1, V1 / V2
+
+    def _ln_gamma(self, x, T):
+        RT = R_GAS * (T + T_KELVIN)
+        L12 = self._r12 * np.exp(-self.a12 / RT)
+        L21 = self._r21 * np.exp(-self.a21 / RT)
+        x1, x2 = x, 1.0 - x
+
+        S1 = x1 + L12 * x2
+        S2 = x2 + L21 * x1
+        D = L12 / S1 - L21 / S2
+        lng = np.stack([-np.log(S1) + x2 * D, -np.log(S2) - x1 * D])
+
+        dD_dx = -L12 * (1.0 - L12) / S1 ** 2 + L21 * (L21 - 1.0) / S2 ** 2
+        dlng_dx = np.stack([
+            -(1.0 - L12) / S1 - D + x2 * dD_dx,
+            -(L21 - 1.0) / S2 - D - x1 * dD_dx,
+        ])
+
+        # through Lambda_ij(T): dLambda_ij/dT = Lambda_ij a_ij / (R T^2)
+        dL12 = L12 * self.a12 / (RT * (T + T_KELVIN))
+        dL21 = L21 * self.a21 / (RT * (T + T_KELVIN))
+        dlng_dT = np.stack([
+            (-x2 / S1 + x1 * x2 / S1 ** 2) * dL12 - x2 * x2 / S2 ** 2 * dL21,
+            -x1 * x1 / S1 ** 2 * dL12 + (-x1 / S2 + x1 * x2 / S2 ** 2) * dL21,
+        ])
+        return lng, dlng_dx, dlng_dT
+
+
+class NRTLVLE(VLEModel):
+    """
+    NRTL: tau_ij = a_ij + b_ij / T[K], G_ij = exp(-alpha tau_ij).
+    """
+
+    def __init__(self, components, b12, b21, alpha=0.3, a12=0.0, a21=0.0):
+        super().__init__(components)
+        self.a12, self.a21 = float(a12), float(a21)
+        self.b12, self.b21 = float(b12), float(b21)
+        self.alpha = float(alpha)
+
+    def _ln_gamma(self, x, T):
+        TK = T + T_KELVIN
+        al = self.alpha
+        t12 = self.a12 + self.b12 / TK
+        t21 = self.a21 + self.b21 / TK
+        G12, G21 = np.exp(-al * t12), np.exp(-al * t21)
+        x1, x2 = x, 1.0 - x
+
+        u = x1 + x2 * G21
+        w = x2 + x1 * G12
+        A1 = t21 * G21 ** 2 / u ** 2 + t12 * G12 / w ** 2
+        A2 = t12 * G12 ** 2 / w ** 2 + t21 * G21 / u ** 2
+        lng = np.stack([x2 ** 2 * A1, x1 ** 2 * A2])
+
+        # du/dx = 1 - G21, dw/dx = G12 - 1
+        dA1 = -2.0 * t21 * G21 ** 2 * (1.0 - G21) / u ** 3 - 2.0 * t12 * G12 * (G12 - 1.0) / w ** 3
+        dA2 = -2.0 * t12 * G12 ** 2 * (G12 - 1.0) / w ** 3 - 2.0 * t21 * G21 * (1.0 - G21) / u ** 3
+        dlng_dx = np.stack([-2.0 * x2 * A1 + x2 ** 2 * dA1, 2.0 * x1 * A2 + x1 ** 2 * dA2])
+
+        # through tau_ij(T) (G_ij follows tau_ij): dtau_ij/dT = -b_ij / T^2
+        dA1_dt21 = G21 ** 2 / u ** 2 * (1.0 - 2.0 * al * t21 + 2.0 * al * t21 * x2 * G21 / u)
+        dA1_dt12 = G12 / w ** 2 * (1.0 - al * t12 + 2.0 * al * t12 * x1 * G12 / w)
+        dA2_dt12 = G12 ** 2 / w ** 2 * (1.0 - 2.0 * al * t12 + 2.0 * al * t12 * x1 * G12 / w)
+        dA2_dt21 = G21 / u ** 2 * (1.0 - al * t21 + 2.0 * al * t21 * x2 * G21 / u)
+        dt12, dt21 = -self.b12 / TK ** 2, -self.b21 / TK ** 2
+        dlng_dT = np.stack([
+            x2 ** 2 * (dA1_dt12 * dt12 + dA1_dt21 * dt21),
+            x1 ** 2 * (dA2_dt12 * dt12 + dA2_dt21 * dt21),
+        ])
+        return lng, dlng_dx, dlng_dT
@@ -0,0 +1,151 @@
+"""
+Streaming Excel export of a whole study.
+
+StudyWorkbook writes one .xlsx with a "summary" sheet (one row per case) and
+the stage profiles, either one sheet per case (layout="sheets") or one long
+"profiles" sheet with a case column (layout="long", the default). It uses
+openpyxl's write-only mode: profile rows are streamed to disk as add_case() is
+called, so with layout="long" memory stays flat however many cases the runner
+feeds in. Every write-only sheet holds a temporary file open until close(), so
+layout="sheets" is capped at MAX_CASE_SHEETS cases (the open-file limit is 256
+on macOS, 1024 on most Linux). The small summary rows are kept until close(),
+which writes them over the union of the cases' keys (e.g. Qc/Qr present only
+for energy-balance cases).
+
+    with StudyWorkbook("outputs/scenario_B/B_study.xlsx") as wb:
+        for name, spec in cases:
+            df, summary, _ = run_case(out_dir, name, spec, workbook=wb)
+"""
+
+import re
+from pathlib import Path
+
+from .io_utils import ensure_dir
+
+PROFILE_HEADER = ["stage", "x_bz", "y_bz", "T_C", "eff"]
+
+# per-case profile sheets each keep a temporary file open until the workbook is saved
+MAX_CASE_SHEETS = 200
+
+_BAD_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def flatten_summary(summary, prefix=""):
+    """
+    Nested summary dict -> flat {"xD_bz": ..., "flows.L": ..., "spec.F": ...}.
+    """
+    flat = {}
+    for k, v in summary.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flat.update(flatten_summary(v, prefix=f"{key}."))
+        elif isinstance(v, (list, tuple)):
+            flat[key] = ", ".join(f"{e:g}" if isinstance(e, float) else str(e) for e in v)
+        else:
+            flat[key] = v
+    return flat
+
+
+def _profile_rows(profile):
+    """
+    Stage rows from a profile DataFrame or a ColumnResult (no pandas needed for the latter).
+    """
+    if hasattr(profile, "to_frame"):
+        cols = (profile.stage, profile.x, profile.y, profile.T, profile.eff)
+    else:
+        cols = tuple(profile[c].to_numpy() for c in PROFILE_HEADER)
+    for row in zip(*cols):
+        yield [int(row[0])] + [float(v) for v in row[1:]]
+
+
+class StudyWorkbook:
+    """
+    Parameters
+    ----------
+    path : str or Path
+        Output .xlsx (written on close()).
+    layout : str
+        "long": one "profiles" sheet; "sheets": one profile sheet per case
+        (at most MAX_CASE_SHEETS cases).
+    """
+
+    def __init__(self, path, layout="long"):
+        if layout not in ("sheets", "long"):
+            raise ValueError("layout must be 'sheets' or 'long'")
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:  # pragma: no cover - depends on the environment
+            raise ImportError("StudyWorkbook needs openpyxl (pip install openpyxl)") from e
+
+        self.path = Path(path)
+        self.layout = layout
+        self._wb = Workbook(write_only=True)
+        self._summary = self._wb.create_sheet("summary")
+        self._summary_rows = []
+        self._profiles = None
+        if layout == "long":
+            self._profiles = self._wb.create_sheet("profiles")
+            self._profiles.append(["case"] + PROFILE_HEADER)
+        self._sheet_names = {"summary", "profiles"}
+        self.n_cases = 0
+        self._closed = False
+
+    def _sheet_name(self, case_name):
+        base = _BAD_SHEET_CHARS.sub("_", str(case_name))[:31] or "case"
+        name, k = base, 1
+        while name.lower() in self._sheet_names:
+            suffix = f"~{k}"
+            name = base[:31 - len(suffix)] + suffix
+            k += 1
+        self._sheet_names.add(name.lower())
+        return name
+
+    def add_case(self, case_name, profile, summary=None):
+        """
+        Stream one finished case: a summary row and its stage profile
+        (DataFrame with stage, x_bz, y_bz, T_C, eff, or a ColumnResult, whose
+        own summary is used when `summary` is None).
+        """
+        if self._closed:
+            raise ValueError("workbook already saved")
+        if self.layout == "sheets" and self.n_cases >= MAX_CASE_SHEETS:
+            raise ValueError(
+                f"layout='sheets' holds at most {MAX_CASE_SHEETS} cases (one open file each); "
+                "use layout='long' for larger studies"
+            )
+        if summary is None:
+            summary = profile.to_dict()
+
+        self._summary_rows.append((case_name, flatten_summary(summary)))
+
+        if self.layout == "long":
+            for row in _profile_rows(profile):
+                self._profiles.append([case_name] + row)
+        else:
+            ws = self._wb.create_sheet(self._sheet_name(case_name))
+            ws.append(PROFILE_HEADER)
+            for row in _profile_rows(profile):
+                ws.append(row)
+        self.n_cases += 1
+
+    def close(self):
+        """
+        Write the .xlsx (once); returns its path.
+        """
+        if not self._closed:
+            # columns: every key of every case, in first-seen order
+            cols = list(dict.fromkeys(k for _, flat in self._summary_rows for k in flat))
+            self._summary.append(["case"] + cols)
+            for case_name, flat in self._summary_rows:
+                self._summary.append([case_name] + [flat.get(k) for k in cols])
+            self._summary_rows = []
+            ensure_dir(self.path.parent)
+            self._wb.save(self.path)
+            self._closed = True
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
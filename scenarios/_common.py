@@ -1,10 +1,12 @@
-
 from distill.column import ColumnSpec, DistillationColumn
 from distill.io_utils import save_case_outputs
 
 
-def run_case(out_dir, case_name, spec: ColumnSpec):
+def run_case(out_dir, case_name, spec: ColumnSpec, plot=True, workbook=None):
     col = DistillationColumn(spec)
     df, summary = col.simulate()
-    paths = save_case_outputs(out_dir, case_name, df, summary)
+    paths = save_case_outputs(out_dir, case_name, df, summary, plot=plot)
+    if workbook is not None:
+        # streamed as each case finishes, see distill.workbook.StudyWorkbook
+        workbook.add_case(case_name, df, summary)
     return df, summary, paths
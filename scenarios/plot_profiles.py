@@ -1,26 +1,116 @@
 """
 Plotting module for distillation column composition profiles.
 Plots stage number (x-axis) vs component mole fractions (y-axis).
+
+For sweeps, avoid one figure per case:
+- ProfilePlotter keeps one figure alive and swaps line data between cases
+- plot_profiles_pdf writes a whole sweep as one multi-page PDF
+- plot_small_multiples writes a whole sweep as one grid PNG
 """
 
-import matplotlib.pyplot as plt
-import pandas as pd
+import math
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from distill.io_utils import pyplot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# (label, marker/linestyle) for the four composition lines
+_SERIES = [
+    ("x_bz (liquid benzene)", "o-"),
+    ("y_bz (vapor benzene)", "s-"),
+    ("x_tol (liquid toluene)", "^--"),
+    ("y_tol (vapor toluene)", "v--"),
+]
+
+
+def _profile_arrays(profile):
+    """
+    (stage, x_bz, y_bz, T_C) arrays from a profile DataFrame or a ColumnResult.
+    """
+    if hasattr(profile, "to_frame"):
+        return profile.stage, profile.x, profile.y, profile.T
+    return (
+        np.asarray(profile["stage"]),
+        np.asarray(profile["x_bz"]),
+        np.asarray(profile["y_bz"]),
+        np.asarray(profile["T_C"]),
+    )
+
+
+def _composition_series(stage, x, y):
+    return [(stage, x), (stage, y), (stage, 1.0 - x), (stage, 1.0 - y)]
+
+
+class ProfilePlotter:
+    """
+    One composition-profile figure reused across cases: update() swaps the line
+    data with set_data instead of building a new figure per case.
+    """
+
+    def __init__(self, figsize=(10, 6)):
+        plt = pyplot()
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        self.lines = [
+            self.ax.plot([], [], style, label=label, linewidth=2, markersize=5)[0]
+            for label, style in _SERIES
+        ]
+
+        ax = self.ax
+        ax.set_xlabel('Stage Number', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Mole Fraction', fontsize=12, fontweight='bold')
+        ax.legend(loc='best', fontsize=10)
+        ax.grid(True, alpha=0.3)
+        ax.set_ylim([0, 1])
+        self._n_stages = None
 
+    def update(self, profile, title: str = ""):
+        stage, x, y, _ = _profile_arrays(profile)
+        for line, (xs, ys) in zip(self.lines, _composition_series(stage, x, y)):
+            line.set_data(xs, ys)
 
-def plot_composition_profile(df: pd.DataFrame, title: str = "", output_path: str = None):
+        if self._n_stages != len(stage):
+            # Set x-axis to show all stages
+            self.ax.set_xticks(stage)
+            self.ax.set_xlim(stage[0] - 0.5, stage[-1] + 0.5)
+            self.fig.tight_layout()
+            self._n_stages = len(stage)
+
+        self.ax.set_title(title, fontsize=14, fontweight='bold')
+        return self.fig, self.ax
+
+    def save(self, output_path, dpi=300):
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+        return output_path
+
+    def close(self):
+        pyplot().close(self.fig)
+
+
+def plot_composition_profile(df: "pd.DataFrame", title: str = "", output_path: str = None,
+                             dpi: int = 300, plotter: ProfilePlotter = None):
     """
     Plot benzene and toluene compositions across stages.
-    
+
     Parameters
     ----------
     df : pd.DataFrame
-        DataFrame with columns: stage, x_bz, y_bz, T_C, eff
+        DataFrame with columns: stage, x_bz, y_bz, T_C, eff (or a ColumnResult)
     title : str
         Plot title
     output_path : str
         Path to save the plot. If None, displays but doesn't save.
-        
+    dpi : int
+        Resolution of the saved image
+    plotter : ProfilePlotter
+        Reuse this figure instead of creating one (left open for the next case)
+
     Returns
     -------
     fig : matplotlib.figure.Figure
@@ -28,62 +118,168 @@ def plot_composition_profile(df: pd.DataFrame, title: str = "", output_path: str
     ax : matplotlib.axes.Axes
         The axes object
     """
-    # Calculate toluene compositions
-    df_plot = df.copy()
-    df_plot['x_tol'] = 1.0 - df_plot['x_bz']
-    df_plot['y_tol'] = 1.0 - df_plot['y_bz']
-    
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Plot compositions
-    ax.plot(df_plot['stage'], df_plot['x_bz'], 'o-', label='x_bz (liquid benzene)', linewidth=2, markersize=5)
-    ax.plot(df_plot['stage'], df_plot['y_bz'], 's-', label='y_bz (vapor benzene)', linewidth=2, markersize=5)
-    ax.plot(df_plot['stage'], df_plot['x_tol'], '^--', label='x_tol (liquid toluene)', linewidth=2, markersize=5)
-    ax.plot(df_plot['stage'], df_plot['y_tol'], 'v--', label='y_tol (vapor toluene)', linewidth=2, markersize=5)
-    
-    # Formatting
-    ax.set_xlabel('Stage Number', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Mole Fraction', fontsize=12, fontweight='bold')
-    ax.set_title(title, fontsize=14, fontweight='bold')
-    ax.legend(loc='best', fontsize=10)
-    ax.grid(True, alpha=0.3)
-    ax.set_ylim([0, 1])
-    
-    # Set x-axis to show all stages
-    ax.set_xticks(df_plot['stage'].values)
-    
-    plt.tight_layout()
-    
+    reuse = plotter is not None
+    if not reuse:
+        plotter = ProfilePlotter()
+    fig, ax = plotter.update(df, title)
+
     # Save if path provided
     if output_path:
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        output_path = plotter.save(output_path, dpi=dpi)
         print(f"Plot saved: {output_path}")
-    
-    plt.close(fig)  # Close the figure to prevent memory buildup and GUI window display
+
+    if not reuse:
+        plotter.close()  # Close the figure to prevent memory buildup and GUI window display
     return fig, ax
 
 
-def plot_all_profiles(case_results: list, output_dir: str = "outputs"):
+def plot_profiles_pdf(case_results: list, output_path: str, dpi: int = 150):
+    """
+    Write one page per case into a single PDF, reusing one figure throughout.
+
+    Parameters
+    ----------
+    case_results : list
+        List of tuples: (df, summary, case_name)
+    output_path : str
+        Path of the PDF file
+    dpi : int
+        Resolution for any rasterized content
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    plotter = ProfilePlotter()
+    try:
+        with PdfPages(output_path) as pdf:
+            for df, summary, case_name in case_results:
+                plotter.update(df, title=f"{case_name}\nBenzene-Toluene Distillation Column")
+                pdf.savefig(plotter.fig, dpi=dpi)
+    finally:
+        plotter.close()
+    return output_path
+
+
+def plot_small_multiples(case_results: list, output_path: str, ncols: int = 4, dpi: int = 150,
+                         quantity: str = "composition", title: str = ""):
+    """
+    Draw every case of a sweep as one panel of a single grid image.
+
+    Parameters
+    ----------
+    case_results : list
+        List of tuples: (df, summary, case_name)
+    output_path : str
+        Path of the image file (PNG, PDF, ...)
+    ncols : int
+        Panels per row
+    dpi : int
+        Resolution of the saved image
+    quantity : str
+        "composition" (x/y of both components) or "temperature" (T_C)
+    title : str
+        Figure title
+    """
+    if quantity not in ("composition", "temperature"):
+        raise ValueError("quantity must be 'composition' or 'temperature'")
+
+    n = len(case_results)
+    ncols = max(1, min(ncols, n))
+    nrows = max(1, math.ceil(n / ncols))
+
+    plt = pyplot()
+    fig, axes = plt.subplots(nrows, ncols, figsize=(3.2 * ncols, 2.4 * nrows),
+                             sharex=True, sharey=(quantity == "composition"), squeeze=False)
+
+    for ax, (df, summary, case_name) in zip(axes.flat, case_results):
+        stage, x, y, T = _profile_arrays(df)
+        if quantity == "composition":
+            for (xs, ys), (label, style) in zip(_composition_series(stage, x, y), _SERIES):
+                ax.plot(xs, ys, style, label=label, linewidth=1.2, markersize=2.5)
+            ax.set_ylim([0, 1])
+        else:
+            ax.plot(stage, T, "o-", linewidth=1.2, markersize=2.5)
+        ax.set_title(case_name, fontsize=9)
+        ax.grid(True, alpha=0.3)
+        ax.tick_params(labelsize=7)
+
+    for ax in list(axes.flat)[n:]:
+        ax.set_visible(False)
+
+    ylabel = "Mole Fraction" if quantity == "composition" else "Temperature (°C)"
+    fig.supxlabel("Stage Number", fontsize=10, fontweight='bold')
+    fig.supylabel(ylabel, fontsize=10, fontweight='bold')
+    if quantity == "composition":
+        handles, labels = axes.flat[0].get_legend_handles_labels()
+        fig.legend(handles, labels, loc="upper center", ncol=4, fontsize=8, bbox_to_anchor=(0.5, 0.0))
+    if title:
+        fig.suptitle(title, fontsize=12, fontweight='bold')
+    fig.tight_layout()
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Plot saved: {output_path}")
+    return output_path
+
+
+def plot_all_profiles(case_results: list, output_dir: str = "outputs", mode: str = "separate",
+                      dpi: int = 300, name: str = "profiles"):
     """
     Plot multiple cases for comparison.
-    
+
     Parameters
     ----------
     case_results : list
         List of tuples: (df, summary, case_name)
     output_dir : str
         Directory to save plots
+    mode : str
+        "separate": one PNG per case, one reused figure
+        "pdf":      one multi-page PDF `<name>.pdf`
+        "grid":     one small-multiples PNG `<name>.png`
+    dpi : int
+        Resolution of the saved images
+    name : str
+        File stem for the "pdf" and "grid" modes
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    for df, summary, case_name in case_results:
-        title = f"{case_name}\nBenzene-Toluene Distillation Column"
-        plot_path = output_dir / f"{case_name}_profile.png"
-        plot_composition_profile(df, title=title, output_path=str(plot_path))
+
+    if mode == "pdf":
+        return [plot_profiles_pdf(case_results, output_dir / f"{name}.pdf", dpi=dpi)]
+    if mode == "grid":
+        return [plot_small_multiples(case_results, output_dir / f"{name}.png", dpi=dpi)]
+    if mode != "separate":
+        raise ValueError("mode must be 'separate', 'pdf' or 'grid'")
+
+    paths = []
+    plotter = ProfilePlotter()
+    try:
+        for df, summary, case_name in case_results:
+            title = f"{case_name}\nBenzene-Toluene Distillation Column"
+            plotter.update(df, title=title)
+            paths.append(plotter.save(output_dir / f"{case_name}_profile.png", dpi=dpi))
+    finally:
+        plotter.close()
+    return paths
+
+
+def plot_sweep(case_results: list, output_dir: str, name: str, title: str = "", dpi: int = 150):
+    """
+    Small-multiples summary of one sweep: `<name>_profiles.png` (compositions)
+    and `<name>_T_profiles.png` (temperatures).
+    """
+    output_dir = Path(output_dir)
+    return [
+        plot_small_multiples(case_results, output_dir / f"{name}_profiles.png", dpi=dpi,
+                             quantity="composition", title=title),
+        plot_small_multiples(case_results, output_dir / f"{name}_T_profiles.png", dpi=dpi,
+                             quantity="temperature", title=title),
+    ]
 
 
 if __name__ == "__main__":
@@ -6,49 +6,62 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-# Set matplotlib to use non-interactive backend before any plotting
-import matplotlib
-matplotlib.use('Agg')
-
 import numpy as np
-from distill.column import ColumnSpec
+import pandas as pd
+
+from distill.column import ColumnSpec, DistillationColumn
+from distill.workbook import StudyWorkbook
 from scenarios._common import run_case
-from scenarios.plot_profiles import plot_composition_profile
+from scenarios.plot_profiles import plot_sweep
 
 
 def main():
     out_dir = "outputs/scenario_A"
+    wb = StudyWorkbook(f"{out_dir}/A_study.xlsx", layout="sheets")
+
+    cases = []
 
     # A0 Baseline 70%
     spec0 = ColumnSpec(eff_profile=[0.70]*15)
-    df0, summary0, _ = run_case(out_dir, "A0_baseline_70pct", spec0)
-    plot_composition_profile(df0, title="A0: Baseline (70% Efficiency)", 
-                            output_path=f"{out_dir}/A0_baseline_70pct_profile.png")
+    df0, summary0, _ = run_case(out_dir, "A0_baseline_70pct", spec0, plot=False, workbook=wb)
+    cases.append((df0, summary0, "A0: Baseline (70%)"))
 
     # A1 Uniform reduction to 60%
     spec1 = ColumnSpec(eff_profile=[0.60]*15)
-    df1, summary1, _ = run_case(out_dir, "A1_uniform_60pct", spec1)
-    plot_composition_profile(df1, title="A1: Uniform Reduction (60% Efficiency)", 
-                            output_path=f"{out_dir}/A1_uniform_60pct_profile.png")
+    df1, summary1, _ = run_case(out_dir, "A1_uniform_60pct", spec1, plot=False, workbook=wb)
+    cases.append((df1, summary1, "A1: Uniform 60%"))
 
     # A2 Localized damage: trays 5-8 at 50%, others 70% (stage numbering from top)
     eff2 = [0.70]*15
     for s in range(5, 9):  # 5,6,7,8
         eff2[s-1] = 0.50
     spec2 = ColumnSpec(eff_profile=eff2)
-    df2, summary2, _ = run_case(out_dir, "A2_local_5to8_50pct", spec2)
-    plot_composition_profile(df2, title="A2: Localized Damage (Stages 5-8, 50% Efficiency)", 
-                            output_path=f"{out_dir}/A2_local_5to8_50pct_profile.png")
+    df2, summary2, _ = run_case(out_dir, "A2_local_5to8_50pct", spec2, plot=False, workbook=wb)
+    cases.append((df2, summary2, "A2: Stages 5-8 at 50%"))
 
     # A3 Progressive: 70% (top) to 55% (bottom)
     eff3 = np.linspace(0.70, 0.55, 15).tolist()
     spec3 = ColumnSpec(eff_profile=eff3)
-    df3, summary3, _ = run_case(out_dir, "A3_progressive_70to55", spec3)
-    plot_composition_profile(df3, title="A3: Progressive Degradation (70% top to 55% bottom)", 
-                            output_path=f"{out_dir}/A3_progressive_70to55_profile.png")
+    df3, summary3, _ = run_case(out_dir, "A3_progressive_70to55", spec3, plot=False, workbook=wb)
+    cases.append((df3, summary3, "A3: 70% top to 55% bottom"))
+
+    plot_sweep(cases, out_dir, "A_efficiency", title="A: Tray Efficiency Deterioration")
+
+    # A4 Single-tray damage scan: each tray alone at 50%, re-solved incrementally from A0
+    col0 = DistillationColumn(spec0)
+    col0.simulate(return_type="array")
+    rows = []
+    for s in range(1, 16):
+        res = col0.resolve({s: 0.50}, keep=False, return_type="array")
+        rows.append({"damaged_stage": s, "xD_bz": res.xD, "xB_tol": res.xB_tol,
+                     "converged": bool(res.converged), "iters": int(res.iters)})
+    pd.DataFrame(rows).to_csv(f"{out_dir}/A4_single_tray_scan.csv", index=False)
+
+    wb.close()
 
     print("Scenario A complete. See outputs/scenario_A/")
-    print("Plots saved for all cases (A0-A3)")
+    print(f"Study workbook ({wb.n_cases} cases): {wb.path}")
+    print("Plots saved for all cases (A_efficiency_profiles.png, A_efficiency_T_profiles.png)")
 
 
 if __name__ == "__main__":
@@ -6,54 +6,92 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-# Set matplotlib to use non-interactive backend before any plotting
-import matplotlib
-matplotlib.use('Agg')
-
 import numpy as np
 import pandas as pd
 
-from distill.column import ColumnSpec
+from distill.column import ColumnSpec, DesignSpec, DistillationColumn
+from distill.sampling import AdaptiveSampler, Axis
+from distill.workbook import StudyWorkbook
 from scenarios._common import run_case
-from scenarios.plot_profiles import plot_composition_profile
+from scenarios.plot_profiles import plot_sweep
 
 
 def main():
     out_dir = "outputs/scenario_B"
+    wb = StudyWorkbook(f"{out_dir}/B_study.xlsx", layout="sheets")
     rows = []
 
     # Reflux ratio sensitivity: 1.5 to 4.0
+    cases = []
     for R in np.linspace(1.5, 4.0, 6):
         spec = ColumnSpec(reflux_ratio=float(R), eff_profile=[0.70]*15)
-        df, summary, _ = run_case(out_dir, f"B_R_{R:.2f}", spec)
-        plot_composition_profile(df, title=f"B: Reflux Ratio R = {R:.2f}", 
-                                output_path=f"{out_dir}/B_R_{R:.2f}_profile.png")
+        df, summary, _ = run_case(out_dir, f"B_R_{R:.2f}", spec, plot=False, workbook=wb)
+        cases.append((df, summary, f"R = {R:.2f}"))
         rows.append({"study": "reflux_ratio", "R": R, "xD_bz": summary["xD_bz"], "xB_tol": summary["xB_tol"],
                      "V_proxy": summary["flows"]["V"], "L_proxy": summary["flows"]["L"]})
 
+    plot_sweep(cases, out_dir, "B_reflux_ratio", title="B: Reflux Ratio Sensitivity")
+
     # Feed stage optimization: stages 5 to 11
+    cases = []
     for f in range(5, 12):
         spec = ColumnSpec(feed_stage=f, eff_profile=[0.70]*15)
-        df, summary, _ = run_case(out_dir, f"B_feedstage_{f}", spec)
-        plot_composition_profile(df, title=f"B: Feed Stage = {f}", 
-                                output_path=f"{out_dir}/B_feedstage_{f}_profile.png")
+        df, summary, _ = run_case(out_dir, f"B_feedstage_{f}", spec, plot=False, workbook=wb)
+        cases.append((df, summary, f"Feed Stage = {f}"))
         rows.append({"study": "feed_stage", "feed_stage": f, "xD_bz": summary["xD_bz"], "xB_tol": summary["xB_tol"],
                      "V_proxy": summary["flows"]["V"], "L_proxy": summary["flows"]["L"]})
 
+    plot_sweep(cases, out_dir, "B_feed_stage", title="B: Feed Stage Location")
+
     # Feed condition analysis: q = 1.0, 0.5, 0.0
+    cases = []
     for q in [1.0, 0.5, 0.0]:
         spec = ColumnSpec(q=q, eff_profile=[0.70]*15)
-        df, summary, _ = run_case(out_dir, f"B_q_{q:.1f}", spec)
-        plot_composition_profile(df, title=f"B: Feed Condition q = {q:.1f}", 
-                                output_path=f"{out_dir}/B_q_{q:.1f}_profile.png")
+        df, summary, _ = run_case(out_dir, f"B_q_{q:.1f}", spec, plot=False, workbook=wb)
+        cases.append((df, summary, f"Feed Condition q = {q:.1f}"))
         rows.append({"study": "feed_q", "q": q, "xD_bz": summary["xD_bz"], "xB_tol": summary["xB_tol"],
                      "V_proxy": summary["flows"]["V"], "L_proxy": summary["flows"]["L"],
                      "Vs_proxy": summary["flows"]["Vs"], "Ls_proxy": summary["flows"]["Ls"]})
 
+    plot_sweep(cases, out_dir, "B_feed_q", title="B: Feed Condition")
+
+    # Same feed conditions with stage energy balances instead of constant molar overflow
+    for q in [1.0, 0.5, 0.0]:
+        spec = ColumnSpec(q=q, eff_profile=[0.70]*15, energy_balance=True)
+        df, summary, _ = run_case(out_dir, f"B_q_{q:.1f}_energy", spec, plot=False, workbook=wb)
+        rows.append({"study": "feed_q_energy", "q": q, "xD_bz": summary["xD_bz"], "xB_tol": summary["xB_tol"],
+                     "V_proxy": summary["flows"]["V"], "L_proxy": summary["flows"]["L"],
+                     "Vs_proxy": summary["flows"]["Vs"], "Ls_proxy": summary["flows"]["Ls"],
+                     "Qc": summary["duties"]["Qc"], "Qr": summary["duties"]["Qr"]})
+
+    # Design spec: reflux ratio needed for xD = 0.99 at each feed stage (one augmented solve each)
+    u = None
+    for f in range(5, 12):
+        spec = ColumnSpec(feed_stage=f, eff_profile=[0.70]*15, design=DesignSpec("xD", 0.99, free="R"))
+        col = DistillationColumn(spec)
+        res = col.simulate(x_init=u, return_type="array")
+        u = col.solution
+        rows.append({"study": "design_xD_0.99", "feed_stage": f, "R": res.R, "xD_bz": res.xD,
+                     "xB_tol": res.xB_tol, "V_proxy": res.V, "L_proxy": res.L,
+                     "converged": bool(res.converged)})
+
+    # Adaptive operating map over reflux ratio: samples cluster near the low-R knee
+    sampler = AdaptiveSampler(ColumnSpec(eff_profile=[0.70]*15), [Axis("reflux_ratio", 0.5, 4.0)],
+                              responses={"xD": 2e-3, "xB": 2e-3})
+    omap = sampler.run()
+    omap.to_frame().to_csv(f"{out_dir}/B_R_operating_map.csv", index=False)
+    (R_dense,), dense = omap.dense(n=141)
+    pd.DataFrame({"R": R_dense, "xD_bz": dense["xD"], "xB_bz": dense["xB"]}).to_csv(
+        f"{out_dir}/B_R_operating_map_interp.csv", index=False)
+
     df = pd.DataFrame(rows)
     df.to_csv(f"{out_dir}/B_summary_table.csv", index=False)
+    wb.close()
+
     print("Scenario B complete. Summary table saved to outputs/scenario_B/B_summary_table.csv")
-    print("Composition profiles saved for all cases")
+    print(f"Study workbook ({wb.n_cases} cases): {wb.path}")
+    print("Composition and temperature profiles saved per sweep (B_*_profiles.png)")
+    print(f"Adaptive reflux map: {omap.n_solves} solves -> B_R_operating_map.csv (+ _interp.csv)")
 
 
 if __name__ == "__main__":
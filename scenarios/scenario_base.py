@@ -6,10 +6,6 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-# Set matplotlib to use non-interactive backend before any plotting
-import matplotlib
-matplotlib.use('Agg')
-
 from distill.column import ColumnSpec
 from scenarios._common import run_case
 from scenarios.plot_profiles import plot_composition_profile
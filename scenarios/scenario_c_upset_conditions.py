@@ -6,55 +6,84 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-# Set matplotlib to use non-interactive backend before any plotting
-import matplotlib
-matplotlib.use('Agg')
-
 import itertools
+import numpy as np
 import pandas as pd
 
 from distill.column import ColumnSpec
+from distill.control import PIController, tune, tuning_grid
+from distill.dynamics import DynamicColumn, step, time_to_threshold
+from distill.workbook import StudyWorkbook
 from scenarios._common import run_case
-from scenarios.plot_profiles import plot_composition_profile
+from scenarios.plot_profiles import plot_sweep
 
 
 def main():
     out_dir = "outputs/scenario_C"
+    wb = StudyWorkbook(f"{out_dir}/C_study.xlsx", layout="sheets")
     rows = []
 
     # Feed composition variation ±10% change in benzene concentration
+    cases = []
     for zF in [0.45, 0.50, 0.55]:
         spec = ColumnSpec(zF=zF, eff_profile=[0.70]*15)
-        df, summary, _ = run_case(out_dir, f"C_zF_{zF:.2f}", spec)
-        plot_composition_profile(df, title=f"C: Feed Composition zF = {zF:.2f}", 
-                                output_path=f"{out_dir}/C_zF_{zF:.2f}_profile.png")
+        df, summary, _ = run_case(out_dir, f"C_zF_{zF:.2f}", spec, plot=False, workbook=wb)
+        cases.append((df, summary, f"zF = {zF:.2f}"))
         rows.append({"study": "zF", "zF": zF, "xD_bz": summary["xD_bz"], "xB_tol": summary["xB_tol"]})
+    plot_sweep(cases, out_dir, "C_zF", title="C: Feed Composition")
 
     # Feed rate changes: 80%, 100%, 120%
+    cases = []
     for mult in [0.8, 1.0, 1.2]:
         F = 100.0 * mult
         # Keep D scaled with F for fairness (simple assumption)
         D = 50.0 * mult
         spec = ColumnSpec(F=F, D=D, eff_profile=[0.70]*15)
-        df, summary, _ = run_case(out_dir, f"C_F_{int(mult*100)}pct", spec)
-        plot_composition_profile(df, title=f"C: Feed Rate F = {F:.1f} kmol/h ({int(mult*100)}%)", 
-                                output_path=f"{out_dir}/C_F_{int(mult*100)}pct_profile.png")
+        df, summary, _ = run_case(out_dir, f"C_F_{int(mult*100)}pct", spec, plot=False, workbook=wb)
+        cases.append((df, summary, f"F = {F:.1f} kmol/h ({int(mult*100)}%)"))
         rows.append({"study": "F", "F": F, "D": D, "xD_bz": summary["xD_bz"], "xB_tol": summary["xB_tol"]})
+    plot_sweep(cases, out_dir, "C_F", title="C: Feed Rate")
 
     # Combined upsets: composition and rate together
+    cases = []
     for zF, mult in itertools.product([0.45, 0.55], [0.8, 1.2]):
         F = 100.0 * mult
         D = 50.0 * mult
         spec = ColumnSpec(F=F, D=D, zF=zF, eff_profile=[0.70]*15)
-        df, summary, _ = run_case(out_dir, f"C_comb_zF_{zF:.2f}_F_{int(mult*100)}", spec)
-        plot_composition_profile(df, title=f"C: Combined (zF={zF:.2f}, F={int(mult*100)}%)", 
-                                output_path=f"{out_dir}/C_comb_zF_{zF:.2f}_F_{int(mult*100)}_profile.png")
+        df, summary, _ = run_case(out_dir, f"C_comb_zF_{zF:.2f}_F_{int(mult*100)}", spec, plot=False, workbook=wb)
+        cases.append((df, summary, f"zF={zF:.2f}, F={int(mult*100)}%"))
         rows.append({"study": "combined", "zF": zF, "F": F, "D": D, "xD_bz": summary["xD_bz"], "xB_tol": summary["xB_tol"]})
+    plot_sweep(cases, out_dir, "C_combined", title="C: Combined Upsets")
 
     df = pd.DataFrame(rows)
     df.to_csv(f"{out_dir}/C_summary_table.csv", index=False)
+
+    # Transient response: feed composition drops 0.50 -> 0.45 at t = 0.5 h
+    xD_spec = 0.95
+    dyn = DynamicColumn(ColumnSpec(eff_profile=[0.70]*15), holdup=1.0, reboiler_holdup=10.0,
+                        disturbances=[step("zF", 0.5, 0.45)])
+    run = dyn.run(10.0, t_eval=np.linspace(0.0, 10.0, 201))
+    pd.DataFrame({"t_h": run["t"], "xD_bz": run["xD"], "xB_bz": run["xB"]}).to_csv(
+        f"{out_dir}/C_dynamic_zF_step.csv", index=False)
+    t_off = time_to_threshold(run["t"], run["xD"], xD_spec)
+    off = "never" if t_off is None else f"after {t_off - 0.5:.2f} h"
+
+    # Closed loop: tray-8 temperature PI on the reflux flow (boilup held) against the same step
+    pi = PIController("T8", kp=-5.0, ti=0.5, u_min=50.0, u_max=170.0)
+    tuning = tune(ColumnSpec(eff_profile=[0.70]*15), pi, tuning_grid(kp=[-2.0, -5.0, -10.0], ti=[0.25, 0.5, 1.0]),
+                  10.0, disturbances=[step("zF", 0.5, 0.45)])
+    tuning.to_csv(f"{out_dir}/C_pi_tuning.csv", index=False)
+    best = tuning.loc[tuning["iae"].idxmin()]
+
+    wb.close()
+
     print("Scenario C complete. Summary table saved to outputs/scenario_C/C_summary_table.csv")
-    print("Composition profiles saved for all cases")
+    print(f"Study workbook ({wb.n_cases} cases): {wb.path}")
+    print("Composition and temperature profiles saved per sweep (C_*_profiles.png)")
+    print(f"Dynamic zF step saved to C_dynamic_zF_step.csv; xD below {xD_spec} {off} "
+          f"({run['stats']['wall_s']:.2f} s wall)")
+    print(f"T8 -> reflux PI tuning grid ({len(tuning)} runs) saved to C_pi_tuning.csv; best IAE "
+          f"{best['iae']:.3g} at kp={best['kp']:g}, ti={best['ti']:g}")
 
 
 if __name__ == "__main__":